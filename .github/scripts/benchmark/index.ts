@@ -0,0 +1,242 @@
+/**
+ * モックNotionサーバーに対して実際のpull/pushを実行するベンチマーク
+ * エントリーポイント
+ *
+ * 使い方: npm run benchmark -- --pages 10000 --latency 50 --rate-limit 0.01
+ * ネットワークを使わずに、実行時間・API呼び出し回数・最大RSS・スループットを計測する
+ */
+import { spawn } from "node:child_process";
+import * as fs from "node:fs/promises";
+import * as os from "node:os";
+import * as path from "node:path";
+import { fileURLToPath, pathToFileURL } from "node:url";
+import { parseArgs } from "node:util";
+import {
+  startMockNotionServer,
+  type MockNotionServer,
+} from "./mock-server.js";
+import {
+  generateWorkspace,
+  parseBlockMix,
+  toUuid,
+  type Workspace,
+} from "./workspace.js";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+type Phase = "pull" | "push";
+
+interface PhaseResult {
+  phase: Phase;
+  exitCode: number;
+  wallMs: number;
+  /** 最大RSS（KB） */
+  maxRssKb: number;
+  /** 処理対象のページ数（DBレコードを含む） */
+  objects: number;
+  /** 1秒あたりのページ数 */
+  pagesPerSecond: number;
+  /** エンドポイント → 呼び出し回数 */
+  calls: Record<string, number>;
+  totalCalls: number;
+  rateLimited: number;
+  bytesSent: number;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+const SCRIPTS_DIR = path.resolve(
+  path.dirname(fileURLToPath(import.meta.url)),
+  "..",
+);
+const ENTRY_POINTS: Record<Phase, string> = {
+  pull: path.join(SCRIPTS_DIR, "notion->vscode", "index.ts"),
+  push: path.join(SCRIPTS_DIR, "vscode->notion", "index.ts"),
+};
+// 子プロセスでTypeScriptを実行するローダーと、リソース使用量を書き出すフック
+const TSX_LOADER = import.meta.resolve("tsx");
+const USAGE_HOOK = pathToFileURL(
+  path.join(SCRIPTS_DIR, "benchmark", "report-usage.ts"),
+).href;
+
+const { values } = parseArgs({
+  options: {
+    seed: { type: "string", default: "1" },
+    pages: { type: "string", default: "1000" },
+    depth: { type: "string", default: "4" },
+    "fan-out": { type: "string", default: "8" },
+    databases: { type: "string", default: "10" },
+    rows: { type: "string", default: "50" },
+    blocks: { type: "string", default: "20" },
+    "block-mix": { type: "string" },
+    "image-kb": { type: "string", default: "16" },
+    latency: { type: "string", default: "0" },
+    jitter: { type: "string", default: "0" },
+    "rate-limit": { type: "string", default: "0" },
+    rps: { type: "string", default: "1000" },
+    phases: { type: "string", default: "pull,push" },
+    json: { type: "string" },
+    keep: { type: "boolean", default: false },
+    verbose: { type: "boolean", default: false },
+  },
+});
+
+/**
+ * 数値の引数を読み込む（不正な値はデフォルト値）
+ */
+function toNumber(value: string | undefined, fallback: number): number {
+  const parsed = Number.parseFloat(value ?? "");
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : fallback;
+}
+
+// ============================================================
+// 実行
+// ============================================================
+
+/**
+ * pull/pushを子プロセスで実行して計測
+ */
+async function runPhase(
+  phase: Phase,
+  workspace: Workspace,
+  server: MockNotionServer,
+  workDir: string,
+): Promise<PhaseResult> {
+  const usageFile = path.join(workDir, `.${phase}-usage.json`);
+  const env = {
+    ...process.env,
+    NOTION_API_BASE_URL: server.url,
+    NOTION_API_KEY: "benchmark",
+    NOTION_ROOT_PAGE_ID: toUuid(workspace.rootId),
+    NOTION_RATE_LIMIT_RPS: values.rps,
+    NOTION_RATE_LIMIT_BURST: values.rps,
+    // 注入した429で再試行の予算が尽きないようにする
+    NOTION_RETRY_BUDGET: process.env.NOTION_RETRY_BUDGET ?? "1000000",
+    BENCHMARK_USAGE_FILE: usageFile,
+  };
+
+  server.resetStats();
+  const startedAt = performance.now();
+  const exitCode = await new Promise<number>((resolve, reject) => {
+    const child = spawn(
+      process.execPath,
+      ["--import", TSX_LOADER, "--import", USAGE_HOOK, ENTRY_POINTS[phase]],
+      {
+        cwd: workDir,
+        env,
+        stdio: ["ignore", values.verbose ? "inherit" : "ignore", "inherit"],
+      },
+    );
+    child.on("error", reject);
+    child.on("close", (code) => resolve(code ?? 1));
+  });
+  const wallMs = performance.now() - startedAt;
+
+  let maxRssKb = 0;
+  try {
+    const usage = JSON.parse(await fs.readFile(usageFile, "utf-8")) as {
+      maxRSS: number;
+    };
+    maxRssKb = usage.maxRSS;
+  } catch {
+    // 異常終了した場合は記録されない
+  }
+
+  const stats = server.getStats();
+  const objects = workspace.pageCount + workspace.recordCount;
+  return {
+    phase,
+    exitCode,
+    wallMs,
+    maxRssKb,
+    objects,
+    pagesPerSecond: objects / (wallMs / 1000),
+    calls: stats.calls,
+    totalCalls: Object.values(stats.calls).reduce((sum, n) => sum + n, 0),
+    rateLimited: stats.rateLimited,
+    bytesSent: stats.bytesSent,
+  };
+}
+
+/**
+ * 計測結果を表示
+ */
+function printResult(result: PhaseResult): void {
+  console.log(
+    `${result.phase}: ${(result.wallMs / 1000).toFixed(2)}s, ${result.pagesPerSecond.toFixed(1)} pages/s, peak RSS ${(result.maxRssKb / 1024).toFixed(1)} MB, exit code ${result.exitCode}`,
+  );
+  console.log(
+    `  API calls: ${result.totalCalls} (${result.rateLimited} rate limited), ${(result.bytesSent / 1024 / 1024).toFixed(1)} MB received`,
+  );
+  for (const [endpoint, count] of Object.entries(result.calls).sort(
+    ([, a], [, b]) => b - a,
+  )) {
+    console.log(`    ${endpoint}: ${count}`);
+  }
+}
+
+// ============================================================
+// メイン
+// ============================================================
+async function main() {
+  const phases = values.phases
+    .split(",")
+    .map((p) => p.trim())
+    .filter((p): p is Phase => p === "pull" || p === "push");
+  if (phases.length === 0) {
+    console.error("Error: --phases must list pull and/or push");
+    process.exit(1);
+  }
+
+  const workspace = generateWorkspace({
+    seed: toNumber(values.seed, 1),
+    pages: toNumber(values.pages, 1000),
+    depth: toNumber(values.depth, 4),
+    fanOut: toNumber(values["fan-out"], 8),
+    databases: toNumber(values.databases, 10),
+    databaseRows: toNumber(values.rows, 50),
+    blocksPerPage: toNumber(values.blocks, 20),
+    blockMix: parseBlockMix(values["block-mix"]),
+  });
+  console.log(
+    `Workspace: ${workspace.pageCount} pages, ${workspace.databases.size} databases, ${workspace.recordCount} records, ${workspace.blocks.size} blocks, ${workspace.imageCount} images`,
+  );
+
+  const server = await startMockNotionServer(workspace, {
+    seed: toNumber(values.seed, 1),
+    latencyMs: toNumber(values.latency, 0),
+    jitterMs: toNumber(values.jitter, 0),
+    rateLimitRatio: Math.min(toNumber(values["rate-limit"], 0), 1),
+    imageBytes: toNumber(values["image-kb"], 16) * 1024,
+  });
+  const workDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-benchmark-"));
+  console.log(`Mock Notion server: ${server.url}, working directory: ${workDir}`);
+  console.log("=".repeat(50));
+
+  const results: PhaseResult[] = [];
+  try {
+    for (const phase of phases) {
+      const result = await runPhase(phase, workspace, server, workDir);
+      printResult(result);
+      results.push(result);
+    }
+  } finally {
+    await server.close();
+    if (!values.keep) {
+      await fs.rm(workDir, { recursive: true, force: true });
+    }
+  }
+
+  if (values.json) {
+    await fs.writeFile(values.json, JSON.stringify(results, null, 2), "utf-8");
+    console.log(`Results written to ${values.json}`);
+  }
+  if (results.some((result) => result.exitCode !== 0)) {
+    process.exitCode = 1;
+  }
+}
+
+await main();
@@ -0,0 +1,383 @@
+/**
+ * ベンチマーク用のNotion APIモックサーバー
+ * 合成ワークスペースをnode:httpで返し、遅延と429（レート制限）を注入する。
+ * pull/pushが使うエンドポイント（pages・blocks・databases・data_sources・search）と画像に対応
+ */
+import { createHash } from "node:crypto";
+import { createServer, type IncomingMessage, type ServerResponse } from "node:http";
+import type { AddressInfo } from "node:net";
+import { setTimeout as sleep } from "node:timers/promises";
+import { classifyNotionRequest } from "../shared/notion-fetch.js";
+import {
+  createRandom,
+  toShortId,
+  toUuid,
+  type NotionObject,
+  type Workspace,
+} from "./workspace.js";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+export interface MockServerOptions {
+  /** 各レスポンスの基本遅延（ミリ秒） */
+  latencyMs: number;
+  /** 遅延に加えるランダムな揺らぎの最大値（ミリ秒） */
+  jitterMs: number;
+  /** 429を返す割合（0〜1） */
+  rateLimitRatio: number;
+  /** 429のRetry-After（ミリ秒） */
+  retryAfterMs: number;
+  /** 画像1枚のサイズ（バイト） */
+  imageBytes: number;
+  /** 遅延・429の乱数のシード */
+  seed: number;
+}
+
+export interface MockServerStats {
+  /** エンドポイント → 呼び出し回数（429を返したものを含む） */
+  calls: Record<string, number>;
+  /** 429を返した回数 */
+  rateLimited: number;
+  /** 送信したレスポンスボディのバイト数 */
+  bytesSent: number;
+}
+
+export interface MockNotionServer {
+  /** サーバーのURL（NOTION_API_BASE_URLに設定する） */
+  url: string;
+  getStats(): MockServerStats;
+  resetStats(): void;
+  close(): Promise<void>;
+}
+
+interface MockResponse {
+  status: number;
+  body: unknown;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+export const DEFAULT_SERVER_OPTIONS: MockServerOptions = {
+  latencyMs: 0,
+  jitterMs: 0,
+  rateLimitRatio: 0,
+  retryAfterMs: 200,
+  imageBytes: 16 * 1024,
+  seed: 1,
+};
+
+// 1回の一覧取得で返す最大件数（Notion APIと同じ）
+const MAX_PAGE_SIZE = 100;
+
+// ============================================================
+// レスポンス
+// ============================================================
+
+/**
+ * エラーレスポンス
+ */
+function errorResponse(status: number, code: string, message: string): MockResponse {
+  return { status, body: { object: "error", status, code, message } };
+}
+
+/**
+ * 一覧をカーソル（先頭からの位置）でページ分割
+ */
+function paginate(
+  items: unknown[],
+  cursor: string | null | undefined,
+  pageSize: number | undefined,
+  extra: Record<string, unknown> = {},
+): MockResponse {
+  const start = Number.parseInt(cursor ?? "0", 10) || 0;
+  const size = Math.min(pageSize || MAX_PAGE_SIZE, MAX_PAGE_SIZE);
+  const end = start + size;
+  const hasMore = end < items.length;
+  return {
+    status: 200,
+    body: {
+      object: "list",
+      results: items.slice(start, end),
+      has_more: hasMore,
+      next_cursor: hasMore ? String(end) : null,
+      ...extra,
+    },
+  };
+}
+
+// ============================================================
+// サーバー
+// ============================================================
+
+/**
+ * モックサーバーを起動（ポートは空いているものを使う）
+ */
+export async function startMockNotionServer(
+  workspace: Workspace,
+  overrides: Partial<MockServerOptions> = {},
+): Promise<MockNotionServer> {
+  const options = { ...DEFAULT_SERVER_OPTIONS, ...overrides };
+  const random = createRandom(options.seed);
+  let stats: MockServerStats = { calls: {}, rateLimited: 0, bytesSent: 0 };
+  let origin = "";
+  let appendedBlocks = 0;
+
+  /**
+   * ブロックをレスポンス用に変換（画像のURLにサーバーのURLを付ける）
+   */
+  const toBlockResponse = (block: NotionObject): NotionObject => {
+    if (block.type !== "image") {
+      return block;
+    }
+    const image = block.image as { file: { url: string } };
+    return {
+      ...block,
+      image: {
+        ...image,
+        file: {
+          url: `${origin}${image.file.url}?X-Amz-Signature=benchmark`,
+          expiry_time: "2099-01-01T00:00:00.000Z",
+        },
+      },
+    };
+  };
+
+  const listChildren = (parentId: string): NotionObject[] =>
+    (workspace.children.get(parentId) ?? []).map((id) =>
+      toBlockResponse(workspace.blocks.get(id)!),
+    );
+
+  /**
+   * エンドポイントごとの処理
+   */
+  const handle = (
+    endpoint: string,
+    segments: string[],
+    url: URL,
+    body: Record<string, unknown>,
+  ): MockResponse => {
+    const id = toShortId(segments[1] ?? "");
+
+    switch (endpoint) {
+      case "pages.retrieve": {
+        const page = workspace.pages.get(id);
+        return page
+          ? { status: 200, body: page }
+          : errorResponse(404, "object_not_found", `Page ${id} not found`);
+      }
+      case "blocks.children.list": {
+        if (!workspace.pages.has(id) && !workspace.blocks.has(id)) {
+          return errorResponse(404, "object_not_found", `Block ${id} not found`);
+        }
+        return paginate(
+          listChildren(id),
+          url.searchParams.get("start_cursor"),
+          Number(url.searchParams.get("page_size")),
+          { type: "block", block: {} },
+        );
+      }
+      case "blocks.children.append": {
+        const created = ((body.children as Record<string, unknown>[]) ?? []).map(
+          (child) => {
+            appendedBlocks++;
+            const block: NotionObject = {
+              object: "block",
+              ...child,
+              id: toUuid(
+                createHash("md5")
+                  .update(`appended-${appendedBlocks}`)
+                  .digest("hex"),
+              ),
+              parent: { type: "page_id", page_id: toUuid(id) },
+              created_time: new Date().toISOString(),
+              last_edited_time: new Date().toISOString(),
+              has_children: false,
+              archived: false,
+              in_trash: false,
+            };
+            workspace.blocks.set(toShortId(block.id), block);
+            return block;
+          },
+        );
+        const siblings = workspace.children.get(id) ?? [];
+        // afterなしは末尾、ありはその直後に追加
+        const after = typeof body.after === "string" ? toShortId(body.after) : null;
+        const index = after ? siblings.indexOf(after) + 1 : siblings.length;
+        siblings.splice(
+          index > 0 ? index : siblings.length,
+          0,
+          ...created.map((block) => toShortId(block.id)),
+        );
+        workspace.children.set(id, siblings);
+        return paginate(created, null, created.length || 1);
+      }
+      case "blocks.delete": {
+        const block = workspace.blocks.get(id);
+        if (!block) {
+          return errorResponse(404, "object_not_found", `Block ${id} not found`);
+        }
+        workspace.blocks.delete(id);
+        for (const [parentId, siblings] of workspace.children) {
+          const index = siblings.indexOf(id);
+          if (index >= 0) {
+            siblings.splice(index, 1);
+            workspace.children.set(parentId, siblings);
+            break;
+          }
+        }
+        return { status: 200, body: { ...block, archived: true, in_trash: true } };
+      }
+      case "databases.retrieve": {
+        const database = workspace.databases.get(id);
+        return database
+          ? { status: 200, body: database }
+          : errorResponse(404, "object_not_found", `Database ${id} not found`);
+      }
+      case "dataSources.retrieve": {
+        const dataSource = workspace.dataSources.get(id);
+        return dataSource
+          ? { status: 200, body: dataSource }
+          : errorResponse(404, "object_not_found", `Data source ${id} not found`);
+      }
+      case "dataSources.query": {
+        const recordIds = workspace.records.get(id);
+        if (!recordIds) {
+          return errorResponse(404, "object_not_found", `Data source ${id} not found`);
+        }
+        // last_edited_timeの絞り込みだけに対応
+        const filter = body.filter as
+          | { last_edited_time?: { on_or_after?: string } }
+          | undefined;
+        const since = filter?.last_edited_time?.on_or_after;
+        const records = recordIds
+          .map((recordId) => workspace.pages.get(recordId)!)
+          .filter((record) => !since || record.last_edited_time >= since);
+        return paginate(
+          records,
+          body.start_cursor as string | undefined,
+          body.page_size as number | undefined,
+          { type: "page_or_data_source", page_or_data_source: {} },
+        );
+      }
+      case "search": {
+        const objects = [
+          ...workspace.pages.values(),
+          ...workspace.databases.values(),
+        ].sort((a, b) => b.last_edited_time.localeCompare(a.last_edited_time));
+        return paginate(
+          objects,
+          body.start_cursor as string | undefined,
+          body.page_size as number | undefined,
+          { type: "page_or_data_source", page_or_data_source: {} },
+        );
+      }
+      default:
+        return errorResponse(
+          400,
+          "invalid_request_url",
+          `Unsupported endpoint: ${endpoint}`,
+        );
+    }
+  };
+
+  /**
+   * レスポンスを送信（送信したバイト数を記録）
+   */
+  const send = (
+    res: ServerResponse,
+    status: number,
+    body: Buffer,
+    headers: Record<string, string>,
+  ): void => {
+    stats.bytesSent += body.length;
+    res.writeHead(status, { "Content-Length": String(body.length), ...headers });
+    res.end(body);
+  };
+
+  const onRequest = async (req: IncomingMessage, res: ServerResponse) => {
+    const url = new URL(req.url ?? "/", origin);
+    const method = req.method ?? "GET";
+    const segments = url.pathname.split("/").filter(Boolean);
+    const isAsset = segments[0] === "files";
+    const endpoint = isAsset ? "asset" : classifyNotionRequest(method, url.href);
+    stats.calls[endpoint] = (stats.calls[endpoint] ?? 0) + 1;
+
+    const chunks: Buffer[] = [];
+    for await (const chunk of req) {
+      chunks.push(chunk as Buffer);
+    }
+
+    const delay = options.latencyMs + random() * options.jitterMs;
+    if (delay > 0) {
+      await sleep(delay);
+    }
+
+    if (options.rateLimitRatio > 0 && random() < options.rateLimitRatio) {
+      stats.rateLimited++;
+      send(
+        res,
+        429,
+        Buffer.from(
+          JSON.stringify(
+            errorResponse(429, "rate_limited", "Rate limited by benchmark").body,
+          ),
+        ),
+        {
+          "Content-Type": "application/json",
+          "Retry-After": String(options.retryAfterMs / 1000),
+        },
+      );
+      return;
+    }
+
+    if (isAsset) {
+      // 画像ごとに異なる内容（同じキーなら同じ内容）
+      const seed = createHash("sha256").update(url.pathname).digest();
+      const image = Buffer.alloc(options.imageBytes);
+      for (let i = 0; i < image.length; i += seed.length) {
+        seed.copy(image, i);
+      }
+      send(res, 200, image, { "Content-Type": "image/png" });
+      return;
+    }
+
+    let body: Record<string, unknown> = {};
+    try {
+      body = chunks.length > 0 ? JSON.parse(Buffer.concat(chunks).toString()) : {};
+    } catch {
+      body = {};
+    }
+    // パス: /v1/{resource}/{id}/...
+    const result = handle(endpoint, segments.slice(1), url, body);
+    send(res, result.status, Buffer.from(JSON.stringify(result.body)), {
+      "Content-Type": "application/json",
+    });
+  };
+
+  const server = createServer((req, res) => {
+    onRequest(req, res).catch((e) => {
+      console.error(`Mock server error: ${e}`);
+      res.statusCode = 500;
+      res.end();
+    });
+  });
+  await new Promise<void>((resolve) => server.listen(0, "127.0.0.1", resolve));
+  origin = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+
+  return {
+    url: origin,
+    getStats: () => ({ ...stats, calls: { ...stats.calls } }),
+    resetStats: () => {
+      stats = { calls: {}, rateLimited: 0, bytesSent: 0 };
+    },
+    close: () =>
+      new Promise<void>((resolve, reject) => {
+        server.closeAllConnections();
+        server.close((e) => (e ? reject(e) : resolve()));
+      }),
+  };
+}
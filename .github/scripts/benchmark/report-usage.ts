@@ -0,0 +1,13 @@
+/**
+ * ベンチマーク対象のプロセスに読み込ませ、終了時にリソース使用量を書き出す
+ * （node --import で読み込む。書き出し先は BENCHMARK_USAGE_FILE）
+ */
+import { writeFileSync } from "node:fs";
+
+const usageFile = process.env.BENCHMARK_USAGE_FILE;
+
+if (usageFile) {
+  process.on("exit", () => {
+    writeFileSync(usageFile, JSON.stringify(process.resourceUsage()));
+  });
+}
@@ -0,0 +1,140 @@
+/**
+ * mock-server ユニットテスト
+ * 実際にローカルでサーバーを起動してfetchで確認する
+ */
+import { describe, it, expect, afterEach } from "vitest";
+import {
+  startMockNotionServer,
+  type MockNotionServer,
+} from "../mock-server.js";
+import { generateWorkspace, toUuid } from "../workspace.js";
+
+let server: MockNotionServer | null = null;
+
+afterEach(async () => {
+  await server?.close();
+  server = null;
+});
+
+describe("startMockNotionServer", () => {
+  it("should serve pages and paginated block listings", async () => {
+    const workspace = generateWorkspace({
+      pages: 1,
+      databases: 0,
+      blocksPerPage: 150,
+      blockMix: { paragraph: 1 },
+    });
+    server = await startMockNotionServer(workspace);
+
+    const page = await fetch(
+      `${server.url}/v1/pages/${toUuid(workspace.rootId)}`,
+    );
+    expect(page.status).toBe(200);
+    expect((await page.json()).id).toBe(toUuid(workspace.rootId));
+
+    // ハイフンなしのIDでも引ける
+    const first = await (
+      await fetch(`${server.url}/v1/blocks/${workspace.rootId}/children`)
+    ).json();
+    expect(first.results).toHaveLength(100);
+    expect(first.has_more).toBe(true);
+    const second = await (
+      await fetch(
+        `${server.url}/v1/blocks/${workspace.rootId}/children?start_cursor=${first.next_cursor}`,
+      )
+    ).json();
+    expect(second.results).toHaveLength(50);
+    expect(second.has_more).toBe(false);
+
+    expect(server.getStats().calls).toEqual({
+      "pages.retrieve": 1,
+      "blocks.children.list": 2,
+    });
+  });
+
+  it("should query database records with a last_edited_time filter", async () => {
+    const workspace = generateWorkspace({
+      pages: 1,
+      databases: 1,
+      databaseRows: 20,
+    });
+    server = await startMockNotionServer(workspace);
+    const [dataSourceId] = workspace.dataSources.keys();
+
+    const query = (body: unknown) =>
+      fetch(`${server!.url}/v1/data_sources/${dataSourceId}/query`, {
+        method: "POST",
+        body: JSON.stringify(body),
+      }).then((res) => res.json());
+
+    const all = await query({});
+    expect(all.results).toHaveLength(20);
+    const filtered = await query({
+      filter: {
+        timestamp: "last_edited_time",
+        last_edited_time: { on_or_after: "2099-01-01T00:00:00.000Z" },
+      },
+    });
+    expect(filtered.results).toHaveLength(0);
+  });
+
+  it("should apply appended and deleted blocks to the workspace", async () => {
+    const workspace = generateWorkspace({
+      pages: 1,
+      databases: 0,
+      blocksPerPage: 2,
+      blockMix: { paragraph: 1 },
+    });
+    server = await startMockNotionServer(workspace);
+    const [firstId] = workspace.children.get(workspace.rootId)!;
+
+    await fetch(`${server.url}/v1/blocks/${firstId}`, { method: "DELETE" });
+    await fetch(`${server.url}/v1/blocks/${workspace.rootId}/children`, {
+      method: "PATCH",
+      body: JSON.stringify({
+        children: [
+          { type: "paragraph", paragraph: { rich_text: [] } },
+        ],
+      }),
+    });
+
+    const children = workspace.children.get(workspace.rootId)!;
+    expect(children).toHaveLength(2);
+    expect(children).not.toContain(firstId);
+    expect(server.getStats().calls).toEqual({
+      "blocks.delete": 1,
+      "blocks.children.append": 1,
+    });
+  });
+
+  it("should inject rate limiting with Retry-After", async () => {
+    server = await startMockNotionServer(generateWorkspace({ pages: 1 }), {
+      rateLimitRatio: 1,
+      retryAfterMs: 500,
+    });
+
+    const response = await fetch(`${server.url}/v1/search`, {
+      method: "POST",
+      body: "{}",
+    });
+
+    expect(response.status).toBe(429);
+    expect(response.headers.get("retry-after")).toBe("0.5");
+    expect((await response.json()).code).toBe("rate_limited");
+    expect(server.getStats().rateLimited).toBe(1);
+  });
+
+  it("should serve deterministic image bytes", async () => {
+    server = await startMockNotionServer(generateWorkspace({ pages: 1 }), {
+      imageBytes: 1000,
+    });
+
+    const url = `${server.url}/files/key-1/image.png`;
+    const a = Buffer.from(await (await fetch(url)).arrayBuffer());
+    const b = Buffer.from(await (await fetch(url)).arrayBuffer());
+
+    expect(a).toHaveLength(1000);
+    expect(a.equals(b)).toBe(true);
+    expect(server.getStats().calls.asset).toBe(2);
+  });
+});
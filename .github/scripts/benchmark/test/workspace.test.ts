@@ -0,0 +1,91 @@
+/**
+ * workspace ユニットテスト
+ */
+import { describe, it, expect } from "vitest";
+import {
+  DEFAULT_BLOCK_MIX,
+  createRandom,
+  generateWorkspace,
+  parseBlockMix,
+  toUuid,
+} from "../workspace.js";
+
+describe("createRandom", () => {
+  it("should return the same sequence for the same seed", () => {
+    const a = createRandom(42);
+    const b = createRandom(42);
+    const values = Array.from({ length: 5 }, () => a());
+
+    expect(Array.from({ length: 5 }, () => b())).toEqual(values);
+    expect(values.every((v) => v >= 0 && v < 1)).toBe(true);
+  });
+});
+
+describe("parseBlockMix", () => {
+  it("should parse weights and fall back to the default mix", () => {
+    expect(parseBlockMix("paragraph=3, table=1,bad=x")).toEqual({
+      paragraph: 3,
+      table: 1,
+    });
+    expect(parseBlockMix(undefined)).toBe(DEFAULT_BLOCK_MIX);
+  });
+});
+
+describe("toUuid", () => {
+  it("should format a 32-digit ID as a UUID", () => {
+    expect(toUuid("0123456789abcdef0123456789abcdef")).toBe(
+      "01234567-89ab-cdef-0123-456789abcdef",
+    );
+  });
+});
+
+describe("generateWorkspace", () => {
+  it("should generate the same workspace for the same seed", () => {
+    const options = { pages: 30, databases: 2, databaseRows: 3, seed: 7 };
+    const a = generateWorkspace(options);
+    const b = generateWorkspace(options);
+
+    expect(a.rootId).toBe(b.rootId);
+    expect([...a.blocks.keys()]).toEqual([...b.blocks.keys()]);
+  });
+
+  it("should respect the page count, depth and fan-out", () => {
+    const workspace = generateWorkspace({
+      pages: 50,
+      depth: 2,
+      fanOut: 3,
+      databases: 2,
+      databaseRows: 4,
+    });
+
+    // ルート + 3 + 9 = 13ページで深さの上限に達する
+    expect(workspace.pageCount).toBe(13);
+    expect(workspace.recordCount).toBe(8);
+    expect(workspace.pages.size).toBe(13 + 8);
+    const rootChildPages = workspace.children
+      .get(workspace.rootId)!
+      .map((id) => workspace.blocks.get(id)!)
+      .filter((block) => block.type === "child_page");
+    expect(rootChildPages).toHaveLength(3);
+  });
+
+  it("should generate nested blocks for toggles and tables", () => {
+    const workspace = generateWorkspace({
+      pages: 1,
+      databases: 0,
+      blocksPerPage: 4,
+      blockMix: { toggle: 1, table: 1 },
+    });
+
+    const blocks = workspace.children
+      .get(workspace.rootId)!
+      .map((id) => workspace.blocks.get(id)!);
+    expect(blocks).toHaveLength(4);
+    for (const block of blocks) {
+      expect(block.has_children).toBe(true);
+      expect(
+        workspace.children.get(block.id.replace(/-/g, ""))!.length,
+      ).toBeGreaterThan(0);
+    }
+  });
+});
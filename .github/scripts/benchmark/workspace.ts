@@ -0,0 +1,504 @@
+/**
+ * ベンチマーク用の合成ワークスペース
+ * シードから決定的にページ・データベース・ブロックの木を生成する（同じ設定なら同じワークスペース）
+ */
+
+// ============================================================
+// 型定義
+// ============================================================
+
+export interface WorkspaceOptions {
+  /** 乱数のシード */
+  seed: number;
+  /** 通常のページ数（ルートを含み、DBレコードを除く） */
+  pages: number;
+  /** ページの最大の深さ（ルートが0） */
+  depth: number;
+  /** 1ページあたりの子ページ数 */
+  fanOut: number;
+  /** データベース数（ランダムなページの下に置く） */
+  databases: number;
+  /** 1データベースあたりのレコード数 */
+  databaseRows: number;
+  /** 1ページあたりのブロック数（DBレコードはこの1/4） */
+  blocksPerPage: number;
+  /** ブロックの種類 → 出現割合の重み */
+  blockMix: Record<string, number>;
+}
+
+/**
+ * APIレスポンスと同じ形のオブジェクト
+ */
+export type NotionObject = Record<string, unknown> & {
+  id: string;
+  last_edited_time: string;
+};
+
+export interface Workspace {
+  /** ルートページのID */
+  rootId: string;
+  /** 短縮ID → ページ（DBレコードを含む） */
+  pages: Map<string, NotionObject>;
+  /** 短縮ID → ブロック（子ページ・子DBのブロックはページ・DBと同じID） */
+  blocks: Map<string, NotionObject>;
+  /** 短縮ID（ページ・ブロック） → 子ブロックの短縮ID */
+  children: Map<string, string[]>;
+  /** 短縮ID → データベース */
+  databases: Map<string, NotionObject>;
+  /** 短縮ID → データソース */
+  dataSources: Map<string, NotionObject>;
+  /** データソースの短縮ID → レコードの短縮ID */
+  records: Map<string, string[]>;
+  /** 通常のページ数（DBレコードを除く） */
+  pageCount: number;
+  /** DBレコード数 */
+  recordCount: number;
+  /** 画像ブロック数 */
+  imageCount: number;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+export const DEFAULT_BLOCK_MIX: Record<string, number> = {
+  paragraph: 50,
+  heading_2: 8,
+  bulleted_list_item: 15,
+  to_do: 5,
+  code: 5,
+  toggle: 5,
+  table: 4,
+  image: 8,
+};
+
+export const DEFAULT_WORKSPACE_OPTIONS: WorkspaceOptions = {
+  seed: 1,
+  pages: 1000,
+  depth: 4,
+  fanOut: 8,
+  databases: 10,
+  databaseRows: 50,
+  blocksPerPage: 20,
+  blockMix: DEFAULT_BLOCK_MIX,
+};
+
+// 最終更新日時の基準（ここから乱数で数分ずつずらす）
+const BASE_TIME = Date.parse("2024-01-01T00:00:00.000Z");
+
+const WORDS = [
+  "notion",
+  "sync",
+  "markdown",
+  "page",
+  "block",
+  "database",
+  "record",
+  "render",
+  "queue",
+  "latency",
+  "budget",
+  "ページ",
+  "同期",
+  "変換",
+  "テスト",
+];
+
+// ============================================================
+// 乱数
+// ============================================================
+
+/**
+ * シード付きの疑似乱数（mulberry32、0以上1未満）
+ */
+export function createRandom(seed: number): () => number {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+/**
+ * "paragraph=50,table=5" の形式のブロック構成を読み込む（不正な値は無視）
+ */
+export function parseBlockMix(value: string | undefined): Record<string, number> {
+  const mix: Record<string, number> = {};
+  for (const pair of (value ?? "").split(",")) {
+    const [type, weight] = pair.split("=").map((s) => s.trim());
+    const parsed = Number.parseFloat(weight ?? "");
+    if (type && Number.isFinite(parsed) && parsed > 0) {
+      mix[type] = parsed;
+    }
+  }
+  return Object.keys(mix).length > 0 ? mix : DEFAULT_BLOCK_MIX;
+}
+
+// ============================================================
+// 生成
+// ============================================================
+
+/**
+ * ワークスペースを生成
+ */
+export function generateWorkspace(
+  overrides: Partial<WorkspaceOptions> = {},
+): Workspace {
+  const options = { ...DEFAULT_WORKSPACE_OPTIONS, ...overrides };
+  const random = createRandom(options.seed);
+
+  const workspace: Workspace = {
+    rootId: "",
+    pages: new Map(),
+    blocks: new Map(),
+    children: new Map(),
+    databases: new Map(),
+    dataSources: new Map(),
+    records: new Map(),
+    pageCount: 0,
+    recordCount: 0,
+    imageCount: 0,
+  };
+
+  const newId = (): string => {
+    let hex = "";
+    for (let i = 0; i < 4; i++) {
+      hex += Math.floor(random() * 0x100000000)
+        .toString(16)
+        .padStart(8, "0");
+    }
+    return hex;
+  };
+  const timestamp = (): string =>
+    new Date(BASE_TIME + Math.floor(random() * 60 * 24 * 30) * 60_000)
+      .toISOString();
+  const text = (minWords: number, maxWords: number): string => {
+    const count = minWords + Math.floor(random() * (maxWords - minWords + 1));
+    return Array.from(
+      { length: count },
+      () => WORDS[Math.floor(random() * WORDS.length)],
+    ).join(" ");
+  };
+
+  const mixEntries = Object.entries(options.blockMix);
+  const mixTotal = mixEntries.reduce((sum, [, weight]) => sum + weight, 0);
+  const pickBlockType = (): string => {
+    let r = random() * mixTotal;
+    for (const [type, weight] of mixEntries) {
+      r -= weight;
+      if (r < 0) {
+        return type;
+      }
+    }
+    return mixEntries[mixEntries.length - 1][0];
+  };
+
+  const appendChild = (parentId: string, block: NotionObject): void => {
+    const id = toShortId(block.id);
+    workspace.blocks.set(id, block);
+    const siblings = workspace.children.get(parentId) ?? [];
+    siblings.push(id);
+    workspace.children.set(parentId, siblings);
+  };
+
+  const createBlock = (
+    parentId: string,
+    type: string,
+    content: Record<string, unknown>,
+    hasChildren: boolean = false,
+  ): NotionObject => ({
+    object: "block",
+    id: toUuid(newId()),
+    parent: { type: "block_id", block_id: toUuid(parentId) },
+    created_time: new Date(BASE_TIME).toISOString(),
+    last_edited_time: timestamp(),
+    created_by: { object: "user", id: "benchmark-user" },
+    last_edited_by: { object: "user", id: "benchmark-user" },
+    has_children: hasChildren,
+    archived: false,
+    in_trash: false,
+    type,
+    [type]: content,
+  });
+
+  const addContentBlocks = (pageId: string, count: number): void => {
+    for (let i = 0; i < count; i++) {
+      const type = pickBlockType();
+      switch (type) {
+        case "toggle": {
+          const toggle = createBlock(
+            pageId,
+            "toggle",
+            { rich_text: [createRichText(text(2, 5))], color: "default" },
+            true,
+          );
+          appendChild(pageId, toggle);
+          for (let j = 0; j < 2; j++) {
+            appendChild(
+              toShortId(toggle.id),
+              createBlock(toShortId(toggle.id), "paragraph", {
+                rich_text: [createRichText(text(5, 20))],
+                color: "default",
+              }),
+            );
+          }
+          break;
+        }
+        case "table": {
+          const table = createBlock(
+            pageId,
+            "table",
+            { table_width: 3, has_column_header: true, has_row_header: false },
+            true,
+          );
+          appendChild(pageId, table);
+          for (let j = 0; j < 4; j++) {
+            appendChild(
+              toShortId(table.id),
+              createBlock(toShortId(table.id), "table_row", {
+                cells: [0, 1, 2].map(() => [createRichText(text(1, 3))]),
+              }),
+            );
+          }
+          break;
+        }
+        case "image": {
+          const key = toUuid(newId());
+          workspace.imageCount++;
+          appendChild(
+            pageId,
+            createBlock(pageId, "image", {
+              type: "file",
+              // モックサーバーが自身のURLを付けて返す
+              file: { url: `/files/${key}/image-${workspace.imageCount}.png` },
+              caption: [],
+            }),
+          );
+          break;
+        }
+        case "to_do":
+          appendChild(
+            pageId,
+            createBlock(pageId, "to_do", {
+              rich_text: [createRichText(text(3, 10))],
+              checked: random() < 0.5,
+              color: "default",
+            }),
+          );
+          break;
+        case "code":
+          appendChild(
+            pageId,
+            createBlock(pageId, "code", {
+              rich_text: [createRichText(text(10, 40))],
+              language: "typescript",
+              caption: [],
+            }),
+          );
+          break;
+        default:
+          appendChild(
+            pageId,
+            createBlock(pageId, type, {
+              rich_text: [createRichText(text(5, 30))],
+              color: "default",
+            }),
+          );
+      }
+    }
+  };
+
+  const createPage = (
+    parent: Record<string, unknown>,
+    properties: Record<string, unknown>,
+  ): NotionObject => ({
+    object: "page",
+    id: toUuid(newId()),
+    created_time: new Date(BASE_TIME).toISOString(),
+    last_edited_time: timestamp(),
+    created_by: { object: "user", id: "benchmark-user" },
+    last_edited_by: { object: "user", id: "benchmark-user" },
+    cover: null,
+    icon: null,
+    parent,
+    archived: false,
+    in_trash: false,
+    is_locked: false,
+    properties,
+    url: "https://www.notion.so/benchmark",
+    public_url: null,
+  });
+
+  // ページの木（幅優先で深さ・子ページ数の上限まで）
+  const root = createPage(
+    { type: "workspace", workspace: true },
+    titleProperty("title", "Benchmark Root"),
+  );
+  workspace.rootId = toShortId(root.id);
+  workspace.pages.set(workspace.rootId, root);
+  addContentBlocks(workspace.rootId, options.blocksPerPage);
+  workspace.pageCount = 1;
+
+  const pageIds: string[] = [workspace.rootId];
+  const queue: { id: string; depth: number }[] = [
+    { id: workspace.rootId, depth: 0 },
+  ];
+  while (queue.length > 0 && workspace.pageCount < options.pages) {
+    const parent = queue.shift()!;
+    if (parent.depth >= options.depth) {
+      continue;
+    }
+    for (
+      let i = 0;
+      i < options.fanOut && workspace.pageCount < options.pages;
+      i++
+    ) {
+      const title = `Page ${workspace.pageCount}`;
+      const page = createPage(
+        { type: "page_id", page_id: toUuid(parent.id) },
+        titleProperty("title", title),
+      );
+      const id = toShortId(page.id);
+      workspace.pages.set(id, page);
+      addContentBlocks(id, options.blocksPerPage);
+      appendChild(parent.id, {
+        ...createBlock(parent.id, "child_page", { title }),
+        id: page.id,
+        last_edited_time: page.last_edited_time,
+      });
+      workspace.pageCount++;
+      pageIds.push(id);
+      queue.push({ id, depth: parent.depth + 1 });
+    }
+  }
+
+  // データベースとレコード
+  for (let n = 0; n < options.databases; n++) {
+    const parentId = pageIds[Math.floor(random() * pageIds.length)];
+    const title = `Database ${n}`;
+    const databaseId = toUuid(newId());
+    const dataSourceId = toUuid(newId());
+    const editedTime = timestamp();
+
+    workspace.databases.set(toShortId(databaseId), {
+      object: "database",
+      id: databaseId,
+      title: [createRichText(title)],
+      description: [],
+      parent: { type: "page_id", page_id: toUuid(parentId) },
+      created_time: new Date(BASE_TIME).toISOString(),
+      last_edited_time: editedTime,
+      data_sources: [{ id: dataSourceId, name: title }],
+      is_inline: false,
+      in_trash: false,
+      archived: false,
+      url: "https://www.notion.so/benchmark",
+      public_url: null,
+    });
+    workspace.dataSources.set(toShortId(dataSourceId), {
+      object: "data_source",
+      id: dataSourceId,
+      parent: { type: "database_id", database_id: databaseId },
+      last_edited_time: editedTime,
+      properties: {
+        Name: { id: "title", name: "Name", type: "title", title: {} },
+        Status: { id: "status", name: "Status", type: "select", select: {} },
+        Points: { id: "points", name: "Points", type: "number", number: {} },
+        Done: { id: "done", name: "Done", type: "checkbox", checkbox: {} },
+      },
+    });
+    appendChild(parentId, {
+      ...createBlock(parentId, "child_database", { title }),
+      id: databaseId,
+      last_edited_time: editedTime,
+    });
+
+    const recordIds: string[] = [];
+    for (let i = 0; i < options.databaseRows; i++) {
+      const record = createPage(
+        { type: "data_source_id", data_source_id: dataSourceId },
+        {
+          ...titleProperty("Name", `Record ${n}-${i}`),
+          Status: {
+            id: "status",
+            type: "select",
+            select: {
+              id: "option",
+              name: ["Todo", "Doing", "Done"][Math.floor(random() * 3)],
+              color: "default",
+            },
+          },
+          Points: {
+            id: "points",
+            type: "number",
+            number: Math.floor(random() * 100),
+          },
+          Done: { id: "done", type: "checkbox", checkbox: random() < 0.5 },
+        },
+      );
+      const id = toShortId(record.id);
+      workspace.pages.set(id, record);
+      addContentBlocks(id, Math.ceil(options.blocksPerPage / 4));
+      recordIds.push(id);
+    }
+    workspace.records.set(toShortId(dataSourceId), recordIds);
+    workspace.recordCount += recordIds.length;
+  }
+
+  return workspace;
+}
+
+// ============================================================
+// ヘルパー
+// ============================================================
+
+/**
+ * ハイフンなしのIDに変換
+ */
+export function toShortId(id: string): string {
+  return id.replace(/-/g, "");
+}
+
+/**
+ * 32桁のIDをUUID形式（8-4-4-4-12）に変換
+ */
+export function toUuid(id: string): string {
+  const hex = toShortId(id);
+  return [
+    hex.slice(0, 8),
+    hex.slice(8, 12),
+    hex.slice(12, 16),
+    hex.slice(16, 20),
+    hex.slice(20),
+  ].join("-");
+}
+
+/**
+ * プレーンテキストのrich_textを作成
+ */
+function createRichText(content: string): Record<string, unknown> {
+  return {
+    type: "text",
+    text: { content, link: null },
+    annotations: {
+      bold: false,
+      italic: false,
+      strikethrough: false,
+      underline: false,
+      code: false,
+      color: "default",
+    },
+    plain_text: content,
+    href: null,
+  };
+}
+
+/**
+ * タイトルプロパティを作成
+ */
+function titleProperty(name: string, title: string): Record<string, unknown> {
+  return { [name]: { id: "title", type: "title", title: [createRichText(title)] } };
+}
@@ -0,0 +1,377 @@
+/**
+ * 画像ダウンロードパイプライン
+ * ワークスペース全体で1つの画像ストアに、内容のSHA-256で名前を付けて保存する。
+ * Markdownの描画とは独立したワーカープールで画像をディスクに直接ストリーミングする
+ */
+import { createHash } from "node:crypto";
+import { createWriteStream } from "node:fs";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import { Readable } from "node:stream";
+import { pipeline } from "node:stream/promises";
+import type { ReadableStream as WebReadableStream } from "node:stream/web";
+import { fetchAsset } from "../shared/notion-fetch.js";
+import { logDebug, logWarn } from "../shared/logger.js";
+import { IdleTimeoutError, retryOnIdleTimeout } from "../shared/retry.js";
+import { removePaths } from "./cleanup.js";
+import { linkSpan, withSpan, type SpanLink } from "./tracing.js";
+import { parsePositiveInt } from "./utils.js";
+import { createWorkQueue } from "./work-queue.js";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+/**
+ * ダウンロードする画像
+ */
+export interface AssetTarget {
+  url: string;
+  /** 画像の識別キー（NotionのファイルUUID） */
+  key: string;
+  /** 元のファイル名（ファイル名に使えない文字は置換済み） */
+  safeName: string;
+  /** この画像を参照するMarkdownの出力ディレクトリ */
+  outputDirs: Set<string>;
+  /** ダウンロードを予約したスパン（トレース用） */
+  link?: SpanLink | null;
+}
+
+/**
+ * ダウンロード結果
+ */
+export interface AssetResult {
+  url: string;
+  /** 保存先の絶対パス（失敗時はnull） */
+  filePath: string | null;
+  outputDirs: Set<string>;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+// 画像を並列にダウンロードするワーカー数
+const ASSET_CONCURRENCY = parsePositiveInt(
+  process.env.NOTION_ASSET_CONCURRENCY,
+  4,
+);
+
+// 画像の受信がこの時間止まったらダウンロードをやり直す（ミリ秒）
+const ASSET_IDLE_TIMEOUT_MS = parsePositiveInt(
+  process.env.NOTION_ASSET_IDLE_TIMEOUT_MS,
+  30_000,
+);
+
+// ダウンロード中の一時ファイルの拡張子
+const TEMP_SUFFIX = ".download";
+
+// 旧形式（uuid_ファイル名）の画像のファイル名
+const LEGACY_FILENAME_PATTERN =
+  /^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})_/i;
+
+// ============================================================
+// 画像ストア
+// ============================================================
+let storeDir: string | null = null;
+let persistedIndex: Record<string, string> = {};
+let storeLoaded = false;
+
+// 画像キー → ストア内のファイル名
+const assetIndex = new Map<string, string>();
+// ストア内に存在するファイル名
+const storedFiles = new Set<string>();
+
+/**
+ * 画像ストアの場所と前回の索引（マニフェストに保存したもの）を設定
+ */
+export function configureAssetStore(
+  dir: string,
+  previousIndex: Record<string, string> = {},
+): void {
+  storeDir = dir;
+  persistedIndex = previousIndex;
+  storeLoaded = false;
+}
+
+/**
+ * 画像ストアの索引を読み込む（実行中に1回だけディレクトリを走査）
+ * ストアが未設定の場合はdefaultDirを使う
+ */
+export async function loadAssetStore(defaultDir: string): Promise<void> {
+  storeDir ??= defaultDir;
+  if (storeLoaded) {
+    return;
+  }
+  storeLoaded = true;
+  assetIndex.clear();
+  storedFiles.clear();
+
+  let files: string[] = [];
+  try {
+    files = await fs.readdir(storeDir);
+  } catch {
+    // ストアがまだない場合は空
+  }
+
+  for (const file of files) {
+    if (file.endsWith(TEMP_SUFFIX)) {
+      continue;
+    }
+    storedFiles.add(file);
+    // 旧形式（uuid_ファイル名）の画像もUUIDで引けるようにする
+    // （新形式のハッシュの接頭辞は索引に入れない）
+    const legacy = LEGACY_FILENAME_PATTERN.exec(file);
+    if (legacy) {
+      assetIndex.set(legacy[1], file);
+    }
+  }
+
+  for (const [key, file] of Object.entries(persistedIndex)) {
+    if (storedFiles.has(file)) {
+      assetIndex.set(key, file);
+    }
+  }
+}
+
+/**
+ * 画像ストアの索引を取得（マニフェストに保存する）
+ * ストアを読み込まなかった実行（変更のない差分同期など）は前回の索引を引き継ぐ
+ */
+export function getAssetIndex(): Record<string, string> {
+  const entries = storeLoaded
+    ? [...assetIndex.entries()]
+    : Object.entries(persistedIndex);
+  return Object.fromEntries(entries.sort(([a], [b]) => a.localeCompare(b)));
+}
+
+/**
+ * どのページからも参照されていない画像をストアから削除し、削除した数を返す
+ * 参照されている画像キーから索引でファイル名を引き、それ以外のファイルと索引のエントリを削除する
+ * （ストアを読み込まなかった実行・ダウンロードしない実行では何もしない）
+ */
+export async function pruneAssetStore(
+  referencedKeys: Set<string>,
+): Promise<number> {
+  if (!storeDir || !storeLoaded || !downloadsEnabled) {
+    return 0;
+  }
+
+  const referencedFiles = new Set<string>();
+  for (const [key, file] of assetIndex) {
+    if (referencedKeys.has(key)) {
+      referencedFiles.add(file);
+    } else {
+      assetIndex.delete(key);
+    }
+  }
+  const unreferenced = [...storedFiles].filter(
+    (file) => !referencedFiles.has(file),
+  );
+  for (const file of unreferenced) {
+    storedFiles.delete(file);
+  }
+  return removePaths(
+    unreferenced.map((file) => path.join(storeDir!, file)),
+    storeDir,
+    "unreferenced image",
+  );
+}
+
+// ============================================================
+// 画像の識別
+// ============================================================
+
+/**
+ * 画像URLから識別キーとファイル名を決定
+ * Notion S3 URLの形式（/.../uuid/filename）からUUIDを取り出す
+ */
+export function resolveAsset(url: string): { key: string; safeName: string } {
+  const parsed = new URL(url);
+  const pathParts = parsed.pathname.split("/");
+
+  let key = "";
+  let originalName = "image.png";
+
+  if (pathParts.length >= 2) {
+    key = pathParts[pathParts.length - 2] ?? "";
+    originalName = decodeURIComponent(
+      pathParts[pathParts.length - 1] || "image.png",
+    );
+  }
+  if (!key) {
+    // フォールバック: 署名を除いたURLのハッシュを使用
+    key = createHash("md5")
+      .update(`${parsed.origin}${parsed.pathname}`)
+      .digest("hex")
+      .slice(0, 12);
+  }
+
+  return { key, safeName: originalName.replace(/[<>:"/\\|?*]/g, "_") };
+}
+
+/**
+ * Markdownの出力ディレクトリからストア内ファイルへの相対リンク
+ */
+export function toAssetLink(outputDir: string, filePath: string): string {
+  return path.relative(outputDir, filePath).split(path.sep).join("/");
+}
+
+// ============================================================
+// ダウンロード
+// ============================================================
+
+// 画像キー → ダウンロード予約中の対象（同じ画像の重複ダウンロードを防ぐ）
+const scheduled = new Map<string, AssetTarget>();
+let results: AssetResult[] = [];
+
+// falseの場合はストアにある画像だけリンクし、新しい画像はダウンロードしない
+let downloadsEnabled = true;
+
+/**
+ * 画像のダウンロードを止める（スナップショットからの再出力でネットワークを使わないため）
+ */
+export function disableAssetDownloads(): void {
+  downloadsEnabled = false;
+}
+
+const queue = createWorkQueue<AssetTarget>(ASSET_CONCURRENCY, async (target) => {
+  let filePath: string | null = null;
+  try {
+    filePath = await withSpan("downloadImage", () => downloadAsset(target), {
+      link: target.link,
+      args: { name: target.safeName },
+    });
+  } catch (e) {
+    logWarn(`    ⚠️ Image download error: ${e}`, { url: target.url });
+  }
+  results.push({ url: target.url, filePath, outputDirs: target.outputDirs });
+});
+
+/**
+ * 画像をダウンロードしてストアに保存（受信が止まった場合は再試行）
+ */
+async function downloadAsset(target: AssetTarget): Promise<string> {
+  logDebug(`    📥 Downloading: ${target.safeName}`, {
+    event: "download",
+    name: target.safeName,
+  });
+  return retryOnIdleTimeout(() => streamAsset(target));
+}
+
+/**
+ * 画像を一時ファイルにストリーミングしながらハッシュを計算し、
+ * 内容のハッシュを含むファイル名にリネームする（同じ内容は1ファイルにまとまる）
+ * ヘッダー受信後はリクエストのタイムアウトが効かないので、受信が止まったら中断する
+ */
+async function streamAsset(target: AssetTarget): Promise<string> {
+  const dir = storeDir!;
+  const response = await fetchAsset(target.url);
+  if (!response.ok || !response.body) {
+    await response.body?.cancel();
+    throw new Error(`HTTP ${response.status}`);
+  }
+
+  await fs.mkdir(dir, { recursive: true });
+  const tempPath = path.join(
+    dir,
+    `${target.key}.${process.pid}${TEMP_SUFFIX}`,
+  );
+  const hash = createHash("sha256");
+  const controller = new AbortController();
+  let idleTimer: NodeJS.Timeout | undefined;
+  const resetIdleTimer = (): void => {
+    clearTimeout(idleTimer);
+    idleTimer = setTimeout(
+      () => controller.abort(new IdleTimeoutError(ASSET_IDLE_TIMEOUT_MS)),
+      ASSET_IDLE_TIMEOUT_MS,
+    );
+  };
+
+  try {
+    resetIdleTimer();
+    await pipeline(
+      Readable.fromWeb(response.body as WebReadableStream<Uint8Array>),
+      async function* (source: AsyncIterable<Buffer>) {
+        for await (const chunk of source) {
+          resetIdleTimer();
+          hash.update(chunk);
+          yield chunk;
+        }
+      },
+      createWriteStream(tempPath),
+      { signal: controller.signal },
+    );
+    clearTimeout(idleTimer);
+
+    const filename = `${hash.digest("hex").slice(0, 16)}_${target.safeName}`;
+    if (storedFiles.has(filename)) {
+      // 同じ内容の画像が既にある
+      await fs.rm(tempPath, { force: true });
+    } else {
+      await fs.rename(tempPath, path.join(dir, filename));
+      storedFiles.add(filename);
+    }
+    assetIndex.set(target.key, filename);
+    return path.join(dir, filename);
+  } catch (e) {
+    clearTimeout(idleTimer);
+    await fs.rm(tempPath, { force: true });
+    // 受信が止まった中断は再試行できるIdleTimeoutErrorとして投げ直す
+    if (controller.signal.reason instanceof IdleTimeoutError) {
+      throw controller.signal.reason;
+    }
+    throw e;
+  }
+}
+
+/**
+ * 画像を参照するMarkdownに書くリンクを返す
+ * ストアにある画像は相対パスを返し、ない場合は元のURLを返してダウンロードを予約する
+ * （ダウンロード完了後にflushAssetDownloads()の結果でリンクを差し替える）
+ */
+export function scheduleAssetDownload(url: string, outputDir: string): string {
+  let asset: { key: string; safeName: string };
+  try {
+    asset = resolveAsset(url);
+  } catch (e) {
+    logWarn(`    ⚠️ Image download error: ${e}`, { url });
+    return url;
+  }
+
+  const stored = assetIndex.get(asset.key);
+  if (stored && storeDir) {
+    return toAssetLink(outputDir, path.join(storeDir, stored));
+  }
+  if (!downloadsEnabled) {
+    return url;
+  }
+
+  const pending = scheduled.get(asset.key);
+  if (pending) {
+    pending.outputDirs.add(outputDir);
+    // 同じ画像でも署名付きURLはページごとに異なる
+    return pending.url;
+  }
+
+  const target: AssetTarget = {
+    url,
+    ...asset,
+    outputDirs: new Set([outputDir]),
+    link: linkSpan(),
+  };
+  scheduled.set(asset.key, target);
+  queue.push(target);
+  return url;
+}
+
+/**
+ * 予約済みのダウンロードがすべて終わるまで待ち、結果を返す
+ */
+export async function flushAssetDownloads(): Promise<AssetResult[]> {
+  await queue.onIdle();
+  const finished = results;
+  results = [];
+  scheduled.clear();
+  return finished;
+}
@@ -0,0 +1,244 @@
+/**
+ * 削除検出
+ * 前回のマニフェストにあって今回処理されなかったページ・データベースの出力を削除する。
+ * マニフェストがない場合などは出力ディレクトリ全体を走査する修復モードを使う。
+ * タイトル変更で古くなった出力を探すためのディレクトリ索引もここで管理する
+ */
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import { logDebug } from "../shared/logger.js";
+import type { ManifestEntry } from "./manifest.js";
+import { forgetCreatedDirs, runFsTask } from "./output-writer.js";
+import { incrementStat } from "./sync-stats.js";
+import { extractIdFromName } from "./utils.js";
+
+// ============================================================
+// マニフェストによる削除検出
+// ============================================================
+
+/**
+ * 削除するパスを決定
+ * 処理されなかったIDの出力ファイルと、子ページ・レコード用のフォルダ（拡張子を除いたパス）を返す。
+ * 削除するフォルダの配下にあるパスは含めない
+ */
+export function planDeletions(
+  previousEntries: Record<string, ManifestEntry>,
+  processedIds: Set<string>,
+  outputDir: string,
+): string[] {
+  const root = path.resolve(outputDir) + path.sep;
+  const targets = new Set<string>();
+
+  for (const [id, entry] of Object.entries(previousEntries)) {
+    if (processedIds.has(id)) {
+      continue;
+    }
+    // 出力ディレクトリの外は触らない
+    if (!path.resolve(entry.path).startsWith(root)) {
+      continue;
+    }
+    targets.add(entry.path);
+    targets.add(entry.path.replace(/\.(md|csv)$/, ""));
+  }
+
+  // 親フォルダごと消えるパスを除く
+  return [...targets].sort().filter((target) => {
+    for (let dir = path.dirname(target); ; dir = path.dirname(dir)) {
+      if (targets.has(dir)) {
+        return false;
+      }
+      if (dir === path.dirname(dir)) {
+        return true;
+      }
+    }
+  });
+}
+
+/**
+ * 指定したパスをファイル操作プールで並列に削除し、空になった親フォルダも削除
+ * 削除したパスの数を返す（reasonはログに表示する削除理由）
+ */
+export async function removePaths(
+  paths: string[],
+  outputDir: string,
+  reason: string = "removed from Notion",
+): Promise<number> {
+  let removed = 0;
+  await Promise.all(
+    paths.map((target) =>
+      runFsTask(async () => {
+        try {
+          await fs.lstat(target);
+        } catch {
+          // 既にない
+          return;
+        }
+        await fs.rm(target, { recursive: true, force: true });
+        removed++;
+        incrementStat("filesRemoved");
+        logDebug(`🗑️  Deleted (${reason}): ${target}`, {
+          event: "delete",
+          path: target,
+          reason,
+        });
+      }),
+    ),
+  );
+  forgetCreatedDirs();
+
+  // 深いフォルダから順に、空になった親フォルダを削除
+  const root = path.resolve(outputDir);
+  const parents = [...new Set(paths.map((p) => path.dirname(p)))].sort(
+    (a, b) => b.length - a.length,
+  );
+  for (const parent of parents) {
+    let dir = parent;
+    while (path.resolve(dir).startsWith(root + path.sep)) {
+      try {
+        // 空でなければ失敗する
+        await fs.rmdir(dir);
+        logDebug(`🗑️  Deleted (empty directory): ${path.basename(dir)}/`, {
+          event: "delete",
+          path: dir,
+        });
+      } catch {
+        break;
+      }
+      dir = path.dirname(dir);
+    }
+  }
+
+  return removed;
+}
+
+// ============================================================
+// ディレクトリ索引
+// ============================================================
+
+// ディレクトリ → (ID → そのIDを名前に含むファイル/フォルダ名)
+const directoryIndex = new Map<string, Promise<Map<string, string[]>>>();
+
+/**
+ * ディレクトリを読み込み、名前に含まれるIDで索引を作成
+ */
+async function readDirectoryIndex(dir: string): Promise<Map<string, string[]>> {
+  const index = new Map<string, string[]>();
+  let names: string[] = [];
+  try {
+    names = await fs.readdir(dir);
+  } catch {
+    // ディレクトリがまだない場合は空
+  }
+
+  for (const name of names) {
+    const id = extractIdFromName(name);
+    if (id) {
+      index.set(id, [...(index.get(id) ?? []), name]);
+    }
+  }
+  return index;
+}
+
+/**
+ * ディレクトリ内で指定したIDを名前に含むファイル/フォルダ名を取得
+ * 各ディレクトリは実行中に1回だけ読み込み、以降は索引から引く
+ */
+export async function findOutputsById(
+  dir: string,
+  id: string,
+): Promise<string[]> {
+  const key = path.resolve(dir);
+  let index = directoryIndex.get(key);
+  if (!index) {
+    index = readDirectoryIndex(dir);
+    directoryIndex.set(key, index);
+  }
+  return (await index).get(id) ?? [];
+}
+
+/**
+ * ディレクトリ索引をクリア
+ */
+export function resetDirectoryIndex(): void {
+  directoryIndex.clear();
+}
+
+// ============================================================
+// 修復モード（出力ディレクトリ全体の走査）
+// ============================================================
+
+/**
+ * 出力ディレクトリ全体を走査し、処理されなかったIDのファイル/フォルダを削除
+ * マニフェストに記録されていない古い出力も検出できる。
+ * preservedIdsのフォルダ（取得に失敗したページの配下）は中身を走査せずに残す。
+ * フォルダ自体を削除した（空になった）場合はtrueを返す
+ */
+export async function sweepDeletedPages(
+  dir: string,
+  processedIds: Set<string>,
+  preservedIds: Set<string> = new Set(),
+): Promise<boolean> {
+  let entries;
+  try {
+    entries = await fs.readdir(dir, { withFileTypes: true });
+  } catch {
+    return false;
+  }
+
+  const subdirs: string[] = [];
+  const deleted: string[] = [];
+  for (const entry of entries) {
+    // imagesフォルダはスキップ
+    if (entry.name === "images") {
+      continue;
+    }
+
+    const id = extractIdFromName(entry.name);
+    const fullPath = path.join(dir, entry.name);
+
+    if (id && preservedIds.has(id)) {
+      continue;
+    }
+    if (id && !processedIds.has(id)) {
+      // このIDは処理されなかった = Notionから削除された
+      deleted.push(fullPath);
+      logDebug(
+        `🗑️  Deleted (removed from Notion): ${entry.name}${entry.isDirectory() ? "/" : ""}`,
+        { event: "delete", path: fullPath, reason: "removed from Notion" },
+      );
+    } else if (entry.isDirectory()) {
+      subdirs.push(fullPath);
+    }
+  }
+
+  incrementStat("filesRemoved", deleted.length);
+
+  // 兄弟のファイル・フォルダは並列に処理
+  const [, removedSubdirs] = await Promise.all([
+    Promise.all(
+      deleted.map((p) =>
+        runFsTask(() => fs.rm(p, { recursive: true, force: true })),
+      ),
+    ),
+    Promise.all(
+      subdirs.map((p) => sweepDeletedPages(p, processedIds, preservedIds)),
+    ),
+  ]);
+
+  // 空になったフォルダを削除（readdirをやり直さずに判定）
+  const remaining =
+    entries.length - deleted.length - removedSubdirs.filter(Boolean).length;
+  if (remaining > 0) {
+    return false;
+  }
+  try {
+    await fs.rmdir(dir);
+    logDebug(`🗑️  Deleted (empty directory): ${path.basename(dir)}/`, {
+      event: "delete",
+      path: dir,
+    });
+    return true;
+  } catch {
+    return false;
+  }
+}
@@ -0,0 +1,155 @@
+/**
+ * データベースのCSVを逐次書き出すライター
+ * dataSources.queryの結果を受け取った順に書き込み、全レコードをメモリに溜めない。
+ * ファイル操作は他の出力と同じファイル操作プールで実行する
+ */
+import { createHash } from "node:crypto";
+import { createWriteStream, type WriteStream } from "node:fs";
+import * as fs from "node:fs/promises";
+import { once } from "node:events";
+import * as path from "node:path";
+import type { PageObjectResponse } from "@notionhq/client/build/src/api-endpoints";
+import { ensureDir, isOutputUnchanged, runFsTask } from "./output-writer.js";
+import { incrementStat } from "./sync-stats.js";
+import { escapeCsvField, getCsvHeaders, recordToCsvRow } from "./utils.js";
+
+// ============================================================
+// 定数
+// ============================================================
+
+// この大きさまで行をためてから、ファイル操作プールで書き込む（バイト）
+const FLUSH_BYTES = 64 * 1024;
+
+// ============================================================
+// 型定義
+// ============================================================
+export interface CsvWriter {
+  /** レコードを1行書き込む（最初のレコードでヘッダーを決定してファイルを開く） */
+  write(record: PageObjectResponse): Promise<void>;
+  /**
+   * 書き込みを完了してファイルを置き換え、内容のSHA-256を返す（レコードがなければnull）
+   * 内容が前回（previousHash、なければ既存ファイル）と同じ場合はファイルを置き換えない
+   */
+  close(previousHash?: string): Promise<string | null>;
+  /** 書きかけの一時ファイルを破棄 */
+  abort(): Promise<void>;
+  /** 書き込んだレコード数 */
+  readonly rowCount: number;
+  /** CSVのヘッダー（最初のレコードを書き込むまでは空） */
+  readonly headers: string[];
+}
+
+// ============================================================
+// ライター
+// ============================================================
+
+/**
+ * CSVライターを作成
+ * 一時ファイルに書き込み、close()でリネームする（途中で失敗しても前回のCSVが残る）
+ */
+export function createCsvWriter(csvPath: string): CsvWriter {
+  const tempPath = `${csvPath}.${process.pid}.tmp`;
+  const hash = createHash("sha256");
+  let stream: WriteStream | null = null;
+  let streamError: unknown = null;
+  let headers: string[] = [];
+  let rowCount = 0;
+  let buffered: string[] = [];
+  let bufferedBytes = 0;
+
+  // ためた行をプールで書き込む（書き込みが追いつかない場合はバッファが空くまで待つ）
+  const flush = async (): Promise<void> => {
+    if (buffered.length === 0) {
+      return;
+    }
+    const chunk = buffered.join("");
+    buffered = [];
+    bufferedBytes = 0;
+    await runFsTask(async () => {
+      if (streamError) {
+        throw streamError;
+      }
+      if (!stream!.write(chunk)) {
+        await once(stream!, "drain");
+      }
+    });
+  };
+
+  const writeLine = async (line: string): Promise<void> => {
+    if (streamError) {
+      throw streamError;
+    }
+    const chunk = line + "\n";
+    hash.update(chunk);
+    buffered.push(chunk);
+    bufferedBytes += Buffer.byteLength(chunk);
+    if (bufferedBytes >= FLUSH_BYTES) {
+      await flush();
+    }
+  };
+
+  const closeStream = async (): Promise<void> => {
+    if (!stream) {
+      return;
+    }
+    const closing = once(stream, "close");
+    stream.end();
+    await closing;
+  };
+
+  return {
+    async write(record: PageObjectResponse): Promise<void> {
+      if (!stream) {
+        await runFsTask(() => ensureDir(path.dirname(csvPath)));
+        stream = createWriteStream(tempPath, { encoding: "utf-8" });
+        stream.on("error", (e) => {
+          streamError ??= e;
+        });
+        headers = getCsvHeaders(record);
+        await writeLine(headers.map(escapeCsvField).join(","));
+      }
+      await writeLine(recordToCsvRow(record, headers));
+      rowCount++;
+    },
+    async close(previousHash?: string): Promise<string | null> {
+      if (!stream) {
+        return null;
+      }
+      try {
+        await flush();
+      } catch (e) {
+        streamError ??= e;
+      }
+      return runFsTask(async () => {
+        await closeStream();
+        if (streamError) {
+          await fs.rm(tempPath, { force: true });
+          throw streamError;
+        }
+        const digest = hash.digest("hex");
+        if (await isOutputUnchanged(csvPath, digest, previousHash)) {
+          await fs.rm(tempPath, { force: true });
+          incrementStat("filesSkipped");
+        } else {
+          await fs.rename(tempPath, csvPath);
+          incrementStat("filesWritten");
+        }
+        return digest;
+      });
+    },
+    async abort(): Promise<void> {
+      buffered = [];
+      bufferedBytes = 0;
+      await runFsTask(async () => {
+        await closeStream();
+        await fs.rm(tempPath, { force: true });
+      });
+    },
+    get rowCount(): number {
+      return rowCount;
+    },
+    get headers(): string[] {
+      return headers;
+    },
+  };
+}
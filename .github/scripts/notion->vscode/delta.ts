@@ -0,0 +1,236 @@
+/**
+ * search APIを使った差分同期
+ * 前回以降に更新されたページ・データベースだけを再処理する
+ */
+import * as path from "node:path";
+import type { ManifestEntry, SyncManifest } from "./manifest.js";
+
+// ============================================================
+// 定数
+// ============================================================
+
+// 同期中の編集やNotion側の時刻の丸めを取りこぼさないための余裕
+const HIGH_WATER_MARK_MARGIN_MS = 5 * 60 * 1000;
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// ============================================================
+// 型定義
+// ============================================================
+
+/**
+ * search APIで見つかった更新済みオブジェクト
+ */
+export interface ChangedObject {
+  /** 短縮ID（ハイフンなし） */
+  id: string;
+  object: "page" | "database";
+  lastEditedTime: string;
+  /** 親ページ・親データベースの短縮ID */
+  parentId: string | null;
+  /** 現在のタイトル（分からない場合はnull） */
+  title: string | null;
+}
+
+/**
+ * 差分同期で再処理する部分木のルート
+ */
+export interface DeltaRoot {
+  type: "page" | "database";
+  id: string;
+  outputPath: string;
+  includeProperties: boolean;
+}
+
+// ============================================================
+// 判定
+// ============================================================
+
+/**
+ * フル探索が必要かどうか
+ * マニフェストや最高水位がない場合、または前回のフル探索から一定期間経過した場合
+ */
+export function isFullSyncDue(
+  manifest: SyncManifest | null,
+  now: Date,
+  intervalDays: number,
+): boolean {
+  if (!manifest?.highWaterMark || !manifest.lastFullSyncAt) {
+    return true;
+  }
+  const lastFull = Date.parse(manifest.lastFullSyncAt);
+  if (Number.isNaN(lastFull)) {
+    return true;
+  }
+  return now.getTime() - lastFull >= intervalDays * DAY_MS;
+}
+
+/**
+ * 次回の差分同期で使う最高水位を計算
+ * 何も変更がなければ前回の値を維持する（マニフェストに不要な差分を出さない）
+ */
+export function nextHighWaterMark(
+  previous: string | undefined,
+  hasChanges: boolean,
+  runStartedAt: Date,
+): string {
+  if (previous && !hasChanges) {
+    return previous;
+  }
+  return new Date(
+    runStartedAt.getTime() - HIGH_WATER_MARK_MARGIN_MS,
+  ).toISOString();
+}
+
+// ============================================================
+// 再処理対象の決定
+// ============================================================
+
+/**
+ * エントリから部分木のルートを作成
+ */
+function toDeltaRoot(id: string, entry: ManifestEntry): DeltaRoot {
+  return {
+    type: entry.type,
+    id,
+    outputPath: path.dirname(entry.path),
+    includeProperties: entry.includeProperties ?? false,
+  };
+}
+
+/**
+ * マニフェストの子ページ一覧から、子の短縮ID → 親の短縮IDの索引を作成
+ */
+function buildParentIndex(
+  entries: Record<string, ManifestEntry>,
+): Map<string, string> {
+  const parents = new Map<string, string>();
+  for (const [id, entry] of Object.entries(entries)) {
+    for (const child of entry.children) {
+      parents.set(child.id.replace(/-/g, ""), id);
+    }
+  }
+  return parents;
+}
+
+/**
+ * 別の親に移動したオブジェクトの、移動前の親の短縮IDを取得（移動していなければnull）
+ * 移動先がマニフェストにない（ツリー外・ブロックの下）場合は移動として扱わない
+ */
+function getPreviousParentId(
+  object: ChangedObject,
+  entries: Record<string, ManifestEntry>,
+  parents: Map<string, string>,
+): string | null {
+  const previousParentId = parents.get(object.id);
+  if (
+    !previousParentId ||
+    !object.parentId ||
+    !entries[object.parentId] ||
+    object.parentId === previousParentId
+  ) {
+    return null;
+  }
+  return previousParentId;
+}
+
+/**
+ * 更新されたオブジェクトから再処理する部分木のルートを決定
+ *
+ * - マニフェストにあるページ・データベースはその場所から再処理
+ * - DBレコードはCSVも更新するため親データベースから再処理
+ * - 未知のページ（新規作成）は親から再処理（親も未知ならツリー外として無視）
+ * - 別の親に移動したページは移動先の親から再処理し、移動前の親も再処理してリンクを消す
+ * - 親も再処理するルートは親から辿られるので除外
+ *   （差分同期では変更のないページの配下を辿らないので、間に変更のないページがあれば残す）
+ */
+export function planDeltaRoots(
+  changed: ChangedObject[],
+  entries: Record<string, ManifestEntry>,
+): DeltaRoot[] {
+  const parents = buildParentIndex(entries);
+  const rootIds = new Set<string>();
+
+  for (const object of changed) {
+    const entry = entries[object.id];
+    const parentEntry = object.parentId ? entries[object.parentId] : undefined;
+    const previousParentId = getPreviousParentId(object, entries, parents);
+
+    if (entry && !previousParentId && !(entry.includeProperties && parentEntry)) {
+      rootIds.add(object.id);
+    } else if (object.parentId && parentEntry) {
+      rootIds.add(object.parentId);
+    }
+    if (previousParentId && entries[previousParentId]?.type === "page") {
+      rootIds.add(previousParentId);
+    }
+  }
+
+  // 親が再処理されるルートは、親の出力で子ページとして辿られる
+  return [...rootIds]
+    .filter((id) => {
+      const parentId = parents.get(id);
+      return !parentId || !rootIds.has(parentId);
+    })
+    .map((id) => toDeltaRoot(id, entries[id]))
+    .sort(
+      (a, b) =>
+        a.outputPath.split(path.sep).length -
+        b.outputPath.split(path.sep).length,
+    );
+}
+
+/**
+ * 変更がなくても本文を出力し直す親ページを取得
+ * 子ページの作成・タイトル変更では親のlast_edited_timeが変わらないことがあるので、
+ * 親を出力し直して新しい子ページを見つけ、子ページへのリンクを新しいタイトルにする
+ *
+ * - 未知のページ（新規作成）の親ページ
+ * - 別の親に移動したページの移動先・移動前の親ページ
+ * - 親のリンクに使ったタイトルから変わった子ページ・子データベースの親ページ
+ */
+export function findParentsToRerender(
+  changed: ChangedObject[],
+  entries: Record<string, ManifestEntry>,
+): Set<string> {
+  const parents = buildParentIndex(entries);
+  const parentIds = new Set<string>();
+
+  for (const object of changed) {
+    if (!entries[object.id]) {
+      if (
+        object.object === "page" &&
+        object.parentId &&
+        entries[object.parentId]?.type === "page"
+      ) {
+        parentIds.add(object.parentId);
+      }
+      continue;
+    }
+
+    const previousParentId = getPreviousParentId(object, entries, parents);
+    if (previousParentId) {
+      for (const id of [object.parentId!, previousParentId]) {
+        if (entries[id]?.type === "page") {
+          parentIds.add(id);
+        }
+      }
+      continue;
+    }
+
+    const parentId = parents.get(object.id);
+    const parentEntry = parentId ? entries[parentId] : undefined;
+    if (!parentId || parentEntry?.type !== "page" || object.title === null) {
+      continue;
+    }
+    // 古いマニフェストには子のタイトルがないので、子のエントリのタイトルと比べる
+    const linkedTitle =
+      parentEntry.children.find(
+        (child) => child.id.replace(/-/g, "") === object.id,
+      )?.title ?? entries[object.id].title;
+    if (linkedTitle !== object.title) {
+      parentIds.add(parentId);
+    }
+  }
+  return parentIds;
+}
@@ -7,124 +7,285 @@ import * as fs from "node:fs/promises";
 import * as path from "node:path";
 import {
   processPage,
+  processDeltaRoots,
   getProcessedIds,
+  getPreservedIds,
+  getReferencedAssetKeys,
   clearProcessedIds,
+  loadChangedSince,
+  setPreviousManifest,
+  setRerenderIds,
+  setSkipUnchangedSubtrees,
+  searchChangedSince,
+  buildManifest,
 } from "./notion-client.js";
+import {
+  configureAssetStore,
+  disableAssetDownloads,
+  pruneAssetStore,
+} from "./asset-pipeline.js";
+import { planDeletions, removePaths, sweepDeletedPages } from "./cleanup.js";
+import {
+  findParentsToRerender,
+  isFullSyncDue,
+  nextHighWaterMark,
+  planDeltaRoots,
+  type ChangedObject,
+} from "./delta.js";
+import { MANIFEST_FILENAME, loadManifest, saveManifest } from "./manifest.js";
+import {
+  isResponseCacheEnabled,
+  pruneResponseCache,
+} from "./response-cache.js";
+import {
+  closeSnapshot,
+  getSnapshotStats,
+  isSnapshotReplay,
+} from "./snapshot.js";
+import { parsePositiveInt } from "./utils.js";
+import {
+  formatApiMetrics,
+  getApiMetrics,
+  resetApiMetrics,
+  writeApiMetrics,
+} from "../shared/api-metrics.js";
+import {
+  flushLogs,
+  logInfo,
+  logSeparator,
+  logWarn,
+} from "../shared/logger.js";
+import { getSharedRateLimiter } from "../shared/notion-fetch.js";
+import { getRetryStats, resetRetryStats } from "../shared/retry.js";
+import { getSyncStats, resetSyncStats } from "./sync-stats.js";
+import { isTracingEnabled, withSpan, writeTrace } from "./tracing.js";
 
 // ============================================================
 // 設定
 // ============================================================
 const ROOT_PAGE_ID = process.env.NOTION_ROOT_PAGE_ID ?? "";
 const OUTPUT_DIR = "root_page";
+const MANIFEST_PATH = path.join(OUTPUT_DIR, MANIFEST_FILENAME);
+
+// search APIで変更箇所だけを再処理する差分同期
+const DELTA_SYNC =
+  (process.env.NOTION_SYNC_DELTA ?? "false").toLowerCase() === "true";
+// 差分同期でも、この日数ごとにルートからのフル探索を行う（削除検出のため）
+const FULL_SYNC_INTERVAL_DAYS = parsePositiveInt(
+  process.env.NOTION_SYNC_FULL_INTERVAL_DAYS,
+  7,
+);
+// 削除検出でマニフェストを使わず、出力ディレクトリ全体を走査する（修復用）
+const REPAIR_SWEEP =
+  (process.env.NOTION_SYNC_REPAIR ?? "false").toLowerCase() === "true";
 
 // ============================================================
-// 削除検出
+// メイン
 // ============================================================
-
-/**
- * ファイル/フォルダ名からNotion IDを抽出
- * 形式: "タイトル {32文字のID}.md" または "タイトル {32文字のID}/"
- */
-function extractIdFromName(name: string): string | null {
-  // .md ファイル: 末尾の " {ID}.md" からIDを抽出
-  const mdMatch = name.match(/\s([a-f0-9]{32})\.md$/);
-  if (mdMatch) {
-    return mdMatch[1];
+async function main() {
+  if (!ROOT_PAGE_ID) {
+    console.error("Error: NOTION_ROOT_PAGE_ID is not set");
+    process.exit(1);
   }
 
-  // .csv ファイル: 末尾の " {ID}.csv" からIDを抽出
-  const csvMatch = name.match(/\s([a-f0-9]{32})\.csv$/);
-  if (csvMatch) {
-    return csvMatch[1];
+  // スナップショットからの再出力ではネットワークを使わない（画像もストアにあるものだけリンク）
+  const replay = isSnapshotReplay();
+  if (replay) {
+    disableAssetDownloads();
+    logInfo(`Rendering from snapshot (root: ${ROOT_PAGE_ID})`);
+  } else {
+    logInfo(`Fetching from Notion (root: ${ROOT_PAGE_ID})`);
   }
+  logSeparator();
 
-  // フォルダ: 末尾の " {ID}" からIDを抽出
-  const dirMatch = name.match(/\s([a-f0-9]{32})$/);
-  if (dirMatch) {
-    return dirMatch[1];
-  }
+  // 出力ディレクトリを作成
+  await fs.mkdir(OUTPUT_DIR, { recursive: true });
 
-  return null;
-}
+  // 処理済みID・統計情報をクリア
+  clearProcessedIds();
+  resetSyncStats();
+  resetRetryStats();
+  resetApiMetrics();
 
-/**
- * 削除されたページ（処理されなかったID）のファイル/フォルダを削除
- */
-async function removeDeletedPages(
-  dir: string,
-  processedIds: Set<string>,
-): Promise<void> {
-  try {
-    const entries = await fs.readdir(dir, { withFileTypes: true });
-
-    for (const entry of entries) {
-      // imagesフォルダはスキップ
-      if (entry.name === "images") {
-        continue;
-      }
+  // 前回の同期結果を読み込み（変更のないページをスキップ）
+  const runStartedAt = new Date();
+  const previousManifest = await loadManifest(MANIFEST_PATH);
+  setPreviousManifest(previousManifest);
+  // 画像はワークスペース全体で1つのストアに保存
+  configureAssetStore(
+    path.join(OUTPUT_DIR, "images"),
+    previousManifest?.assets,
+  );
 
-      const id = extractIdFromName(entry.name);
-      const fullPath = path.join(dir, entry.name);
-
-      if (id && !processedIds.has(id)) {
-        // このIDは処理されなかった = Notionから削除された
-        if (entry.isDirectory()) {
-          await fs.rm(fullPath, { recursive: true });
-          console.log(`🗑️  Deleted (removed from Notion): ${entry.name}/`);
-        } else {
-          await fs.unlink(fullPath);
-          console.log(`🗑️  Deleted (removed from Notion): ${entry.name}`);
-        }
-      } else if (entry.isDirectory()) {
-        // フォルダ内を再帰的に確認
-        await removeDeletedPages(fullPath, processedIds);
-      }
+  // 差分同期の基準となるマニフェスト（フル探索する場合はnull）
+  let deltaBase =
+    DELTA_SYNC &&
+    !replay &&
+    previousManifest &&
+    !isFullSyncDue(previousManifest, runStartedAt, FULL_SYNC_INTERVAL_DAYS)
+      ? previousManifest
+      : null;
+
+  // 前回以降に更新されたページ・データベースを検索（失敗したらフル探索に切り替える）
+  let changed: ChangedObject[] = [];
+  let searchFailed = false;
+  if (deltaBase) {
+    const since = deltaBase.highWaterMark!;
+    try {
+      changed = await withSpan("searchChangedSince", () =>
+        searchChangedSince(since),
+      );
+    } catch (e) {
+      logWarn(`⚠️ Error searching changed pages, running a full walk: ${e}`);
+      deltaBase = null;
+      searchFailed = true;
     }
+  }
 
-    // 空になったフォルダを削除
-    const remainingEntries = await fs.readdir(dir);
-    if (remainingEntries.length === 0) {
-      await fs.rmdir(dir);
-      console.log(`🗑️  Deleted (empty directory): ${path.basename(dir)}/`);
+  if (deltaBase) {
+    // 更新されたページ・データベースの部分木だけを再処理
+    const roots = planDeltaRoots(changed, deltaBase.entries);
+    // 新しいページ・タイトルが変わったページの親は、更新日時が変わっていなくても出力し直す
+    setRerenderIds(findParentsToRerender(changed, deltaBase.entries));
+    logInfo(
+      `Delta sync: ${changed.length} changed objects, ${roots.length} subtrees to refresh`,
+    );
+    setSkipUnchangedSubtrees(true);
+    await processDeltaRoots(roots);
+  } else {
+    // 前回以降の更新をまとめて取得し、変更のないページの子はpages.retrieveを省略
+    // （新しいページ・タイトルが変わったページの親は出力し直す）
+    if (!replay && !searchFailed) {
+      await withSpan("searchChangedSince", () =>
+        loadChangedSince(previousManifest?.highWaterMark),
+      );
+    }
+    // ルートページから再帰的に取得
+    await processPage(ROOT_PAGE_ID, OUTPUT_DIR);
+
+    // どのページからも参照されなくなった画像をストアから削除（フル探索のみ）
+    const referencedAssets = getReferencedAssetKeys();
+    if (referencedAssets) {
+      const removed = await withSpan("pruneAssetStore", () =>
+        pruneAssetStore(referencedAssets),
+      );
+      logInfo(`Removed ${removed} unreferenced images`);
     }
-  } catch {
-    // エラーはスキップ
   }
-}
 
-// ============================================================
-// メイン
-// ============================================================
-async function main() {
-  if (!ROOT_PAGE_ID) {
-    console.error("Error: NOTION_ROOT_PAGE_ID is not set");
-    process.exit(1);
+  // 処理済みIDを取得（差分同期では前回のページも存在するものとして扱う）
+  const processedIds = getProcessedIds();
+  if (deltaBase) {
+    for (const id of Object.keys(deltaBase.entries)) {
+      processedIds.add(id);
+    }
   }
 
-  console.log(`Fetching from Notion (root: ${ROOT_PAGE_ID})`);
-  console.log("=".repeat(50));
+  logSeparator();
+  logInfo(`Processed ${processedIds.size} pages/databases`, {
+    processed: processedIds.size,
+  });
 
-  // 出力ディレクトリを作成
-  await fs.mkdir(OUTPUT_DIR, { recursive: true });
+  const stats = getSyncStats();
 
-  // 処理済みIDをクリア
-  clearProcessedIds();
+  // 今回の同期結果を保存
+  const manifest = buildManifest();
+  if (deltaBase) {
+    manifest.entries = { ...deltaBase.entries, ...manifest.entries };
+  }
+  // スナップショットは過去の内容なので、差分同期の基準は進めない
+  manifest.highWaterMark = replay
+    ? previousManifest?.highWaterMark
+    : nextHighWaterMark(
+        previousManifest?.highWaterMark,
+        stats.pagesRendered > 0,
+        runStartedAt,
+      );
+  // フル探索の日時は差分同期を使う場合のみ記録（毎回の不要な差分を避ける）
+  manifest.lastFullSyncAt =
+    DELTA_SYNC && !deltaBase && !replay
+      ? runStartedAt.toISOString()
+      : previousManifest?.lastFullSyncAt;
+  await saveManifest(MANIFEST_PATH, manifest);
 
-  // ルートページから再帰的に取得
-  await processPage(ROOT_PAGE_ID, OUTPUT_DIR);
+  logInfo(
+    `Pages rendered: ${stats.pagesRendered}, unchanged (skipped): ${stats.pagesUnchanged}, pages.retrieve saved: ${stats.pageRetrievesSaved}`,
+  );
+  logInfo(
+    `blocks.children.list calls: ${stats.blockListCalls} (saved ${stats.blockListCallsSaved} by reusing block listings, ${stats.nestedBlockListCalls} for nested blocks)`,
+  );
 
-  // 処理済みIDを取得
-  const processedIds = getProcessedIds();
+  const limiterStats = getSharedRateLimiter().getStats();
+  logInfo(
+    `Rate limiter: ${limiterStats.scheduled} requests, max queue depth ${limiterStats.maxQueueDepth}, waited ${(limiterStats.totalWaitMs / 1000).toFixed(1)}s`,
+    { rateLimiter: limiterStats },
+  );
+  const retryStats = getRetryStats();
+  logInfo(
+    `Retries: ${retryStats.retries} (backed off ${(retryStats.backoffMs / 1000).toFixed(1)}s, ${retryStats.timeouts} timeouts, ${retryStats.budgetExhausted} gave up on exhausted budget)`,
+    { retries: retryStats },
+  );
+  const apiMetrics = getApiMetrics();
+  logInfo(`API calls by endpoint (${apiMetrics.totalCalls} total):`, {
+    apiCalls: apiMetrics,
+  });
+  for (const line of formatApiMetrics(apiMetrics)) {
+    logInfo(`  ${line}`);
+  }
+
+  // 削除されたページを検出して削除（差分同期では次回のフル探索で検出）
+  // 前回のマニフェストにあって今回処理されなかったIDだけを削除し、
+  // マニフェストがない場合・修復モードでは出力ディレクトリ全体を走査する
+  if (!deltaBase) {
+    logInfo("Checking for deleted pages...");
+    await withSpan("removeDeletedPages", async () => {
+      if (REPAIR_SWEEP || !previousManifest) {
+        await sweepDeletedPages(OUTPUT_DIR, processedIds, getPreservedIds());
+      } else {
+        const removed = await removePaths(
+          planDeletions(previousManifest.entries, processedIds, OUTPUT_DIR),
+          OUTPUT_DIR,
+        );
+        logInfo(`Removed ${removed} files/directories of deleted pages`);
+      }
+    });
+  }
+
+  const fileStats = getSyncStats();
+  logInfo(
+    `Files: ${fileStats.filesWritten} written, ${fileStats.filesSkipped} unchanged (not rewritten), ${fileStats.filesRemoved} removed`,
+    { stats: fileStats },
+  );
 
-  console.log("=".repeat(50));
-  console.log(`Processed ${processedIds.size} pages/databases`);
+  // APIレスポンスキャッシュを上限サイズに収める
+  if (isResponseCacheEnabled()) {
+    const evicted = await pruneResponseCache();
+    logInfo(
+      `Response cache: ${fileStats.cacheHits} hits, ${fileStats.cacheMisses} misses, ${evicted} entries evicted`,
+    );
+  }
 
-  // 削除されたページを検出して削除
-  console.log("Checking for deleted pages...");
-  await removeDeletedPages(OUTPUT_DIR, processedIds);
+  // スナップショットの書き込みを完了し、API計測結果を書き出す（画像のダウンロードを含む）
+  await closeSnapshot();
+  await writeApiMetrics();
+  const snapshotStats = getSnapshotStats();
+  if (replay) {
+    logInfo(
+      `Snapshot: ${snapshotStats.replayed} responses replayed, ${snapshotStats.missing} requests not in snapshot (previous output kept)`,
+    );
+  } else if (snapshotStats.recorded > 0) {
+    logInfo(`Snapshot: ${snapshotStats.recorded} responses recorded`);
+  }
+  if (isTracingEnabled()) {
+    const spans = await writeTrace();
+    logInfo(
+      `Trace: ${spans} spans written to ${process.env.NOTION_SYNC_TRACE_FILE}`,
+    );
+  }
 
-  console.log("=".repeat(50));
-  console.log("Done!");
+  logSeparator();
+  logInfo("Done!");
+  flushLogs();
 }
 
 await main();
@@ -0,0 +1,129 @@
+/**
+ * 同期マニフェスト
+ * 前回の同期結果（ページID → 最終更新日時・出力パス・内容ハッシュ）を保存し、
+ * 変更のないページの取得・書き込みを省略するために使う
+ */
+import { createHash } from "node:crypto";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+
+// ============================================================
+// 定数
+// ============================================================
+export const MANIFEST_FILENAME = ".notion-sync-manifest.json";
+const MANIFEST_VERSION = 1;
+
+// ============================================================
+// 型定義
+// ============================================================
+export interface ManifestChild {
+  id: string;
+  type: "page" | "database";
+  /** 親のMarkdownのリンクに使ったタイトル */
+  title?: string;
+}
+
+/**
+ * データベースのCSVを差分更新するための情報
+ */
+export interface ManifestDatabaseState {
+  dataSourceId: string;
+  /** このデータソースの最高水位（これ以降に更新されたレコードだけを取得する） */
+  highWaterMark: string;
+  /** CSVのヘッダー */
+  headers: string[];
+  /** CSVの各行のレコードID（短縮ID、行の順番どおり） */
+  rowIds: string[];
+}
+
+export interface ManifestEntry {
+  type: "page" | "database";
+  title: string;
+  /** Notion上の last_edited_time */
+  lastEditedTime: string;
+  /** 出力ファイルのパス（.md または .csv） */
+  path: string;
+  /** 出力内容のSHA-256 */
+  hash: string;
+  /** 子ページ・子データベース（変更なしで本文を取得しない場合の探索に使用） */
+  children: ManifestChild[];
+  /** プロパティ付きで出力したページ（DBレコード） */
+  includeProperties?: boolean;
+  /** 本文が参照する画像ストアの画像キー（参照されなくなった画像の削除に使用） */
+  assets?: string[];
+  /** データベースのCSVの差分更新用 */
+  database?: ManifestDatabaseState;
+}
+
+export interface SyncManifest {
+  version: number;
+  /** 差分同期の最高水位（これ以降に更新されたものをsearch APIで探す） */
+  highWaterMark?: string;
+  /** 最後にルートからフル探索した日時 */
+  lastFullSyncAt?: string;
+  /** 短縮ID（ハイフンなし）→ エントリ */
+  entries: Record<string, ManifestEntry>;
+  /** 画像キー（NotionのファイルUUID）→ 画像ストア内のファイル名 */
+  assets?: Record<string, string>;
+}
+
+// ============================================================
+// 読み書き
+// ============================================================
+
+/**
+ * 空のマニフェストを作成
+ */
+export function createEmptyManifest(): SyncManifest {
+  return { version: MANIFEST_VERSION, entries: {} };
+}
+
+/**
+ * マニフェストを読み込む（存在しない・壊れている場合はnull）
+ */
+export async function loadManifest(
+  filePath: string,
+): Promise<SyncManifest | null> {
+  try {
+    const content = await fs.readFile(filePath, "utf-8");
+    const parsed = JSON.parse(content) as SyncManifest;
+    if (parsed.version !== MANIFEST_VERSION || !parsed.entries) {
+      return null;
+    }
+    return parsed;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * マニフェストを保存
+ * 差分が出にくいようにIDでソートして書き出す
+ */
+export async function saveManifest(
+  filePath: string,
+  manifest: SyncManifest,
+): Promise<void> {
+  const sortedEntries: Record<string, ManifestEntry> = {};
+  for (const id of Object.keys(manifest.entries).sort()) {
+    sortedEntries[id] = manifest.entries[id];
+  }
+
+  await fs.mkdir(path.dirname(filePath), { recursive: true });
+  await fs.writeFile(
+    filePath,
+    JSON.stringify({ ...manifest, entries: sortedEntries }, null, 2) + "\n",
+    "utf-8",
+  );
+}
+
+// ============================================================
+// ハッシュ
+// ============================================================
+
+/**
+ * 出力内容のSHA-256を計算
+ */
+export function hashContent(content: string): string {
+  return createHash("sha256").update(content).digest("hex");
+}
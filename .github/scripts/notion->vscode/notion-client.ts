@@ -2,32 +2,103 @@
  * Notion API関連の関数
  * 外部API依存があるため、テスト時はモックが必要
  */
-import { Client } from "@notionhq/client";
+import {
+  APIErrorCode,
+  Client,
+  isNotionClientError,
+} from "@notionhq/client";
 import type {
   BlockObjectResponse,
   DatabaseObjectResponse,
   PageObjectResponse,
   RichTextItemResponse,
 } from "@notionhq/client/build/src/api-endpoints";
+import { AsyncLocalStorage } from "node:async_hooks";
 import * as fs from "node:fs/promises";
 import * as path from "node:path";
 import {
   extractPropertyValue,
   getPageTitle,
+  parsePositiveInt,
+  recordToCsvRow,
   richTextToMarkdown,
   sanitizeFilename,
+  splitCsvRows,
 } from "./utils.js";
+import {
+  findParentsToRerender,
+  nextHighWaterMark,
+  type ChangedObject,
+  type DeltaRoot,
+} from "./delta.js";
+import {
+  createEmptyManifest,
+  hashContent,
+  type ManifestDatabaseState,
+  type ManifestEntry,
+  type SyncManifest,
+} from "./manifest.js";
+import { incrementStat } from "./sync-stats.js";
+import { linkSpan, withSpan, type SpanLink } from "./tracing.js";
+import { logDebug, logError, logWarn, startProgress } from "../shared/logger.js";
+import { createWorkQueue } from "./work-queue.js";
+import { createCsvWriter } from "./csv-writer.js";
+import {
+  ensureDir,
+  flushOutputWrites,
+  queueOutputWrite,
+  runFsTask,
+  writeFileAtomic,
+} from "./output-writer.js";
+import {
+  findOutputsById,
+  removePaths,
+  resetDirectoryIndex,
+} from "./cleanup.js";
+import {
+  flushAssetDownloads,
+  getAssetIndex,
+  loadAssetStore,
+  resolveAsset,
+  scheduleAssetDownload,
+  toAssetLink,
+  type AssetResult,
+} from "./asset-pipeline.js";
+import {
+  isResponseCacheEnabled,
+  readCachedResponse,
+  writeCachedResponse,
+} from "./response-cache.js";
+import { createSnapshotFetch, isSnapshotReplay } from "./snapshot.js";
+import {
+  createNotionFetch,
+  getClientTimeoutMs,
+  getNotionBaseUrl,
+} from "../shared/notion-fetch.js";
 
 // ============================================================
 // Notionクライアント
 // ============================================================
-const notion = new Client({ auth: process.env.NOTION_API_KEY });
+// 全リクエストは共有レートリミッターとリトライ層を通る（vscode->notionと共通）
+// スナップショットからの再出力ではネットワークを使わずにスナップショットから返す
+const notion = new Client({
+  auth: process.env.NOTION_API_KEY,
+  baseUrl: getNotionBaseUrl(),
+  fetch: createSnapshotFetch(createNotionFetch()),
+  timeoutMs: getClientTimeoutMs(),
+});
 
 // ============================================================
 // 処理済みID追跡（削除検出用）
 // ============================================================
 const processedIds = new Set<string>();
 
+// 探索キューに投入済みのID（同じページへの重複到達を防ぐ）
+const visitedIds = new Set<string>();
+
+// 取得に失敗したため配下の内容が分からないID（出力ディレクトリごと残す）
+const preservedIds = new Set<string>();
+
 /**
  * 処理済みIDを取得
  */
@@ -36,90 +107,136 @@ export function getProcessedIds(): Set<string> {
 }
 
 /**
- * 処理済みIDをクリア
+ * 取得に失敗して配下の出力を残すIDを取得
+ */
+export function getPreservedIds(): Set<string> {
+  return new Set(preservedIds);
+}
+
+/**
+ * 処理済みIDをクリア（今回の同期結果のマニフェストもクリア）
  */
 export function clearProcessedIds(): void {
   processedIds.clear();
+  visitedIds.clear();
+  preservedIds.clear();
+  currentEntries.clear();
+  staleOutputs.clear();
+  renderedPaths.clear();
+  resetDirectoryIndex();
 }
 
 // ============================================================
-// 設定
+// 同期マニフェスト（差分同期用）
 // ============================================================
-const DOWNLOAD_IMAGES =
-  (process.env.DOWNLOAD_IMAGES ?? "true").toLowerCase() === "true";
+let previousEntries: Record<string, ManifestEntry> = {};
+let hasPreviousManifest = false;
+const currentEntries = new Map<string, ManifestEntry>();
 
-// ============================================================
-// 画像ダウンロード
-// ============================================================
+// タイトル変更・移動で古くなった出力（探索の最後にまとめて削除）
+const staleOutputs = new Set<string>();
+
+// 今回の実行で出力したMarkdownのパス（画像リンクの差し替え対象）
+const renderedPaths = new Set<string>();
 
 /**
- * 画像をダウンロードしてローカルパスを返す
+ * 前回のマニフェストを設定（変更のないページの判定に使用）
  */
-async function downloadImage(url: string, outputDir: string): Promise<string> {
-  const fs = await import("node:fs/promises");
-  const path = await import("node:path");
-  const crypto = await import("node:crypto");
+export function setPreviousManifest(manifest: SyncManifest | null): void {
+  previousEntries = manifest?.entries ?? {};
+  hasPreviousManifest = manifest !== null;
+}
 
-  try {
-    // URLから画像情報を抽出
-    const parsed = new URL(url);
-    const pathParts = parsed.pathname.split("/");
-
-    let imageUuid: string;
-    let originalName: string;
-
-    // Notion S3 URLの形式: /.../uuid/filename
-    if (pathParts.length >= 2) {
-      imageUuid = pathParts[pathParts.length - 2] ?? "unknown";
-      originalName = decodeURIComponent(
-        pathParts[pathParts.length - 1] ?? "image.png",
-      );
-    } else {
-      // フォールバック: URLのハッシュを使用
-      imageUuid = crypto
-        .createHash("md5")
-        .update(url)
-        .digest("hex")
-        .slice(0, 12);
-      originalName = "image.png";
-    }
+// trueの場合、変更のないページの配下は探索しない（差分同期用）
+let skipUnchangedSubtrees = false;
 
-    // ファイル名を生成: uuid_originalname
-    const safeName = originalName.replace(/[<>:"/\\|?*]/g, "_");
-    const filename = `${imageUuid}_${safeName}`;
+/**
+ * 変更のないページの配下を探索するかどうかを設定
+ * search APIで変更箇所が分かっている差分同期ではtrueにする
+ */
+export function setSkipUnchangedSubtrees(enabled: boolean): void {
+  skipUnchangedSubtrees = enabled;
+}
 
-    // imagesディレクトリを作成
-    const imagesDir = path.join(outputDir, "images");
-    await fs.mkdir(imagesDir, { recursive: true });
+// 前回以降に更新されたページの更新日時（search APIで一括取得、nullなら不明）
+let changedEditTimes: Map<string, string> | null = null;
 
-    const imagePath = path.join(imagesDir, filename);
+// 変更がなくても本文を出力し直すページ（新しい子ページが作成された親）
+let rerenderIds = new Set<string>();
 
-    // 既に存在する場合はダウンロードをスキップ
-    try {
-      await fs.access(imagePath);
-      console.log(`    ⏭️ Skip (exists): ${filename}`);
-      return `images/${filename}`;
-    } catch {
-      // ファイルが存在しない場合は続行
-    }
+/**
+ * 変更がなくても本文を出力し直すページを設定（差分同期用）
+ */
+export function setRerenderIds(ids: Iterable<string>): void {
+  rerenderIds = new Set(ids);
+}
 
-    // ダウンロード
-    console.log(`    📥 Downloading: ${filename}`);
-    const response = await fetch(url);
-    if (!response.ok) {
-      throw new Error(`HTTP ${response.status}`);
+/**
+ * 今回のマニフェストのページが参照する画像キーを取得
+ * 参照を記録していないエントリ（古いマニフェストから引き継いだもの）や、
+ * エントリがないまま出力を残したページがある場合は分からないのでnull
+ */
+export function getReferencedAssetKeys(): Set<string> | null {
+  for (const id of preservedIds) {
+    if (!currentEntries.has(id)) {
+      return null;
     }
+  }
 
-    const buffer = Buffer.from(await response.arrayBuffer());
-    await fs.writeFile(imagePath, buffer);
-
-    return `images/${filename}`;
-  } catch (e) {
-    console.error(`    ⚠️ Image download error: ${e}`);
-    return url; // 失敗時は元のURLを返す
+  const keys = new Set<string>();
+  for (const entry of currentEntries.values()) {
+    if (entry.type !== "page") {
+      continue;
+    }
+    if (!entry.assets) {
+      return null;
+    }
+    for (const key of entry.assets) {
+      keys.add(key);
+    }
   }
+  return keys;
+}
+
+/**
+ * 今回の同期結果からマニフェストを作成
+ */
+export function buildManifest(): SyncManifest {
+  return {
+    ...createEmptyManifest(),
+    entries: Object.fromEntries(currentEntries),
+    ...(DOWNLOAD_IMAGES && { assets: getAssetIndex() }),
+  };
 }
 
+// ============================================================
+// 設定
+// ============================================================
+const DOWNLOAD_IMAGES =
+  (process.env.DOWNLOAD_IMAGES ?? "true").toLowerCase() === "true";
+
+// trueの場合はマニフェストを無視して全ページを再取得
+// （スナップショットからの再出力では常に全ページを出力し直す）
+const FULL_SYNC =
+  (process.env.NOTION_SYNC_FULL ?? "false").toLowerCase() === "true" ||
+  isSnapshotReplay();
+
+// ページ・データベースを並列に処理するワーカー数
+const SYNC_CONCURRENCY = parsePositiveInt(
+  process.env.NOTION_SYNC_CONCURRENCY,
+  3,
+);
+
+// キューで待機できるページ・データベースの上限
+// DBのクエリ結果がこれを超えたら、処理が追いつくまで次のページの取得を待つ
+const MAX_QUEUED_TASKS = Math.max(200, SYNC_CONCURRENCY * 50);
+
+// 1ページ内でネストしたブロックの子を並列に取得する数
+const BLOCK_CONCURRENCY = parsePositiveInt(
+  process.env.NOTION_BLOCK_CONCURRENCY,
+  3,
+);
+
 // ============================================================
 // プロパティ・ブロック処理
 // ============================================================
@@ -162,85 +279,213 @@ function getPagePropertiesMarkdown(page: PageObjectResponse): string {
 }
 
 /**
- * 子ブロック一覧を取得
+ * 子ブロック一覧の取得結果
  */
-async function getPageChildren(pageId: string): Promise<BlockObjectResponse[]> {
-  const children: BlockObjectResponse[] = [];
-  let cursor: string | undefined;
+interface BlockChildrenListing {
+  blocks: BlockObjectResponse[];
+  /** 一覧取得に要したAPI呼び出し回数（ページネーション分を含む） */
+  requestCount: number;
+}
 
-  while (true) {
-    const response = await notion.blocks.children.list({
-      block_id: pageId,
+/**
+ * 1ページの変換中に取得したブロック一覧（ブロックID → 子ブロック）
+ * APIレスポンスキャッシュにページ単位で保存する
+ */
+type BlockListings = Record<string, BlockObjectResponse[]>;
+
+/**
+ * ページの変換中のブロック一覧の取得元・記録先
+ */
+interface ListingScope {
+  /** キャッシュから読み込んだ一覧（あればAPIを呼ばない） */
+  cached: BlockListings | null;
+  /** APIから取得した一覧（変換後にキャッシュに保存） */
+  recorded: BlockListings;
+  /** 一覧の取得に失敗したか（途中までの一覧はキャッシュに保存しない） */
+  failed: boolean;
+}
+
+// 変換中のページのスコープ（ネストしたブロック・テーブルの取得まで引き継ぐ）
+const listingScope = new AsyncLocalStorage<ListingScope>();
+
+/**
+ * 子ブロックをAPIのページ単位で順に返す（ページ・ブロックどちらのIDでも可）
+ * 呼び出し側が現在のページを処理している間に次のページを先読みする
+ */
+async function* iterateBlockChildren(
+  blockId: string,
+): AsyncGenerator<BlockObjectResponse[]> {
+  const scope = listingScope.getStore();
+  const cached = scope?.cached?.[blockId];
+  if (cached) {
+    yield cached;
+    return;
+  }
+
+  const fetchPage = (cursor?: string) => {
+    incrementStat("blockListCalls");
+    const request = notion.blocks.children.list({
+      block_id: blockId,
       start_cursor: cursor,
     });
+    // 途中で読むのをやめた場合の先読み分の失敗は無視する
+    request.catch(() => undefined);
+    return request;
+  };
 
-    for (const block of response.results) {
-      if ("type" in block) {
-        children.push(block);
+  let pending = fetchPage();
+  while (true) {
+    let response: Awaited<typeof pending>;
+    try {
+      response = await pending;
+    } catch (e) {
+      // 呼び出し側で失敗を握りつぶしても、不完全な一覧を保存しないようにする
+      if (scope) {
+        scope.failed = true;
       }
+      throw e;
+    }
+    const nextCursor = response.has_more ? response.next_cursor : null;
+    if (nextCursor) {
+      pending = fetchPage(nextCursor);
     }
 
-    if (!response.has_more) {
-      break;
+    const blocks = response.results.filter(
+      (block): block is BlockObjectResponse => "type" in block,
+    );
+    if (scope) {
+      (scope.recorded[blockId] ??= []).push(...blocks);
     }
-    cursor = response.next_cursor ?? undefined;
-  }
+    yield blocks;
 
-  return children;
+    if (!nextCursor) {
+      return;
+    }
+  }
 }
 
 /**
- * テーブルブロックをMarkdownテーブルに変換
+ * 子ブロック一覧を取得（ページ・ブロックどちらのIDでも可）
  */
-async function convertTableBlock(block: BlockObjectResponse): Promise<string> {
-  if (block.type !== "table") {
-    return "[Not a table]\n";
+async function getPageChildren(pageId: string): Promise<BlockChildrenListing> {
+  const cached = listingScope.getStore()?.cached?.[pageId];
+  if (cached) {
+    return { blocks: cached, requestCount: 0 };
   }
 
-  const blockId = block.id;
+  const children: BlockObjectResponse[] = [];
+  let requestCount = 0;
 
-  try {
-    // テーブルの子ブロック（table_row）を取得
-    const rowsResponse = await notion.blocks.children.list({
-      block_id: blockId,
-    });
-    const rows = rowsResponse.results;
+  for await (const blocks of iterateBlockChildren(pageId)) {
+    children.push(...blocks);
+    requestCount++;
+  }
 
-    if (rows.length === 0) {
-      return "[Empty Table]\n";
-    }
+  return { blocks: children, requestCount };
+}
 
-    const mdRows: string[] = [];
+// 子ブロックを本文として展開しないブロック（子ページ・子DBは別ファイル、テーブルは専用処理）
+const OPAQUE_BLOCK_TYPES = new Set(["child_page", "child_database", "table"]);
 
-    for (let i = 0; i < rows.length; i++) {
-      const row = rows[i];
-      if (!("type" in row) || row.type !== "table_row") {
-        continue;
-      }
+/**
+ * 子ブロックを取得して本文に展開するブロックかどうか
+ */
+function hasNestedContent(block: BlockObjectResponse): boolean {
+  return block.has_children && !OPAQUE_BLOCK_TYPES.has(block.type);
+}
 
-      const cells = row.table_row.cells;
-      const cellTexts: string[] = [];
+/**
+ * ネストしたブロックの取得結果
+ */
+interface NestedBlocks {
+  /** ブロックID → 子ブロック */
+  childrenById: Map<string, BlockObjectResponse[]>;
+  /** 取得に要したAPI呼び出し回数 */
+  requestCount: number;
+}
 
-      for (const cell of cells) {
-        let cellText = richTextToMarkdown(cell);
-        // パイプ文字をエスケープ
-        cellText = cellText.replace(/\|/g, "\\|");
-        cellTexts.push(cellText);
+/**
+ * ネストしたブロックの子を全階層取得
+ * 再帰せずワークキューで処理するため、深いネストでもスタックを消費しない
+ */
+async function fetchNestedBlocks(
+  blocks: BlockObjectResponse[],
+): Promise<NestedBlocks> {
+  const childrenById = new Map<string, BlockObjectResponse[]>();
+  let requestCount = 0;
+
+  const queue = createWorkQueue<BlockObjectResponse>(
+    BLOCK_CONCURRENCY,
+    async (block) => {
+      try {
+        const listing = await getPageChildren(block.id);
+        requestCount += listing.requestCount;
+        childrenById.set(block.id, listing.blocks);
+        for (const child of listing.blocks) {
+          if (hasNestedContent(child)) {
+            queue.push(child);
+          }
+        }
+      } catch (e) {
+        // 子の取得に失敗したブロックは子なしで出力する
+        logWarn(`  ⚠️ Error fetching children of block ${block.id}: ${e}`, {
+          blockId: block.id,
+        });
       }
+    },
+  );
 
-      const mdRow = "| " + cellTexts.join(" | ") + " |";
-      mdRows.push(mdRow);
+  for (const block of blocks) {
+    if (hasNestedContent(block)) {
+      queue.push(block);
+    }
+  }
+  await queue.onIdle();
+
+  incrementStat("nestedBlockListCalls", requestCount);
+  return { childrenById, requestCount };
+}
 
-      // 1行目の後にヘッダー区切りを追加
-      if (i === 0) {
-        const separator = "| " + cellTexts.map(() => "---").join(" | ") + " |";
-        mdRows.push(separator);
+/**
+ * テーブルブロックをMarkdownテーブルに変換
+ */
+async function convertTableBlock(block: BlockObjectResponse): Promise<string> {
+  if (block.type !== "table") {
+    return "[Not a table]\n";
+  }
+
+  try {
+    // テーブルの行（table_row）を100件ずつ取得し、届いた順に整形する
+    const mdRows: string[] = [];
+    let rowCount = 0;
+
+    for await (const rows of iterateBlockChildren(block.id)) {
+      for (const row of rows) {
+        if (row.type !== "table_row") {
+          continue;
+        }
+
+        const cellTexts = row.table_row.cells.map((cell) =>
+          // パイプ文字をエスケープ
+          richTextToMarkdown(cell).replace(/\|/g, "\\|"),
+        );
+        mdRows.push("| " + cellTexts.join(" | ") + " |");
+
+        // 1行目の後にヘッダー区切りを追加
+        if (rowCount === 0) {
+          mdRows.push("| " + cellTexts.map(() => "---").join(" | ") + " |");
+        }
+        rowCount++;
       }
     }
 
+    if (rowCount === 0) {
+      return "[Empty Table]\n";
+    }
+
     return mdRows.join("\n") + "\n\n";
   } catch (e) {
-    console.error(`  ⚠️ Table conversion error: ${e}`);
+    logWarn(`  ⚠️ Table conversion error: ${e}`, { blockId: block.id });
     return "[Table conversion error]\n";
   }
 }
@@ -280,7 +525,8 @@ async function processImageBlock(
   } else {
     imageUrl = imageData.file.url;
     if (DOWNLOAD_IMAGES && outputDir && imageUrl) {
-      imageUrl = await downloadImage(imageUrl, outputDir);
+      // 未取得の画像は描画と並行してダウンロードし、完了後にリンクを差し替える
+      imageUrl = scheduleAssetDownload(imageUrl, outputDir);
     }
   }
 
@@ -288,6 +534,24 @@ async function processImageBlock(
   return `![${caption}](${imageUrl})\n`;
 }
 
+/**
+ * ページの本文が参照する画像ストアの画像キーを取得（マニフェストに記録）
+ */
+function collectAssetKeys(blocks: BlockObjectResponse[]): string[] {
+  const keys = new Set<string>();
+  for (const block of blocks) {
+    if (block.type !== "image" || block.image.type !== "file") {
+      continue;
+    }
+    try {
+      keys.add(resolveAsset(block.image.file.url).key);
+    } catch {
+      // 解釈できないURLはダウンロードもしない
+    }
+  }
+  return [...keys].sort();
+}
+
 /**
  * ブロックをMarkdownに変換
  */
@@ -373,209 +637,1072 @@ async function blockToMarkdown(
   }
 }
 
+// 子ブロックを囲みなしでそのまま展開するブロック
+const TRANSPARENT_BLOCK_TYPES = new Set([
+  "column_list",
+  "column",
+  "synced_block",
+]);
+
+// リスト項目の子ブロックのインデント幅（マーカーの幅に合わせる）
+const LIST_INDENTS: Record<string, string> = {
+  bulleted_list_item: "  ",
+  numbered_list_item: "   ",
+  to_do: "  ",
+};
+
 /**
- * ページの本文を取得してMarkdownに変換
+ * 各行の先頭に文字列を付ける（空行は引用記号のみ・インデントなし）
  */
-async function fetchPageContent(
-  pageId: string,
+function prefixLines(markdown: string, prefix: string): string {
+  return (
+    markdown
+      .replace(/\n+$/, "")
+      .split("\n")
+      .map((line) => (line ? prefix + line : prefix.trimEnd()))
+      .join("\n") + "\n"
+  );
+}
+
+/**
+ * 子ブロックを持つブロックをMarkdownに変換
+ */
+async function renderBlockWithChildren(
+  block: BlockObjectResponse,
+  childrenMd: string,
   outputDir?: string,
   parentTitle?: string,
 ): Promise<string> {
-  const blocks = await getPageChildren(pageId);
-  const contentLines: string[] = [];
+  if (TRANSPARENT_BLOCK_TYPES.has(block.type)) {
+    return childrenMd;
+  }
 
-  for (const block of blocks) {
-    const md = await blockToMarkdown(block, outputDir, parentTitle);
-    contentLines.push(md);
+  const md = await blockToMarkdown(block, outputDir, parentTitle);
+
+  if (block.type === "toggle") {
+    // "</details>\n" の前に子ブロックを入れる
+    const summary = md.slice(0, -"</details>\n".length);
+    return `${summary}\n${childrenMd}\n</details>\n`;
+  }
+  if (block.type in LIST_INDENTS) {
+    return md + prefixLines(childrenMd, LIST_INDENTS[block.type]);
   }
+  if (block.type === "quote" || block.type === "callout") {
+    return md + prefixLines(childrenMd, "> ");
+  }
+  return `${md}\n${childrenMd}`;
+}
+
+/**
+ * 取得済みのブロック一覧をMarkdownに変換
+ * ネストしたブロックは明示的なスタックで辿り、子から順に組み立てる
+ */
+async function renderPageContent(
+  blocks: BlockObjectResponse[],
+  outputDir?: string,
+  parentTitle?: string,
+  childrenById: Map<string, BlockObjectResponse[]> = new Map(),
+): Promise<string> {
+  interface Frame {
+    block: BlockObjectResponse | null;
+    children: BlockObjectResponse[];
+    index: number;
+    parts: string[];
+  }
+
+  const stack: Frame[] = [{ block: null, children: blocks, index: 0, parts: [] }];
+
+  while (true) {
+    const frame = stack[stack.length - 1];
+
+    if (frame.index < frame.children.length) {
+      const block = frame.children[frame.index++];
+      const children = childrenById.get(block.id);
+      if (children && children.length > 0) {
+        stack.push({ block, children, index: 0, parts: [] });
+      } else {
+        frame.parts.push(await blockToMarkdown(block, outputDir, parentTitle));
+      }
+      continue;
+    }
 
-  return contentLines.join("\n");
+    stack.pop();
+    const childrenMd = frame.parts.join("\n");
+    if (!frame.block) {
+      return childrenMd;
+    }
+    stack[stack.length - 1].parts.push(
+      await renderBlockWithChildren(
+        frame.block,
+        childrenMd,
+        outputDir,
+        parentTitle,
+      ),
+    );
+  }
 }
 
 // ============================================================
-// CSV エクスポート
+// 差分検出（search API）
 // ============================================================
 
 /**
- * データベースをCSVとしてエクスポート
+ * search結果の親オブジェクトの短縮IDを取得
  */
-async function exportDatabaseToCsv(
-  records: PageObjectResponse[],
-  title: string,
-  dbId: string,
-  outputPath: string,
-): Promise<void> {
-  if (records.length === 0) {
-    return;
+function getParentId(parent: Record<string, unknown> | undefined): string | null {
+  if (!parent) {
+    return null;
   }
+  // data_source配下のページ・data_source自体はdatabase_idを優先
+  const parentId =
+    typeof parent.database_id === "string"
+      ? parent.database_id
+      : parent[parent.type as string];
+  return typeof parentId === "string" ? parentId.replace(/-/g, "") : null;
+}
+
+/**
+ * 検索結果のタイトルを取得（ページはtitleプロパティ、DB・データソースはtitle）
+ * 子ページブロックのタイトルと比べられるように、全要素のテキストをつなげる
+ */
+function getSearchResultTitle(item: {
+  title?: { plain_text: string }[];
+  properties?: Record<string, { type: string; title?: { plain_text: string }[] }>;
+}): string | null {
+  const titleList =
+    item.title ??
+    Object.values(item.properties ?? {}).find((prop) => prop.type === "title")
+      ?.title;
+  return titleList ? titleList.map((text) => text.plain_text).join("") : null;
+}
 
-  // プロパティ名（ヘッダー）を取得
-  const firstRecord = records[0];
-  const props = firstRecord.properties;
+/**
+ * 指定日時以降に更新されたページ・データベースを取得
+ * last_edited_timeの降順で取得し、指定日時より古いものが出た時点で打ち切る
+ */
+export async function searchChangedSince(
+  since: string,
+): Promise<ChangedObject[]> {
+  const changed: ChangedObject[] = [];
+  let cursor: string | undefined;
 
-  // タイトルプロパティを先頭にするためソート
-  const headers: string[] = [];
-  let titleProp: string | null = null;
+  while (true) {
+    const response = await notion.search({
+      sort: { timestamp: "last_edited_time", direction: "descending" },
+      start_cursor: cursor,
+      page_size: 100,
+    });
 
-  for (const [name, prop] of Object.entries(props)) {
-    if (prop.type === "title") {
-      titleProp = name;
-    } else {
-      headers.push(name);
+    for (const result of response.results) {
+      const item = result as {
+        object: string;
+        id: string;
+        last_edited_time?: string;
+        parent?: Record<string, unknown>;
+        title?: { plain_text: string }[];
+        properties?: Record<
+          string,
+          { type: string; title?: { plain_text: string }[] }
+        >;
+      };
+      if (!item.last_edited_time) {
+        continue;
+      }
+      if (item.last_edited_time < since) {
+        return changed;
+      }
+
+      if (item.object === "page") {
+        changed.push({
+          id: item.id.replace(/-/g, ""),
+          object: "page",
+          lastEditedTime: item.last_edited_time,
+          parentId: getParentId(item.parent),
+          title: getSearchResultTitle(item),
+        });
+      } else if (item.object === "data_source" || item.object === "database") {
+        // data_sourceは所属するデータベースとして扱う
+        const databaseId =
+          item.object === "data_source" ? getParentId(item.parent) : item.id;
+        if (databaseId) {
+          changed.push({
+            id: databaseId.replace(/-/g, ""),
+            object: "database",
+            lastEditedTime: item.last_edited_time,
+            parentId: null,
+            title: getSearchResultTitle(item),
+          });
+        }
+      }
     }
+
+    if (!response.has_more) {
+      break;
+    }
+    cursor = response.next_cursor ?? undefined;
   }
 
-  if (titleProp) {
-    headers.unshift(titleProp);
+  return changed;
+}
+
+/**
+ * 前回以降に更新されたページをsearch APIでまとめて取得
+ * 変更のないページの子ページは、ここで見つからなければ前回の更新日時のまま判定し、
+ * ページごとのpages.retrieveを省略する。取得に失敗した場合は各ページで確認する。
+ * 新しいページ・タイトルが変わったページの親は、変更がなくても出力し直す
+ */
+export async function loadChangedSince(since: string | undefined): Promise<void> {
+  changedEditTimes = null;
+  if (!since || FULL_SYNC) {
+    return;
   }
+  try {
+    const changed = await searchChangedSince(since);
+    changedEditTimes = new Map(
+      changed.map((object) => [object.id, object.lastEditedTime]),
+    );
+    setRerenderIds(findParentsToRerender(changed, previousEntries));
+  } catch (e) {
+    logWarn(`  ⚠️ Error searching changed pages: ${e}`);
+  }
+}
 
-  // CSVファイルパス
-  const csvFilename = `${sanitizeFilename(title)} ${dbId}.csv`;
-  const csvPath = path.join(outputPath, csvFilename);
+// ============================================================
+// ページ・データベース処理
+// ============================================================
+
+/**
+ * 探索キューで扱うタスク
+ */
+interface TraversalTask {
+  type: "page" | "database";
+  id: string;
+  outputPath: string;
+  depth: number;
+  includeProperties: boolean;
+  /** 親ブロック・クエリ結果から分かっている last_edited_time */
+  lastEditedTime?: string;
+  /** 親のchild_pageブロックから分かっているタイトル */
+  title?: string;
+  /** データベースのクエリで取得済みのページ（あればpages.retrieveを省略） */
+  page?: PageObjectResponse;
+  /** このタスクをキューに追加したスパン（トレース用） */
+  link?: SpanLink | null;
+}
 
-  // CSVエスケープ（必要な場合のみクォート）
-  const escapeCsvField = (field: string): string => {
-    // カンマ、改行、ダブルクォートを含む場合のみクォートで囲む
-    if (field.includes(",") || field.includes("\n") || field.includes('"')) {
-      return `"${field.replace(/"/g, '""')}"`;
+type Enqueue = (task: TraversalTask) => void;
+
+/**
+ * キューの待機中のタスクが上限以下になるまで待つ関数
+ */
+type WaitForBacklog = () => Promise<void>;
+
+/**
+ * ワーカープールでページツリーを探索
+ * 兄弟ページ・DBレコードはNOTION_SYNC_CONCURRENCYの並列度で処理される
+ */
+async function runTraversal(roots: TraversalTask[]): Promise<void> {
+  const enqueue: Enqueue = (task) => {
+    // 同じページに複数経路で到達しても取得は一度だけ
+    const key = task.id.replace(/-/g, "");
+    if (visitedIds.has(key)) {
+      return;
     }
-    return field;
+    visitedIds.add(key);
+    queue.push({ ...task, link: linkSpan() });
   };
 
-  // CSVデータを作成
-  const csvRows: string[] = [];
+  const waitForBacklog: WaitForBacklog = () =>
+    queue.waitForBacklog(MAX_QUEUED_TASKS);
+
+  let done = 0;
+  const queue = createWorkQueue<TraversalTask>(SYNC_CONCURRENCY, (task) =>
+    (task.type === "page"
+      ? withSpan("processPage", () => processPageTask(task, enqueue), {
+          link: task.link,
+          args: { id: task.id, depth: task.depth },
+        })
+      : withSpan(
+          "processDatabase",
+          () => processDatabaseTask(task, enqueue, waitForBacklog),
+          {
+            link: task.link,
+            args: { id: task.id, depth: task.depth },
+          },
+        )
+    ).finally(() => {
+      done++;
+    }),
+  );
 
-  // ヘッダー行
-  csvRows.push(headers.map(escapeCsvField).join(","));
+  if (DOWNLOAD_IMAGES && roots.length > 0) {
+    await loadAssetStore(path.join(roots[0].outputPath, "images"));
+  }
 
-  // データ行
-  for (const record of records) {
-    const row: string[] = [];
-    for (const name of headers) {
-      const prop = record.properties[name];
-      const value = prop ? extractPropertyValue(prop) : "";
-      row.push(escapeCsvField(value));
-    }
-    csvRows.push(row.join(","));
+  // ページごとの行の代わりに、定期的に進捗を表示
+  const stopProgress = startProgress("pages/databases", () => ({
+    done,
+    queued: queue.pending + queue.active,
+  }));
+  try {
+    await withSpan("traverse", async () => {
+      for (const root of roots) {
+        enqueue(root);
+      }
+      await queue.onIdle();
+    });
+  } finally {
+    stopProgress();
+  }
+  await withSpan("flushOutputWrites", flushOutputWrites);
+
+  // タイトル変更・移動で古くなったファイル・フォルダをまとめて削除
+  if (staleOutputs.size > 0) {
+    await removePaths(
+      [...staleOutputs],
+      roots[0].outputPath,
+      "renamed or moved",
+    );
+    staleOutputs.clear();
   }
 
-  await fs.writeFile(csvPath, csvRows.join("\n") + "\n", "utf-8");
-  console.log(`  📊 CSV exported: ${csvFilename}`);
+  // 探索中に予約した画像のダウンロードを完了させる
+  const assets = await withSpan("flushAssetDownloads", flushAssetDownloads);
+  await withSpan("applyAssetLinks", () => applyAssetLinks(assets));
 }
 
-// ============================================================
-// ページ・データベース処理
-// ============================================================
+/**
+ * ダウンロードした画像のリンクを元のURLから画像ストアへの相対パスに差し替える
+ * 元のURLを書くのは今回出力したページだけなので、変更がなく再利用したページは読まない。
+ * 失敗した画像は元のURLのまま残す
+ */
+async function applyAssetLinks(results: AssetResult[]): Promise<void> {
+  const downloaded = results.filter((result) => result.filePath !== null);
+  if (downloaded.length === 0) {
+    return;
+  }
+
+  const rewrites: Promise<void>[] = [];
+  for (const [id, entry] of currentEntries) {
+    if (entry.type !== "page" || !renderedPaths.has(entry.path)) {
+      continue;
+    }
+    const outputDir = path.dirname(entry.path);
+    const targets = downloaded.filter((result) =>
+      result.outputDirs.has(outputDir),
+    );
+    if (targets.length === 0) {
+      continue;
+    }
+
+    rewrites.push(
+      runFsTask(async () => {
+        const content = await fs.readFile(entry.path, "utf-8");
+        let linked = content;
+        for (const target of targets) {
+          linked = linked.replaceAll(
+            `](${target.url})`,
+            `](${toAssetLink(outputDir, target.filePath!)})`,
+          );
+        }
+        if (linked !== content) {
+          await writeFileAtomic(entry.path, linked);
+          currentEntries.set(id, { ...entry, hash: hashContent(linked) });
+        }
+      }),
+    );
+  }
+  await Promise.all(rewrites);
+}
 
 /**
- * ページを処理して保存
+ * ページを処理して保存（子ページも再帰的に処理）
+ * 取得済みのページオブジェクトを渡すとpages.retrieveを省略する
  */
 export async function processPage(
   pageId: string,
   outputPath: string,
   depth: number = 0,
   includeProperties: boolean = false,
+  page?: PageObjectResponse,
+): Promise<void> {
+  await runTraversal([
+    {
+      type: "page",
+      id: pageId,
+      outputPath,
+      depth,
+      includeProperties,
+      lastEditedTime: page?.last_edited_time,
+      page,
+    },
+  ]);
+}
+
+/**
+ * データベースを処理（レコードも再帰的に処理）
+ */
+export async function processDatabase(
+  databaseId: string,
+  outputPath: string,
+  depth: number = 0,
+): Promise<void> {
+  await runTraversal([
+    {
+      type: "database",
+      id: databaseId,
+      outputPath,
+      depth,
+      includeProperties: false,
+    },
+  ]);
+}
+
+/**
+ * 差分同期で変更のあった部分木をまとめて処理
+ */
+export async function processDeltaRoots(roots: DeltaRoot[]): Promise<void> {
+  await runTraversal(roots.map((root) => ({ ...root, depth: 0 })));
+}
+
+/**
+ * 前回から変更がなく、出力ファイルも同じ場所に残っているページのエントリを取得
+ */
+async function findUnchangedEntry(
+  pageIdShort: string,
+  outputPath: string,
+  lastEditedTime: string,
+): Promise<ManifestEntry | null> {
+  if (FULL_SYNC) {
+    return null;
+  }
+
+  const entry = previousEntries[pageIdShort];
+  if (
+    !entry ||
+    entry.lastEditedTime !== lastEditedTime ||
+    path.join(outputPath, path.basename(entry.path)) !== entry.path
+  ) {
+    return null;
+  }
+
+  try {
+    await fs.access(entry.path);
+    return entry;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * 変更のないページを前回の結果のまま処理済みにし、子ページをキューに追加
+ */
+function reuseUnchangedPage(
+  task: TraversalTask,
+  entry: ManifestEntry,
+  enqueue: Enqueue,
+): void {
+  const pageIdShort = task.id.replace(/-/g, "");
+  processedIds.add(pageIdShort);
+  currentEntries.set(pageIdShort, entry);
+  incrementStat("pagesUnchanged");
+
+  const indent = "  ".repeat(task.depth);
+  logDebug(`${indent}⏭️ ${entry.title} (unchanged)`, {
+    event: "unchanged",
+    id: task.id,
+    title: entry.title,
+  });
+
+  if (skipUnchangedSubtrees) {
+    return;
+  }
+
+  // 子ページは前回のエントリから探索
+  // search APIで更新が分かっていればその更新日時、なければ前回の更新日時で判定し、
+  // どちらも分からない場合は各自で取得して判定する
+  const childDir = entry.path.replace(/\.md$/, "");
+  for (const child of entry.children) {
+    const childIdShort = child.id.replace(/-/g, "");
+    const lastEditedTime = changedEditTimes
+      ? (changedEditTimes.get(childIdShort) ??
+        previousEntries[childIdShort]?.lastEditedTime)
+      : undefined;
+    enqueue({
+      type: child.type,
+      id: child.id,
+      outputPath: childDir,
+      depth: task.depth + 1,
+      includeProperties: false,
+      ...(lastEditedTime && { lastEditedTime }),
+    });
+  }
+}
+
+/**
+ * 取得に失敗したページ・データベースの前回の出力を残す
+ * 存在しない（object_not_found）場合以外は一時的なエラーとみなし、
+ * 配下も含めて処理済みにして前回のエントリを引き継ぐ（削除検出で消されないように）。
+ * マニフェストにない場合も、出力ディレクトリ全体の走査で配下が削除されないように記録する
+ */
+function preservePreviousOutput(idShort: string, error: unknown): void {
+  if (
+    isNotionClientError(error) &&
+    error.code === APIErrorCode.ObjectNotFound
+  ) {
+    return;
+  }
+
+  processedIds.add(idShort);
+  preservedIds.add(idShort);
+  const entry = previousEntries[idShort];
+  if (!entry) {
+    return;
+  }
+  currentEntries.set(idShort, entry);
+
+  // 子ページ・レコードの出力先（拡張子を除いたパス）配下のエントリも引き継ぐ
+  const subtreeDir = entry.path.replace(/\.(md|csv)$/, "") + path.sep;
+  for (const [id, previous] of Object.entries(previousEntries)) {
+    if (previous.path.startsWith(subtreeDir) && !currentEntries.has(id)) {
+      processedIds.add(id);
+      currentEntries.set(id, previous);
+    }
+  }
+}
+
+/**
+ * 同じIDを持つ古い出力ファイル・フォルダを削除対象として記録
+ * 前回のマニフェストがあればそのパスから求め（ディレクトリを読まない）、
+ * ない場合は出力先ディレクトリの索引（ディレクトリごとに1回だけ読み込む）から探す
+ */
+async function collectStaleOutputs(
+  idShort: string,
+  outputPath: string,
+  baseName: string,
+  extension: ".md" | ".csv",
 ): Promise<void> {
-  let page: PageObjectResponse;
+  const currentPaths = new Set([
+    path.join(outputPath, baseName),
+    path.join(outputPath, `${baseName}${extension}`),
+  ]);
+
+  let candidates: string[];
+  if (hasPreviousManifest) {
+    const previous = previousEntries[idShort];
+    candidates = previous
+      ? [previous.path, previous.path.replace(/\.(md|csv)$/, "")]
+      : [];
+  } else {
+    candidates = (await findOutputsById(outputPath, idShort)).map((name) =>
+      path.join(outputPath, name),
+    );
+  }
+
+  for (const candidate of candidates) {
+    if (!currentPaths.has(candidate)) {
+      staleOutputs.add(candidate);
+    }
+  }
+}
+
+/**
+ * ページの出力に必要な情報
+ */
+interface PageMetadata {
+  /** ページオブジェクト（親ブロックのメタデータで足りる場合は取得しない） */
+  page: PageObjectResponse | null;
+  title: string;
+  lastEditedTime: string;
+}
+
+/**
+ * ページのタイトル・更新日時を取得
+ * DBのクエリ結果や親のchild_pageブロックから分かる場合はpages.retrieveを省略する。
+ * 取得に失敗した場合はnull
+ */
+async function resolvePageMetadata(
+  task: TraversalTask,
+): Promise<PageMetadata | null> {
+  if (task.page) {
+    // DBのクエリ結果にプロパティまで含まれているので取り直さない
+    incrementStat("pageRetrievesSaved");
+    return {
+      page: task.page,
+      title: getPageTitle(task.page),
+      lastEditedTime: task.page.last_edited_time,
+    };
+  }
+
+  // プロパティが不要な子ページは親のchild_pageブロックのタイトル・更新日時を使う
+  if (
+    !task.includeProperties &&
+    task.title !== undefined &&
+    task.lastEditedTime
+  ) {
+    incrementStat("pageRetrievesSaved");
+    return {
+      page: null,
+      title: task.title || "Untitled",
+      lastEditedTime: task.lastEditedTime,
+    };
+  }
+
+  // 更新日時が分かっていればAPIレスポンスキャッシュを確認
+  if (task.lastEditedTime) {
+    const cached = await readCachedResponse<PageObjectResponse>(
+      "pages",
+      task.id,
+      task.lastEditedTime,
+    );
+    if (cached) {
+      return {
+        page: cached,
+        title: getPageTitle(cached),
+        lastEditedTime: cached.last_edited_time,
+      };
+    }
+  }
+
   try {
-    page = (await notion.pages.retrieve({
-      page_id: pageId,
+    const page = (await notion.pages.retrieve({
+      page_id: task.id,
     })) as PageObjectResponse;
+    await writeCachedResponse("pages", task.id, page.last_edited_time, page);
+    return {
+      page,
+      title: getPageTitle(page),
+      lastEditedTime: page.last_edited_time,
+    };
   } catch (e) {
-    console.error(`  Error fetching page ${pageId}: ${e}`);
-    return;
+    logError(`  Error fetching page ${task.id}: ${e}`, { id: task.id });
+    preservePreviousOutput(task.id.replace(/-/g, ""), e);
+    return null;
   }
+}
 
-  const title = getPageTitle(page);
+/**
+ * ページを1件処理して保存し、子ページ・子DBをキューに追加
+ */
+async function processPageTask(
+  task: TraversalTask,
+  enqueue: Enqueue,
+): Promise<void> {
+  const { id: pageId, outputPath, depth, includeProperties } = task;
   const pageIdShort = pageId.replace(/-/g, "");
+  const rerender = rerenderIds.has(pageIdShort);
 
-  // 処理済みIDを記録（削除検出用）
-  processedIds.add(pageIdShort);
+  // 親から更新日時が分かっていれば、変更がない場合はpages.retrieveも省略
+  if (task.lastEditedTime && !rerender) {
+    const unchanged = await findUnchangedEntry(
+      pageIdShort,
+      outputPath,
+      task.lastEditedTime,
+    );
+    if (unchanged) {
+      reuseUnchangedPage(task, unchanged, enqueue);
+      return;
+    }
+  }
 
-  // 同じIDを持つ古いファイル・フォルダを削除（タイトル変更に対応）
-  try {
-    const entries = await fs.readdir(outputPath, { withFileTypes: true });
-    for (const entry of entries) {
-      // 古いファイルを削除
-      if (
-        entry.isFile() &&
-        entry.name.endsWith(` ${pageIdShort}.md`) &&
-        entry.name !== `${sanitizeFilename(title)} ${pageIdShort}.md`
-      ) {
-        const oldFilePath = path.join(outputPath, entry.name);
-        await fs.unlink(oldFilePath);
-        console.log(`  🗑️  Removed old file: ${entry.name}`);
-      }
-      // 古いフォルダを削除（IDで判定）
-      if (
-        entry.isDirectory() &&
-        entry.name.endsWith(` ${pageIdShort}`) &&
-        entry.name !== `${sanitizeFilename(title)} ${pageIdShort}`
-      ) {
-        const oldDirPath = path.join(outputPath, entry.name);
-        await fs.rm(oldDirPath, { recursive: true });
-        console.log(`  🗑️  Removed old directory: ${entry.name}/`);
-      }
+  const metadata = await resolvePageMetadata(task);
+  if (!metadata) {
+    return;
+  }
+  const { page, title, lastEditedTime } = metadata;
+
+  if (lastEditedTime !== task.lastEditedTime && !rerender) {
+    const unchanged = await findUnchangedEntry(
+      pageIdShort,
+      outputPath,
+      lastEditedTime,
+    );
+    if (unchanged) {
+      reuseUnchangedPage(task, unchanged, enqueue);
+      return;
     }
-  } catch {
-    // ディレクトリが存在しない場合などはスキップ
   }
 
+  // 処理済みIDを記録（削除検出用）
+  processedIds.add(pageIdShort);
+
   // ファイル名: タイトル + page_id
   const filename = `${sanitizeFilename(title)} ${pageIdShort}.md`;
   const filepath = path.join(outputPath, filename);
 
   const indent = "  ".repeat(depth);
-  console.log(`${indent}📄 ${title}`);
+  logDebug(`${indent}📄 ${title}`, { event: "page", id: pageId, title });
+
+  const fetchAndRender = async () => {
+    // 子ブロック一覧は1回だけ取得し、本文の変換と子ページの探索の両方に使う
+    const { blocks, requestCount } = await withSpan(
+      "fetchBlocks",
+      () => getPageChildren(pageId),
+      { args: { id: pageId } },
+    );
+    incrementStat("blockListCallsSaved", requestCount);
+
+    // トグル・リスト・カラムなどネストしたブロックの子を取得
+    const nested = await withSpan("fetchNestedBlocks", () =>
+      fetchNestedBlocks(blocks),
+    );
+    if (nested.requestCount > 0) {
+      logDebug(
+        `${indent}  ↳ nested blocks: ${nested.requestCount} extra API calls`,
+        { id: pageId, nestedBlockListCalls: nested.requestCount },
+      );
+    }
+
+    // ページ内容を変換
+    const content = await withSpan(
+      "render",
+      () => renderPageContent(blocks, outputPath, title, nested.childrenById),
+      { args: { blocks: blocks.length } },
+    );
+    return { blocks, nested, content };
+  };
+
+  // APIレスポンスキャッシュにこの版のブロック一覧があればAPIを呼ばずに変換
+  let cachedListings: BlockListings | null = null;
+  let rendered: Awaited<ReturnType<typeof fetchAndRender>>;
+  try {
+    if (isResponseCacheEnabled()) {
+      cachedListings = await readCachedResponse<BlockListings>(
+        "blocks",
+        pageIdShort,
+        lastEditedTime,
+      );
+      const scope: ListingScope = {
+        cached: cachedListings,
+        recorded: {},
+        failed: false,
+      };
+      rendered = await listingScope.run(scope, fetchAndRender);
+      if (!cachedListings && !scope.failed) {
+        await writeCachedResponse(
+          "blocks",
+          pageIdShort,
+          lastEditedTime,
+          scope.recorded,
+        );
+      }
+    } else {
+      rendered = await fetchAndRender();
+    }
+  } catch (e) {
+    // ブロック一覧を取得できなかった（スナップショットにない場合を含む）ページは前回の出力を残す
+    logError(`  Error fetching blocks of page ${pageId}: ${e}`, {
+      id: pageId,
+    });
+    preservePreviousOutput(pageIdShort, e);
+    return;
+  }
+  const { blocks, nested, content } = rendered;
 
-  // ページ内容を取得
-  const content = await fetchPageContent(pageId, outputPath, title);
+  // 同じIDを持つ古いファイル・フォルダを記録（タイトル変更・移動に対応）
+  await collectStaleOutputs(
+    pageIdShort,
+    outputPath,
+    `${sanitizeFilename(title)} ${pageIdShort}`,
+    ".md",
+  );
 
   // プロパティテーブルを追加（DBレコードの場合）
   let propertiesMd = "";
-  if (includeProperties) {
+  if (includeProperties && page) {
     propertiesMd = getPagePropertiesMarkdown(page);
   }
 
   const markdown = `# ${title}\n\n${propertiesMd}${content}`;
 
-  // フォルダを作成してファイル保存
-  await fs.mkdir(path.dirname(filepath), { recursive: true });
-  await fs.writeFile(filepath, markdown, "utf-8");
+  // ファイル保存はファイル操作プールに任せ、完了を待たずに次へ進む
+  // （内容が前回と同じなら書き込まない。探索の最後にまとめて完了を待つ）
+  const previous = previousEntries[pageIdShort];
+  queueOutputWrite(
+    filepath,
+    markdown,
+    previous?.path === filepath ? previous.hash : undefined,
+  );
+  renderedPaths.add(filepath);
+  incrementStat("pagesRendered");
 
-  // 子ページを探索
-  const blocks = await getPageChildren(pageId);
-  const childPages = blocks.filter(
+  // 子ページを探索（トグルやカラム内にあるものも含む）
+  const allBlocks = [blocks, ...nested.childrenById.values()].flat();
+  const childPages = allBlocks.filter(
     (b) => b.type === "child_page" || b.type === "child_database",
   );
 
+  currentEntries.set(pageIdShort, {
+    type: "page",
+    title,
+    lastEditedTime,
+    path: filepath,
+    hash: hashContent(markdown),
+    children: childPages.map((b) => ({
+      id: b.id,
+      type: b.type === "child_page" ? "page" : "database",
+      title:
+        b.type === "child_page"
+          ? b.child_page.title
+          : b.type === "child_database"
+            ? b.child_database.title
+            : undefined,
+    })),
+    ...(includeProperties ? { includeProperties: true } : {}),
+    ...(DOWNLOAD_IMAGES && { assets: collectAssetKeys(allBlocks) }),
+  });
+
   if (childPages.length > 0) {
     // 子ページ用のフォルダを作成（ID付き）
     const childDir = path.join(
       outputPath,
       `${sanitizeFilename(title)} ${pageIdShort}`,
     );
-    await fs.mkdir(childDir, { recursive: true });
+    await ensureDir(childDir);
 
     for (const child of childPages) {
-      const childId = child.id;
-      if (child.type === "child_page") {
-        await processPage(childId, childDir, depth + 1);
-      } else if (child.type === "child_database") {
-        await processDatabase(childId, childDir, depth + 1);
+      enqueue({
+        type: child.type === "child_page" ? "page" : "database",
+        id: child.id,
+        outputPath: childDir,
+        depth: depth + 1,
+        includeProperties: false,
+        // キャッシュの子ページブロックは古い可能性があるので、子ページ側で取り直す
+        ...(!cachedListings && {
+          lastEditedTime: child.last_edited_time,
+          ...(child.type === "child_page" && {
+            title: child.child_page.title,
+          }),
+        }),
+      });
+    }
+  }
+}
+
+/**
+ * データベースのCSV出力結果
+ */
+interface DatabaseExport {
+  /** CSVの内容のハッシュ（書き換えなかった場合・レコードがない場合はnull） */
+  hash: string | null;
+  headers: string[];
+  rowIds: string[];
+  /** 書き込んだ（差分更新では変更・追加した）行数 */
+  rowsWritten: number;
+  /** 前回のCSVを差分更新したかどうか */
+  patched: boolean;
+}
+
+/**
+ * クエリで取得したレコードをキューに追加する関数
+ * completeがfalseの場合はプロパティが一部だけなので、ページオブジェクトを渡さない。
+ * キューが溜まっている間は解決しないので、awaitしてから次のクエリページを取得する
+ */
+type EnqueueRecord = (
+  record: PageObjectResponse,
+  complete: boolean,
+) => Promise<void>;
+
+type QueryOptions = Omit<
+  Parameters<Client["dataSources"]["query"]>[0],
+  "data_source_id" | "start_cursor"
+>;
+
+/**
+ * データソースのレコードをAPIのページ単位で順に返す
+ */
+async function* queryDataSource(
+  dataSourceId: string,
+  options: QueryOptions = {},
+): AsyncGenerator<PageObjectResponse[]> {
+  let cursor: string | undefined;
+  do {
+    const response = await notion.dataSources.query({
+      ...options,
+      data_source_id: dataSourceId,
+      start_cursor: cursor,
+    });
+    yield response.results.filter(
+      (result): result is PageObjectResponse => "properties" in result,
+    );
+    cursor = response.has_more
+      ? (response.next_cursor ?? undefined)
+      : undefined;
+  } while (cursor);
+}
+
+/**
+ * 全レコードを取得しながらCSVに書き出し、各レコードをキューに追加
+ * 取得したページごとに処理して、全レコードをメモリに溜めない。
+ * 内容が前回と同じ場合はCSVを置き換えない
+ */
+async function exportDatabaseCsv(
+  dataSourceId: string,
+  csvPath: string,
+  enqueueRecord: EnqueueRecord,
+  previousHash?: string,
+): Promise<DatabaseExport> {
+  const csv = createCsvWriter(csvPath);
+  const rowIds: string[] = [];
+
+  try {
+    for await (const records of queryDataSource(dataSourceId)) {
+      for (const record of records) {
+        await csv.write(record);
+        rowIds.push(record.id.replace(/-/g, ""));
+        await enqueueRecord(record, true);
       }
     }
+  } catch (e) {
+    await csv.abort();
+    throw e;
   }
+
+  return {
+    hash: await csv.close(previousHash),
+    headers: csv.headers,
+    rowIds,
+    rowsWritten: csv.rowCount,
+    patched: false,
+  };
 }
 
 /**
- * データベースを処理
+ * 前回の最高水位以降に更新されたレコードだけを取得し、CSVを差分更新
+ *
+ * - 更新されたレコードは last_edited_time on_or_after で絞り込んで取得
+ * - 削除されたレコードはタイトルだけを取得する照合で検出
+ * - スキーマが変わった・CSVが前回と一致しないなど差分更新できない場合はnull
  */
-export async function processDatabase(
-  databaseId: string,
-  outputPath: string,
-  depth: number = 0,
+async function patchDatabaseCsv(
+  dataSourceId: string,
+  csvPath: string,
+  state: ManifestDatabaseState,
+  enqueueRecord: EnqueueRecord,
+): Promise<DatabaseExport | null> {
+  // プロパティの追加・削除があれば全件出力
+  const dataSource = await notion.dataSources.retrieve({
+    data_source_id: dataSourceId,
+  });
+  const propertyNames =
+    "properties" in dataSource ? Object.keys(dataSource.properties) : [];
+  if (
+    propertyNames.length !== state.headers.length ||
+    !propertyNames.every((name) => state.headers.includes(name))
+  ) {
+    return null;
+  }
+
+  let existing: string;
+  try {
+    existing = await runFsTask(() => fs.readFile(csvPath, "utf-8"));
+  } catch {
+    return null;
+  }
+  const rows = splitCsvRows(existing);
+  if (rows.length !== state.rowIds.length + 1) {
+    return null;
+  }
+  const rowIndex = new Map(state.rowIds.map((id, i) => [id, i + 1]));
+
+  // 更新されたレコード
+  const changedRows = new Map<string, string>();
+  for await (const records of queryDataSource(dataSourceId, {
+    filter: {
+      timestamp: "last_edited_time",
+      last_edited_time: { on_or_after: state.highWaterMark },
+    },
+  })) {
+    for (const record of records) {
+      changedRows.set(
+        record.id.replace(/-/g, ""),
+        recordToCsvRow(record, state.headers),
+      );
+      await enqueueRecord(record, true);
+    }
+  }
+
+  // 現在のレコードIDを照合（タイトルプロパティだけを取得して軽くする）
+  const currentIds = new Set<string>();
+  for await (const records of queryDataSource(dataSourceId, {
+    filter_properties: ["title"],
+  })) {
+    for (const record of records) {
+      const id = record.id.replace(/-/g, "");
+      currentIds.add(id);
+      if (changedRows.has(id)) {
+        continue;
+      }
+      if (!rowIndex.has(id)) {
+        // 最高水位より前に更新された未知のレコード（他のDBから移動など）
+        return null;
+      }
+      // タイトル以外のプロパティがないので、変更があれば取り直す
+      await enqueueRecord(record, false);
+    }
+  }
+
+  const removedCount = state.rowIds.filter((id) => !currentIds.has(id)).length;
+  if (changedRows.size === 0 && removedCount === 0) {
+    return {
+      hash: null,
+      headers: state.headers,
+      rowIds: state.rowIds,
+      rowsWritten: 0,
+      patched: true,
+    };
+  }
+
+  // 既存の行を置き換え・削除し、新しいレコードを末尾に追加
+  const lines = [rows[0]];
+  const rowIds: string[] = [];
+  for (const id of state.rowIds) {
+    if (currentIds.has(id)) {
+      lines.push(changedRows.get(id) ?? rows[rowIndex.get(id)!]);
+      rowIds.push(id);
+    }
+  }
+  for (const [id, row] of changedRows) {
+    if (!rowIndex.has(id) && currentIds.has(id)) {
+      lines.push(row);
+      rowIds.push(id);
+    }
+  }
+
+  const content = lines.join("\n") + "\n";
+  // 表示される列が変わらない更新（並び替えなど）では書き込まない
+  if (content === existing) {
+    incrementStat("filesSkipped");
+  } else {
+    await runFsTask(() => writeFileAtomic(csvPath, content));
+    incrementStat("filesWritten");
+  }
+  if (removedCount > 0) {
+    logDebug(`  🗑️  Removed ${removedCount} deleted rows from CSV`, {
+      path: csvPath,
+      rowsRemoved: removedCount,
+    });
+  }
+
+  return {
+    hash: hashContent(content),
+    headers: state.headers,
+    rowIds,
+    rowsWritten: changedRows.size,
+    patched: true,
+  };
+}
+
+/**
+ * データベースを1件処理してCSVを保存し、レコードをキューに追加
+ */
+async function processDatabaseTask(
+  task: TraversalTask,
+  enqueue: Enqueue,
+  waitForBacklog: WaitForBacklog,
 ): Promise<void> {
+  const { id: databaseId, outputPath, depth } = task;
+  const dbIdShort = databaseId.replace(/-/g, "");
   let db: DatabaseObjectResponse;
   try {
     const response = await notion.databases.retrieve({
@@ -583,52 +1710,40 @@ export async function processDatabase(
     });
     // PartialDatabaseObjectResponse でないことを確認
     if (!("title" in response)) {
-      console.error(`  Database ${databaseId} is not fully accessible`);
+      logError(`  Database ${databaseId} is not fully accessible`, {
+        id: databaseId,
+      });
       return;
     }
     db = response;
   } catch (e) {
-    console.error(`  Error fetching database ${databaseId}: ${e}`);
+    logError(`  Error fetching database ${databaseId}: ${e}`, {
+      id: databaseId,
+    });
+    preservePreviousOutput(dbIdShort, e);
     return;
   }
 
   const title =
     db.title && db.title.length > 0 ? db.title[0].plain_text : "Untitled";
-  const dbIdShort = databaseId.replace(/-/g, "");
 
   // 処理済みIDを記録（削除検出用）
   processedIds.add(dbIdShort);
 
   const indent = "  ".repeat(depth);
-  console.log(`${indent}🗄️ ${title}`);
+  logDebug(`${indent}🗄️ ${title}`, {
+    event: "database",
+    id: databaseId,
+    title,
+  });
 
   // データソースIDを取得（v5 API: DatabaseにはData Sourcesが紐づく）
   const dataSourceId = db.data_sources?.[0]?.id;
   if (!dataSourceId) {
-    console.error(`  No data source found for database ${databaseId}`);
-    return;
-  }
-
-  // データベースのレコードを取得（v5: dataSources.queryを使用）
-  const records: PageObjectResponse[] = [];
-  let cursor: string | undefined;
-
-  while (true) {
-    const response = await notion.dataSources.query({
-      data_source_id: dataSourceId,
-      start_cursor: cursor,
+    logError(`  No data source found for database ${databaseId}`, {
+      id: databaseId,
     });
-
-    for (const result of response.results) {
-      if ("properties" in result) {
-        records.push(result as PageObjectResponse);
-      }
-    }
-
-    if (!response.has_more) {
-      break;
-    }
-    cursor = response.next_cursor ?? undefined;
+    return;
   }
 
   // フォルダ作成（ID付き）
@@ -636,44 +1751,100 @@ export async function processDatabase(
     outputPath,
     `${sanitizeFilename(title)} ${dbIdShort}`,
   );
-  await fs.mkdir(dbDir, { recursive: true });
+  await ensureDir(dbDir);
+
+  const csvFilename = `${sanitizeFilename(title)} ${dbIdShort}.csv`;
+  const csvPath = path.join(outputPath, csvFilename);
+  const queryStartedAt = new Date();
+
+  // 各レコードを処理（プロパティ付きで）
+  // レンダリングが追いつくまで待ち、クエリ結果のページオブジェクトを溜め込まない
+  const enqueueRecord: EnqueueRecord = async (record, complete) => {
+    enqueue({
+      type: "page",
+      id: record.id,
+      outputPath: dbDir,
+      depth: depth + 1,
+      includeProperties: true,
+      lastEditedTime: record.last_edited_time,
+      ...(complete && { page: record }),
+    });
+    await waitForBacklog();
+  };
 
-  // 同じIDを持つ古いディレクトリ・CSVを削除（タイトル変更に対応）
+  // 前回のCSVがあれば更新されたレコードだけを取得して差分更新
+  const previous = previousEntries[dbIdShort];
+  let result: DatabaseExport;
   try {
-    const entries = await fs.readdir(outputPath, { withFileTypes: true });
-
-    for (const entry of entries) {
-      // 古いディレクトリを削除（IDで判定）
-      if (
-        entry.isDirectory() &&
-        entry.name.endsWith(` ${dbIdShort}`) &&
-        entry.name !== `${sanitizeFilename(title)} ${dbIdShort}`
-      ) {
-        const oldDirPath = path.join(outputPath, entry.name);
-        await fs.rm(oldDirPath, { recursive: true });
-        console.log(`  🗑️  Removed old directory: ${entry.name}/`);
-      }
-      // 古いCSVファイルを削除
-      if (
-        entry.isFile() &&
-        entry.name.endsWith(` ${dbIdShort}.csv`) &&
-        entry.name !== `${sanitizeFilename(title)} ${dbIdShort}.csv`
-      ) {
-        const oldFilePath = path.join(outputPath, entry.name);
-        await fs.unlink(oldFilePath);
-        console.log(`  🗑️  Removed old CSV: ${entry.name}`);
-      }
+    let patched: DatabaseExport | null = null;
+    if (
+      !FULL_SYNC &&
+      previous?.database?.dataSourceId === dataSourceId &&
+      previous.path === csvPath
+    ) {
+      const state = previous.database;
+      patched = await withSpan("patchCsv", () =>
+        patchDatabaseCsv(dataSourceId, csvPath, state, enqueueRecord),
+      );
     }
-  } catch {
-    // エラーはスキップ
+    result =
+      patched ??
+      (await withSpan("exportCsv", () =>
+        exportDatabaseCsv(
+          dataSourceId,
+          csvPath,
+          enqueueRecord,
+          previous?.path === csvPath ? previous.hash : undefined,
+        ),
+      ));
+  } catch (e) {
+    // クエリに失敗した（スナップショットにない場合を含む）データベースは前回の出力を残す
+    logError(`  Error querying database ${databaseId}: ${e}`, {
+      id: databaseId,
+    });
+    preservePreviousOutput(dbIdShort, e);
+    return;
   }
 
-  // CSVエクスポート
-  await exportDatabaseToCsv(records, title, dbIdShort, outputPath);
+  // 同じIDを持つ古いディレクトリ・CSVを記録（タイトル変更・移動に対応）
+  await collectStaleOutputs(
+    dbIdShort,
+    outputPath,
+    `${sanitizeFilename(title)} ${dbIdShort}`,
+    ".csv",
+  );
 
-  // 各レコードを処理（プロパティ付きで）
-  for (const record of records) {
-    const recordId = record.id;
-    await processPage(recordId, dbDir, depth + 1, true);
+  if (result.rowsWritten > 0) {
+    logDebug(
+      `  📊 CSV ${result.patched ? "patched" : "exported"}: ${csvFilename} (${result.rowsWritten} rows written)`,
+      {
+        id: databaseId,
+        patched: result.patched,
+        rowsWritten: result.rowsWritten,
+      },
+    );
   }
+
+  currentEntries.set(dbIdShort, {
+    type: "database",
+    title,
+    lastEditedTime: db.last_edited_time,
+    path: csvPath,
+    hash: result.hash ?? previous?.hash ?? "",
+    children: [],
+    // スナップショットからの再出力では基準日時が分からないので、次回はCSVを出力し直す
+    ...(result.rowIds.length > 0 &&
+      !isSnapshotReplay() && {
+        database: {
+          dataSourceId,
+          highWaterMark: nextHighWaterMark(
+            result.patched ? previous?.database?.highWaterMark : undefined,
+            result.rowsWritten > 0,
+            queryStartedAt,
+          ),
+          headers: result.headers,
+          rowIds: result.rowIds,
+        },
+      }),
+  });
 }
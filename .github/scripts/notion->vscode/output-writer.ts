@@ -0,0 +1,204 @@
+/**
+ * 出力ファイルの書き込み
+ * - 内容が前回と同じ場合は書き込まない（mtimeを変えず、ワークフローのgit add -Aでの再ハッシュも避ける）
+ * - 一時ファイルに書いてからリネームする（途中で中断されても書きかけのファイルが残らない）
+ * - 作成済みのディレクトリを記憶し、同じディレクトリへのmkdirを繰り返さない
+ * - ファイル操作はAPIリクエストとは別の並列度制限付きプールで実行する
+ */
+import { createHash } from "node:crypto";
+import { createReadStream } from "node:fs";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import { hashContent } from "./manifest.js";
+import { incrementStat } from "./sync-stats.js";
+import { linkSpan, withSpan } from "./tracing.js";
+import { parsePositiveInt } from "./utils.js";
+import { createWorkQueue } from "./work-queue.js";
+
+// ============================================================
+// 設定
+// ============================================================
+
+// ファイル操作を並列に行う数
+const FS_CONCURRENCY = parsePositiveInt(process.env.NOTION_FS_CONCURRENCY, 16);
+
+// 書き込み中の一時ファイルの拡張子
+const TEMP_SUFFIX = ".tmp";
+
+// ============================================================
+// ファイル操作プール
+// ============================================================
+const fsQueue = createWorkQueue<() => Promise<void>>(FS_CONCURRENCY, (task) =>
+  task(),
+);
+
+/**
+ * ファイル操作をプールで実行（同時に実行する数をNOTION_FS_CONCURRENCYに制限）
+ */
+export function runFsTask<T>(fn: () => Promise<T>): Promise<T> {
+  return new Promise<T>((resolve, reject) => {
+    fsQueue.push(() => fn().then(resolve, reject));
+  });
+}
+
+// ============================================================
+// ディレクトリ作成
+// ============================================================
+
+// 作成済み（作成中）のディレクトリ
+const createdDirs = new Map<string, Promise<void>>();
+
+/**
+ * ディレクトリを作成（実行中に同じディレクトリは1回だけmkdirする）
+ */
+export function ensureDir(dir: string): Promise<void> {
+  const key = path.resolve(dir);
+  let created = createdDirs.get(key);
+  if (!created) {
+    created = fs.mkdir(dir, { recursive: true }).then(() => undefined);
+    // 失敗した場合は次回に再試行する
+    created.catch(() => createdDirs.delete(key));
+    createdDirs.set(key, created);
+  }
+  return created;
+}
+
+/**
+ * 作成済みディレクトリの記録をクリア（ディレクトリを削除した後に呼ぶ）
+ */
+export function forgetCreatedDirs(): void {
+  createdDirs.clear();
+}
+
+// ============================================================
+// 変更判定
+// ============================================================
+
+/**
+ * 既存ファイルの内容のSHA-256を計算（存在しない場合はnull）
+ * 大きなCSVも読み込めるようにストリームで計算する
+ */
+async function hashExistingFile(filePath: string): Promise<string | null> {
+  const hash = createHash("sha256");
+  try {
+    for await (const chunk of createReadStream(filePath)) {
+      hash.update(chunk as Buffer);
+    }
+  } catch {
+    return null;
+  }
+  return hash.digest("hex");
+}
+
+/**
+ * 出力先のファイルが新しい内容と同じかどうか
+ * 前回のマニフェストのハッシュがあればそれと比べ（ファイルは存在確認だけ）、
+ * ない場合は既存ファイルのハッシュと比べる
+ */
+export async function isOutputUnchanged(
+  filePath: string,
+  hash: string,
+  previousHash?: string,
+): Promise<boolean> {
+  if (previousHash !== undefined) {
+    if (previousHash !== hash) {
+      return false;
+    }
+    try {
+      await fs.access(filePath);
+      return true;
+    } catch {
+      return false;
+    }
+  }
+  return (await hashExistingFile(filePath)) === hash;
+}
+
+// ============================================================
+// 書き込み
+// ============================================================
+
+/**
+ * 一時ファイルに書き込んでからリネームする
+ */
+export async function writeFileAtomic(
+  filePath: string,
+  content: string,
+): Promise<void> {
+  await ensureDir(path.dirname(filePath));
+  const tempPath = `${filePath}.${process.pid}${TEMP_SUFFIX}`;
+  try {
+    await fs.writeFile(tempPath, content, "utf-8");
+    await fs.rename(tempPath, filePath);
+  } catch (e) {
+    await fs.rm(tempPath, { force: true });
+    throw e;
+  }
+}
+
+/**
+ * 内容が変わった場合だけファイルを書き込む
+ * 書き込んだ場合はtrueを返す
+ */
+export async function writeFileIfChanged(
+  filePath: string,
+  content: string,
+  previousHash?: string,
+): Promise<boolean> {
+  if (await isOutputUnchanged(filePath, hashContent(content), previousHash)) {
+    incrementStat("filesSkipped");
+    return false;
+  }
+
+  await writeFileAtomic(filePath, content);
+  incrementStat("filesWritten");
+  return true;
+}
+
+// ============================================================
+// 非同期の書き込み
+// ============================================================
+
+// プールに投入済みで完了していない書き込み
+const pendingWrites = new Set<Promise<unknown>>();
+let firstWriteError: unknown = null;
+
+/**
+ * 書き込みをプールに投入し、完了を待たずに戻る
+ * 呼び出し元は次のAPIリクエストに進めるので、ディスクI/OとAPIの待ち時間が重なる
+ */
+export function queueOutputWrite(
+  filePath: string,
+  content: string,
+  previousHash?: string,
+): void {
+  // 書き込みはプールの空き次第で後から実行されるので、投入したスパンを記録しておく
+  const link = linkSpan();
+  const write = runFsTask(() =>
+    withSpan(
+      "writeFile",
+      () => writeFileIfChanged(filePath, content, previousHash),
+      { link, args: { path: filePath } },
+    ),
+  )
+    .catch((e) => {
+      firstWriteError ??= e;
+    })
+    .finally(() => pendingWrites.delete(write));
+  pendingWrites.add(write);
+}
+
+/**
+ * 投入済みの書き込みがすべて終わるまで待つ
+ * 失敗した書き込みがあれば最初のエラーを投げる
+ */
+export async function flushOutputWrites(): Promise<void> {
+  while (pendingWrites.size > 0) {
+    await Promise.all(pendingWrites);
+  }
+  const error = firstWriteError;
+  firstWriteError = null;
+  if (error) {
+    throw error;
+  }
+}
@@ -0,0 +1,23 @@
+/**
+ * スナップショットからroot_pageを再生成するスクリプト（Notion APIを呼ばない）
+ * 使い方: npm run render -- [スナップショットのパス]
+ * パスを省略した場合は NOTION_SYNC_SNAPSHOT_REPLAY、NOTION_SYNC_SNAPSHOT の順に使う
+ */
+import "dotenv/config";
+
+const snapshotPath =
+  process.argv[2] ||
+  process.env.NOTION_SYNC_SNAPSHOT_REPLAY ||
+  process.env.NOTION_SYNC_SNAPSHOT;
+
+if (!snapshotPath) {
+  console.error("Error: snapshot path is not set");
+  process.exit(1);
+}
+
+// 設定は各モジュールの読み込み時に参照されるので、読み込む前に切り替える
+process.env.NOTION_SYNC_SNAPSHOT_REPLAY = snapshotPath;
+// 再出力中に同じスナップショットへ書き込まない
+process.env.NOTION_SYNC_SNAPSHOT = "";
+
+await import("./index.js");
@@ -0,0 +1,174 @@
+/**
+ * Notion APIレスポンスのディスクキャッシュ
+ * オブジェクトID + last_edited_time をキーに保存し、変更のないオブジェクトはAPIを呼ばずにディスクから返す。
+ * NOTION_SYNC_CACHE_DIR を設定した場合のみ有効（Markdown変換を変えた後の再出力やローカルでの試行用）
+ */
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import { logWarn } from "../shared/logger.js";
+import { runFsTask, writeFileAtomic } from "./output-writer.js";
+import { incrementStat } from "./sync-stats.js";
+import { parsePositiveInt } from "./utils.js";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+/**
+ * キャッシュするレスポンスの種類（サブディレクトリ名）
+ */
+export type CacheKind = "blocks" | "pages";
+
+interface CacheEntry<T> {
+  lastEditedTime: string;
+  data: T;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+const CACHE_DIR = process.env.NOTION_SYNC_CACHE_DIR ?? "";
+
+// キャッシュの上限サイズ（超えた分は最後に使われた日時が古いものから削除）
+const CACHE_MAX_BYTES =
+  parsePositiveInt(process.env.NOTION_SYNC_CACHE_MAX_MB, 512) * 1024 * 1024;
+
+/**
+ * キャッシュが有効かどうか
+ */
+export function isResponseCacheEnabled(): boolean {
+  return CACHE_DIR !== "";
+}
+
+/**
+ * キャッシュファイルのパス
+ */
+function getCachePath(kind: CacheKind, id: string): string {
+  return path.join(CACHE_DIR, kind, `${id.replace(/-/g, "")}.json`);
+}
+
+// ============================================================
+// 読み書き
+// ============================================================
+
+/**
+ * キャッシュからレスポンスを取得
+ * last_edited_timeが一致しない・存在しない・壊れている場合はnull
+ */
+export async function readCachedResponse<T>(
+  kind: CacheKind,
+  id: string,
+  lastEditedTime: string,
+): Promise<T | null> {
+  if (!isResponseCacheEnabled()) {
+    return null;
+  }
+
+  const cachePath = getCachePath(kind, id);
+  let entry: CacheEntry<T>;
+  try {
+    entry = JSON.parse(
+      await runFsTask(() => fs.readFile(cachePath, "utf-8")),
+    ) as CacheEntry<T>;
+  } catch {
+    incrementStat("cacheMisses");
+    return null;
+  }
+  if (entry.lastEditedTime !== lastEditedTime) {
+    incrementStat("cacheMisses");
+    return null;
+  }
+
+  incrementStat("cacheHits");
+  // LRUのために最終使用日時（mtime）を更新
+  const now = new Date();
+  await runFsTask(() => fs.utimes(cachePath, now, now)).catch(() => undefined);
+  return entry.data;
+}
+
+/**
+ * レスポンスをキャッシュに保存（同じIDの古いバージョンは置き換える）
+ */
+export async function writeCachedResponse<T>(
+  kind: CacheKind,
+  id: string,
+  lastEditedTime: string,
+  data: T,
+): Promise<void> {
+  if (!isResponseCacheEnabled()) {
+    return;
+  }
+
+  const entry: CacheEntry<T> = { lastEditedTime, data };
+  try {
+    await runFsTask(() =>
+      writeFileAtomic(getCachePath(kind, id), JSON.stringify(entry)),
+    );
+  } catch (e) {
+    // キャッシュの書き込み失敗で同期は止めない
+    logWarn(`  ⚠️ Response cache write error: ${e}`, { kind, id });
+  }
+}
+
+// ============================================================
+// 容量制限
+// ============================================================
+
+/**
+ * キャッシュが上限サイズを超えていれば、最後に使われた日時が古いものから削除
+ * 削除したファイル数を返す
+ */
+export async function pruneResponseCache(
+  maxBytes: number = CACHE_MAX_BYTES,
+): Promise<number> {
+  if (!isResponseCacheEnabled()) {
+    return 0;
+  }
+
+  const files: { filePath: string; size: number; usedAt: number }[] = [];
+  const kinds: CacheKind[] = ["blocks", "pages"];
+  for (const kind of kinds) {
+    const dir = path.join(CACHE_DIR, kind);
+    let names: string[] = [];
+    try {
+      names = await fs.readdir(dir);
+    } catch {
+      continue;
+    }
+    const stats = await Promise.all(
+      names.map((name) =>
+        runFsTask(() => fs.stat(path.join(dir, name))).catch(() => null),
+      ),
+    );
+    stats.forEach((stat, i) => {
+      if (stat?.isFile()) {
+        files.push({
+          filePath: path.join(dir, names[i]),
+          size: stat.size,
+          usedAt: stat.mtimeMs,
+        });
+      }
+    });
+  }
+
+  let total = files.reduce((sum, file) => sum + file.size, 0);
+  if (total <= maxBytes) {
+    return 0;
+  }
+
+  files.sort((a, b) => a.usedAt - b.usedAt);
+  const evicted: string[] = [];
+  for (const file of files) {
+    if (total <= maxBytes) {
+      break;
+    }
+    evicted.push(file.filePath);
+    total -= file.size;
+  }
+  await Promise.all(
+    evicted.map((filePath) =>
+      runFsTask(() => fs.rm(filePath, { force: true })),
+    ),
+  );
+  return evicted.length;
+}
@@ -0,0 +1,261 @@
+/**
+ * Notion APIレスポンスのスナップショット
+ * pull時に取得したレスポンスをNDJSON（1行1レスポンス）で保存し、
+ * renderではスナップショットからレスポンスを返してネットワークを使わずにroot_pageを再生成する
+ */
+import { createReadStream, createWriteStream, type WriteStream } from "node:fs";
+import { once } from "node:events";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import { createInterface } from "node:readline";
+import { logWarn } from "../shared/logger.js";
+import type { FetchLike } from "../shared/notion-fetch.js";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+/**
+ * スナップショットの1行
+ */
+interface SnapshotRecord {
+  method: string;
+  /** パスとクエリ（例: /v1/blocks/{id}/children?start_cursor=...） */
+  url: string;
+  /** リクエストボディ（JSON文字列） */
+  body: string | null;
+  status: number;
+  response: unknown;
+}
+
+/**
+ * スナップショット内の1行の位置
+ */
+interface RecordLocation {
+  offset: number;
+  length: number;
+}
+
+export interface SnapshotStats {
+  /** 保存したレスポンス数 */
+  recorded: number;
+  /** スナップショットから返したレスポンス数 */
+  replayed: number;
+  /** スナップショットになかったリクエスト数 */
+  missing: number;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+// 取得したレスポンスを保存するファイル（pull）
+const RECORD_PATH = process.env.NOTION_SYNC_SNAPSHOT ?? "";
+// レスポンスを読み込むファイル（render、設定するとネットワークを使わない）
+const REPLAY_PATH = process.env.NOTION_SYNC_SNAPSHOT_REPLAY ?? "";
+
+/**
+ * スナップショットからの再出力モードかどうか
+ */
+export function isSnapshotReplay(): boolean {
+  return REPLAY_PATH !== "";
+}
+
+// ============================================================
+// 共通
+// ============================================================
+const stats: SnapshotStats = { recorded: 0, replayed: 0, missing: 0 };
+
+/**
+ * スナップショットの統計を取得
+ */
+export function getSnapshotStats(): SnapshotStats {
+  return { ...stats };
+}
+
+/**
+ * リクエストを識別するキー（メソッド + パスとクエリ + ボディ）
+ */
+function toRequestKey(method: string, url: string, body: string | null): string {
+  return `${method.toUpperCase()} ${url} ${body ?? ""}`;
+}
+
+/**
+ * URLからパスとクエリを取り出す（ホストの違いを無視する）
+ */
+function toPathAndSearch(url: string): string {
+  const parsed = new URL(url);
+  return parsed.pathname + parsed.search;
+}
+
+// ============================================================
+// 保存
+// ============================================================
+let recordStream: WriteStream | null = null;
+let recordError: unknown = null;
+
+// 再生中に開いているスナップショット
+let replayFile: fs.FileHandle | null = null;
+
+/**
+ * レスポンスを1行追記
+ */
+async function appendRecord(record: SnapshotRecord): Promise<void> {
+  if (!recordStream) {
+    await fs.mkdir(path.dirname(path.resolve(RECORD_PATH)), {
+      recursive: true,
+    });
+    // 並行して開かれた場合は先に開いたストリームを使う
+    if (!recordStream) {
+      recordStream = createWriteStream(RECORD_PATH, { encoding: "utf-8" });
+      recordStream.on("error", (e) => {
+        recordError ??= e;
+      });
+    }
+  }
+  if (!recordStream.write(JSON.stringify(record) + "\n")) {
+    await once(recordStream, "drain");
+  }
+  stats.recorded++;
+}
+
+/**
+ * レスポンスを保存するfetchでラップ
+ */
+function createRecordingFetch(baseFetch: FetchLike): FetchLike {
+  return async (url, init) => {
+    const response = await baseFetch(url, init);
+    try {
+      const text = await response.clone().text();
+      await appendRecord({
+        method: init?.method ?? "GET",
+        url: toPathAndSearch(url),
+        body: typeof init?.body === "string" ? init.body : null,
+        status: response.status,
+        response: JSON.parse(text),
+      });
+    } catch (e) {
+      // JSONでないレスポンスは保存しない
+      logWarn(`  ⚠️ Snapshot record error: ${e}`);
+    }
+    return response;
+  };
+}
+
+/**
+ * スナップショットの書き込みを完了し、再生中のファイルを閉じる
+ */
+export async function closeSnapshot(): Promise<void> {
+  await replayFile?.close();
+  replayFile = null;
+  if (!recordStream) {
+    return;
+  }
+  const stream = recordStream;
+  recordStream = null;
+  const closing = once(stream, "close");
+  stream.end();
+  await closing;
+  if (recordError) {
+    throw recordError;
+  }
+}
+
+// ============================================================
+// 再生
+// ============================================================
+
+/**
+ * スナップショットを1行ずつ読み、リクエストキー → 行の位置の索引を作成
+ * レスポンス本体はメモリに載せず、必要になった時にファイルから読む
+ */
+async function loadSnapshotIndex(
+  snapshotPath: string,
+): Promise<Map<string, RecordLocation>> {
+  const index = new Map<string, RecordLocation>();
+  const lines = createInterface({
+    input: createReadStream(snapshotPath, { encoding: "utf-8" }),
+    crlfDelay: Infinity,
+  });
+
+  let offset = 0;
+  for await (const line of lines) {
+    const length = Buffer.byteLength(line, "utf-8");
+    if (line.trim()) {
+      const record = JSON.parse(line) as SnapshotRecord;
+      // 同じリクエストが複数あれば後のものを使う
+      index.set(toRequestKey(record.method, record.url, record.body), {
+        offset,
+        length,
+      });
+    }
+    offset += length + 1;
+  }
+  return index;
+}
+
+/**
+ * スナップショットからレスポンスを返すfetchを作成
+ * スナップショットにないリクエストはエラーにする（前回の出力は残る）
+ */
+function createReplayFetch(snapshotPath: string): FetchLike {
+  let loading: Promise<{
+    index: Map<string, RecordLocation>;
+    file: fs.FileHandle;
+  }> | null = null;
+
+  return async (url, init) => {
+    loading ??= Promise.all([
+      loadSnapshotIndex(snapshotPath),
+      fs.open(snapshotPath, "r"),
+    ]).then(([index, file]) => {
+      replayFile = file;
+      return { index, file };
+    });
+    const { index, file } = await loading;
+
+    const key = toRequestKey(
+      init?.method ?? "GET",
+      toPathAndSearch(url),
+      typeof init?.body === "string" ? init.body : null,
+    );
+    const location = index.get(key);
+    if (!location) {
+      stats.missing++;
+      return Response.json(
+        {
+          object: "error",
+          status: 400,
+          code: "validation_error",
+          message: `Request not found in snapshot: ${key}`,
+        },
+        { status: 400 },
+      );
+    }
+
+    const buffer = Buffer.alloc(location.length);
+    await file.read(buffer, 0, location.length, location.offset);
+    const record = JSON.parse(buffer.toString("utf-8")) as SnapshotRecord;
+    stats.replayed++;
+    return Response.json(record.response, { status: record.status });
+  };
+}
+
+// ============================================================
+// fetchの切り替え
+// ============================================================
+
+/**
+ * Notionクライアントに渡すfetchを設定に応じて切り替える
+ * - NOTION_SYNC_SNAPSHOT_REPLAY: スナップショットから返す（baseFetchは使わない）
+ * - NOTION_SYNC_SNAPSHOT: baseFetchのレスポンスを保存する
+ */
+export function createSnapshotFetch(baseFetch: FetchLike): FetchLike {
+  if (isSnapshotReplay()) {
+    return createReplayFetch(REPLAY_PATH);
+  }
+  if (RECORD_PATH) {
+    return createRecordingFetch(baseFetch);
+  }
+  return baseFetch;
+}
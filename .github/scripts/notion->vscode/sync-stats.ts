@@ -0,0 +1,78 @@
+/**
+ * 同期処理の統計情報
+ * 実行サマリーに表示するカウンタをここに集約
+ */
+
+// ============================================================
+// 型定義
+// ============================================================
+export interface SyncStats {
+  /** blocks.children.list の呼び出し回数 */
+  blockListCalls: number;
+  /** 子ブロック一覧の再利用で省略できた blocks.children.list の呼び出し回数 */
+  blockListCallsSaved: number;
+  /** ネストしたブロック（トグル・リスト・カラムなど）の取得に要した呼び出し回数 */
+  nestedBlockListCalls: number;
+  /** クエリ結果・親ブロックのメタデータを使うことで省略できた pages.retrieve の呼び出し回数 */
+  pageRetrievesSaved: number;
+  /** 本文を取得してMarkdownを書き出したページ数 */
+  pagesRendered: number;
+  /** マニフェストにより変更なしと判定して省略したページ数 */
+  pagesUnchanged: number;
+  /** 書き込んだ出力ファイル数 */
+  filesWritten: number;
+  /** 内容が同じだったため書き込みを省略した出力ファイル数 */
+  filesSkipped: number;
+  /** 削除したファイル・フォルダ数 */
+  filesRemoved: number;
+  /** APIレスポンスキャッシュから返したレスポンス数 */
+  cacheHits: number;
+  /** APIレスポンスキャッシュになかった（または古かった）レスポンス数 */
+  cacheMisses: number;
+}
+
+// ============================================================
+// カウンタ
+// ============================================================
+
+/**
+ * 全カウンタが0の統計情報を作成
+ */
+function createEmptyStats(): SyncStats {
+  return {
+    blockListCalls: 0,
+    blockListCallsSaved: 0,
+    nestedBlockListCalls: 0,
+    pageRetrievesSaved: 0,
+    pagesRendered: 0,
+    pagesUnchanged: 0,
+    filesWritten: 0,
+    filesSkipped: 0,
+    filesRemoved: 0,
+    cacheHits: 0,
+    cacheMisses: 0,
+  };
+}
+
+const stats: SyncStats = createEmptyStats();
+
+/**
+ * カウンタを加算
+ */
+export function incrementStat(key: keyof SyncStats, amount: number = 1): void {
+  stats[key] += amount;
+}
+
+/**
+ * 統計情報のスナップショットを取得
+ */
+export function getSyncStats(): SyncStats {
+  return { ...stats };
+}
+
+/**
+ * 統計情報をリセット
+ */
+export function resetSyncStats(): void {
+  Object.assign(stats, createEmptyStats());
+}
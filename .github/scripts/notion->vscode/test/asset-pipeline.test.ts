@@ -0,0 +1,312 @@
+/**
+ * asset-pipeline ユニットテスト
+ * MSWを使用して画像のダウンロードをモック
+ */
+import {
+  describe,
+  it,
+  expect,
+  beforeAll,
+  beforeEach,
+  afterAll,
+  afterEach,
+  vi,
+} from "vitest";
+import { http, HttpResponse } from "msw";
+import { setupServer } from "msw/node";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+
+const S3_BASE = "https://prod-files-secure.s3.us-west-2.amazonaws.com";
+
+const server = setupServer();
+
+beforeAll(() => {
+  server.listen({ onUnhandledRequest: "error" });
+  process.env.NOTION_RATE_LIMIT_RPS = "1000";
+  process.env.NOTION_RATE_LIMIT_BURST = "1000";
+});
+
+afterEach(() => {
+  server.resetHandlers();
+});
+
+afterAll(() => {
+  server.close();
+});
+
+describe("resolveAsset", () => {
+  it("should key images by the Notion file UUID", async () => {
+    const { resolveAsset } = await import("../asset-pipeline.js");
+
+    const asset = resolveAsset(
+      `${S3_BASE}/workspace/abc123/photo%201.png?X-Amz-Signature=xxx`,
+    );
+
+    expect(asset).toEqual({ key: "abc123", safeName: "photo 1.png" });
+  });
+
+  it("should replace characters that are invalid in filenames", async () => {
+    const { resolveAsset } = await import("../asset-pipeline.js");
+
+    const asset = resolveAsset(`${S3_BASE}/workspace/abc123/a%3Ab%3F.png`);
+
+    expect(asset.safeName).toBe("a_b_.png");
+  });
+
+  it("should ignore the signature when hashing URLs without a UUID", async () => {
+    const { resolveAsset } = await import("../asset-pipeline.js");
+
+    const a = resolveAsset("https://example.com/image.png?sig=1");
+    const b = resolveAsset("https://example.com/image.png?sig=2");
+
+    expect(a.key).toBe(b.key);
+    expect(a.key).toHaveLength(12);
+  });
+});
+
+describe("toAssetLink", () => {
+  it("should build a relative POSIX link to the store", async () => {
+    const { toAssetLink } = await import("../asset-pipeline.js");
+
+    expect(
+      toAssetLink(
+        path.join("/out", "Parent abc"),
+        path.join("/out", "images", "0123_logo.png"),
+      ),
+    ).toBe("../images/0123_logo.png");
+  });
+});
+
+describe("scheduleAssetDownload", () => {
+  let tempDir: string;
+  let storeDir: string;
+
+  beforeEach(async () => {
+    tempDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-asset-"));
+    storeDir = path.join(tempDir, "images");
+    vi.resetModules();
+  });
+
+  afterEach(async () => {
+    await fs.rm(tempDir, { recursive: true, force: true });
+  });
+
+  it("should stream new images into the store on flush", async () => {
+    const data = Buffer.alloc(256 * 1024, 7);
+    server.use(
+      http.get(`${S3_BASE}/*`, () => {
+        return new HttpResponse(data, {
+          headers: { "Content-Type": "image/png" },
+        });
+      }),
+    );
+    const { loadAssetStore, scheduleAssetDownload, flushAssetDownloads } =
+      await import("../asset-pipeline.js");
+    await loadAssetStore(storeDir);
+
+    const url = `${S3_BASE}/workspace/uuid1/big.png`;
+    // ダウンロード完了までは元のURLを返す
+    expect(scheduleAssetDownload(url, tempDir)).toBe(url);
+
+    const results = await flushAssetDownloads();
+    expect(results).toHaveLength(1);
+    const filePath = results[0].filePath!;
+    expect(path.basename(filePath)).toMatch(/^[0-9a-f]{16}_big\.png$/);
+    expect((await fs.readFile(filePath)).equals(data)).toBe(true);
+    // 一時ファイルが残っていない
+    expect(await fs.readdir(storeDir)).toEqual([path.basename(filePath)]);
+  });
+
+  it("should link indexed images without downloading them", async () => {
+    let downloads = 0;
+    server.use(
+      http.get(`${S3_BASE}/*`, () => {
+        downloads++;
+        return new HttpResponse(Buffer.from("png"));
+      }),
+    );
+    await fs.mkdir(storeDir, { recursive: true });
+    await fs.writeFile(path.join(storeDir, "0123456789abcdef_logo.png"), "x");
+    const {
+      configureAssetStore,
+      loadAssetStore,
+      scheduleAssetDownload,
+      flushAssetDownloads,
+    } = await import("../asset-pipeline.js");
+    configureAssetStore(storeDir, { uuid2: "0123456789abcdef_logo.png" });
+    await loadAssetStore(storeDir);
+
+    const link = scheduleAssetDownload(
+      `${S3_BASE}/workspace/uuid2/logo.png`,
+      path.join(tempDir, "Child page"),
+    );
+    await flushAssetDownloads();
+
+    expect(link).toBe("../images/0123456789abcdef_logo.png");
+    expect(downloads).toBe(0);
+  });
+
+  it("should index legacy UUID names but not content hash prefixes", async () => {
+    const legacyUuid = "9a8b7c6d-1234-4abc-8def-0123456789ab";
+    await fs.mkdir(storeDir, { recursive: true });
+    await fs.writeFile(path.join(storeDir, `${legacyUuid}_old.png`), "x");
+    await fs.writeFile(path.join(storeDir, "0123456789abcdef_new.png"), "y");
+    const { loadAssetStore, getAssetIndex } = await import(
+      "../asset-pipeline.js"
+    );
+    await loadAssetStore(storeDir);
+
+    expect(getAssetIndex()).toEqual({ [legacyUuid]: `${legacyUuid}_old.png` });
+  });
+
+  it("should keep the previous index when the store was not loaded", async () => {
+    const { configureAssetStore, getAssetIndex } = await import(
+      "../asset-pipeline.js"
+    );
+    // 変更のない差分同期では画像を1つも扱わない
+    configureAssetStore(storeDir, { uuid2: "0123456789abcdef_logo.png" });
+
+    expect(getAssetIndex()).toEqual({ uuid2: "0123456789abcdef_logo.png" });
+  });
+
+  it("should remove images that no page references", async () => {
+    const legacyUuid = "9a8b7c6d-1234-4abc-8def-0123456789ab";
+    await fs.mkdir(storeDir, { recursive: true });
+    await fs.writeFile(path.join(storeDir, "0123456789abcdef_kept.png"), "x");
+    await fs.writeFile(path.join(storeDir, "fedcba9876543210_gone.png"), "y");
+    await fs.writeFile(path.join(storeDir, `${legacyUuid}_old.png`), "z");
+    const {
+      configureAssetStore,
+      loadAssetStore,
+      pruneAssetStore,
+      getAssetIndex,
+    } = await import("../asset-pipeline.js");
+    configureAssetStore(storeDir, {
+      kept: "0123456789abcdef_kept.png",
+      gone: "fedcba9876543210_gone.png",
+    });
+    await loadAssetStore(storeDir);
+
+    expect(await pruneAssetStore(new Set(["kept"]))).toBe(2);
+    expect(await fs.readdir(storeDir)).toEqual(["0123456789abcdef_kept.png"]);
+    expect(getAssetIndex()).toEqual({ kept: "0123456789abcdef_kept.png" });
+  });
+
+  it("should store identical content only once", async () => {
+    let downloads = 0;
+    server.use(
+      http.get(`${S3_BASE}/*`, () => {
+        downloads++;
+        return new HttpResponse(Buffer.from("same bytes"));
+      }),
+    );
+    const {
+      getAssetIndex,
+      loadAssetStore,
+      scheduleAssetDownload,
+      flushAssetDownloads,
+    } = await import("../asset-pipeline.js");
+    await loadAssetStore(storeDir);
+
+    // 同じUUIDは1回だけ、異なるUUIDでも同じ内容なら1ファイル
+    scheduleAssetDownload(`${S3_BASE}/workspace/uuidA/a.png?sig=1`, tempDir);
+    scheduleAssetDownload(`${S3_BASE}/workspace/uuidA/a.png?sig=2`, tempDir);
+    scheduleAssetDownload(`${S3_BASE}/workspace/uuidB/a.png`, tempDir);
+    await flushAssetDownloads();
+
+    expect(downloads).toBe(2);
+    expect(await fs.readdir(storeDir)).toHaveLength(1);
+    const index = getAssetIndex();
+    expect(index.uuidA).toBe(index.uuidB);
+  });
+
+  it("should keep the original URL for new images when downloads are disabled", async () => {
+    let downloads = 0;
+    server.use(
+      http.get(`${S3_BASE}/*`, () => {
+        downloads++;
+        return new HttpResponse(Buffer.from("png"));
+      }),
+    );
+    const {
+      disableAssetDownloads,
+      loadAssetStore,
+      scheduleAssetDownload,
+      flushAssetDownloads,
+    } = await import("../asset-pipeline.js");
+    disableAssetDownloads();
+    await loadAssetStore(storeDir);
+
+    const url = `${S3_BASE}/workspace/uuid4/new.png`;
+    const link = scheduleAssetDownload(url, tempDir);
+    const results = await flushAssetDownloads();
+
+    expect(link).toBe(url);
+    expect(results).toEqual([]);
+    expect(downloads).toBe(0);
+  });
+
+  it("should download again when the image body stops arriving", async () => {
+    process.env.NOTION_ASSET_IDLE_TIMEOUT_MS = "20";
+    process.env.NOTION_RETRY_BASE_DELAY_MS = "1";
+    const data = Buffer.from("complete image");
+    let downloads = 0;
+    server.use(
+      http.get(`${S3_BASE}/*`, () => {
+        downloads++;
+        if (downloads === 1) {
+          // 最初の数バイトの後、ボディが届かなくなる
+          const stalled = new ReadableStream<Uint8Array>({
+            start(controller) {
+              controller.enqueue(data.subarray(0, 4));
+            },
+          });
+          return new HttpResponse(stalled);
+        }
+        return new HttpResponse(data);
+      }),
+    );
+    try {
+      const { loadAssetStore, scheduleAssetDownload, flushAssetDownloads } =
+        await import("../asset-pipeline.js");
+      const { getRetryStats } = await import("../../shared/retry.js");
+      await loadAssetStore(storeDir);
+
+      scheduleAssetDownload(`${S3_BASE}/workspace/uuid5/slow.png`, tempDir);
+      const [result] = await flushAssetDownloads();
+
+      expect(downloads).toBe(2);
+      expect((await fs.readFile(result.filePath!)).equals(data)).toBe(true);
+      expect(getRetryStats().timeouts).toBe(1);
+      expect(await fs.readdir(storeDir)).toEqual([
+        path.basename(result.filePath!),
+      ]);
+    } finally {
+      delete process.env.NOTION_ASSET_IDLE_TIMEOUT_MS;
+      delete process.env.NOTION_RETRY_BASE_DELAY_MS;
+    }
+  });
+
+  it("should report failed downloads without leaving files behind", async () => {
+    server.use(
+      http.get(`${S3_BASE}/*`, () => {
+        return new HttpResponse(null, { status: 403 });
+      }),
+    );
+    const { loadAssetStore, scheduleAssetDownload, flushAssetDownloads } =
+      await import("../asset-pipeline.js");
+    await loadAssetStore(storeDir);
+
+    const url = `${S3_BASE}/workspace/uuid3/denied.png`;
+    scheduleAssetDownload(url, tempDir);
+    const results = await flushAssetDownloads();
+
+    expect(results).toEqual([
+      { url, filePath: null, outputDirs: new Set([tempDir]) },
+    ]);
+    const files = await fs.readdir(storeDir).catch(() => []);
+    expect(files).toEqual([]);
+  });
+});
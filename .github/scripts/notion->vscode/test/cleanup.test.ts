@@ -0,0 +1,177 @@
+/**
+ * cleanup ユニットテスト
+ */
+import { describe, it, expect, beforeEach, afterEach } from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+import {
+  planDeletions,
+  removePaths,
+  sweepDeletedPages,
+} from "../cleanup.js";
+import type { ManifestEntry } from "../manifest.js";
+
+const PARENT_ID = "11111111111111111111111111111111";
+const CHILD_ID = "22222222222222222222222222222222";
+const DB_ID = "33333333333333333333333333333333";
+const KEPT_ID = "44444444444444444444444444444444";
+
+/**
+ * マニフェストエントリのモックを作成
+ */
+function createEntry(
+  entryPath: string,
+  type: ManifestEntry["type"] = "page",
+): ManifestEntry {
+  return {
+    type,
+    title: "Title",
+    lastEditedTime: "2024-01-01T00:00:00.000Z",
+    path: entryPath,
+    hash: "hash",
+    children: [],
+  };
+}
+
+/**
+ * ファイルを作成（親フォルダも作成）
+ */
+async function touch(filePath: string): Promise<void> {
+  await fs.mkdir(path.dirname(filePath), { recursive: true });
+  await fs.writeFile(filePath, "content", "utf-8");
+}
+
+/**
+ * パスが存在するかどうか
+ */
+async function exists(target: string): Promise<boolean> {
+  return fs
+    .access(target)
+    .then(() => true)
+    .catch(() => false);
+}
+
+let tempDir: string;
+let outputDir: string;
+
+beforeEach(async () => {
+  tempDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-cleanup-"));
+  outputDir = path.join(tempDir, "root_page");
+});
+
+afterEach(async () => {
+  await fs.rm(tempDir, { recursive: true, force: true });
+});
+
+describe("planDeletions", () => {
+  it("should return the output file and subtree folder of unprocessed IDs", () => {
+    const entries = {
+      [PARENT_ID]: createEntry(path.join(outputDir, `親 ${PARENT_ID}.md`)),
+      [DB_ID]: createEntry(
+        path.join(outputDir, `DB ${DB_ID}.csv`),
+        "database",
+      ),
+      [KEPT_ID]: createEntry(path.join(outputDir, `残る ${KEPT_ID}.md`)),
+    };
+
+    expect(planDeletions(entries, new Set([KEPT_ID]), outputDir)).toEqual([
+      path.join(outputDir, `DB ${DB_ID}`),
+      path.join(outputDir, `DB ${DB_ID}.csv`),
+      path.join(outputDir, `親 ${PARENT_ID}`),
+      path.join(outputDir, `親 ${PARENT_ID}.md`),
+    ]);
+  });
+
+  it("should skip paths inside a folder that is removed anyway", () => {
+    const parentDir = path.join(outputDir, `親 ${PARENT_ID}`);
+    const entries = {
+      [PARENT_ID]: createEntry(`${parentDir}.md`),
+      [CHILD_ID]: createEntry(path.join(parentDir, `子 ${CHILD_ID}.md`)),
+    };
+
+    expect(planDeletions(entries, new Set(), outputDir)).toEqual([
+      parentDir,
+      `${parentDir}.md`,
+    ]);
+  });
+
+  it("should never return paths outside the output directory", () => {
+    const entries = {
+      [PARENT_ID]: createEntry(path.join(tempDir, `外 ${PARENT_ID}.md`)),
+    };
+
+    expect(planDeletions(entries, new Set(), outputDir)).toEqual([]);
+  });
+});
+
+describe("removePaths", () => {
+  it("should remove the given paths and folders left empty", async () => {
+    const containerDir = path.join(outputDir, `親 ${PARENT_ID}`);
+    const childFile = path.join(containerDir, `子 ${CHILD_ID}.md`);
+    const childDir = path.join(containerDir, `子 ${CHILD_ID}`);
+    const keptFile = path.join(outputDir, `残る ${KEPT_ID}.md`);
+    await touch(childFile);
+    await touch(path.join(childDir, `孫 ${DB_ID}.md`));
+    await touch(keptFile);
+
+    const removed = await removePaths([childDir, childFile], outputDir);
+
+    expect(removed).toBe(2);
+    expect(await exists(containerDir)).toBe(false);
+    expect(await exists(keptFile)).toBe(true);
+    // 出力ディレクトリ自体は残す
+    expect(await exists(outputDir)).toBe(true);
+  });
+
+  it("should ignore paths that no longer exist", async () => {
+    await fs.mkdir(outputDir, { recursive: true });
+
+    const removed = await removePaths(
+      [path.join(outputDir, `なし ${PARENT_ID}.md`)],
+      outputDir,
+    );
+
+    expect(removed).toBe(0);
+  });
+});
+
+describe("sweepDeletedPages", () => {
+  it("should remove every unprocessed ID under the output directory", async () => {
+    const parentDir = path.join(outputDir, `親 ${KEPT_ID}`);
+    await touch(`${parentDir}.md`);
+    await touch(path.join(parentDir, `子 ${CHILD_ID}.md`));
+    await touch(path.join(parentDir, `子 ${CHILD_ID}`, `孫 ${DB_ID}.md`));
+    await touch(path.join(outputDir, "images", `abc_${PARENT_ID}.png`));
+
+    await sweepDeletedPages(outputDir, new Set([KEPT_ID]));
+
+    expect(await exists(`${parentDir}.md`)).toBe(true);
+    // 中身がすべて削除されたフォルダも削除される
+    expect(await exists(parentDir)).toBe(false);
+    // 画像ストアは対象外
+    expect(await exists(path.join(outputDir, "images"))).toBe(true);
+  });
+
+  it("should keep the whole folder of a page that failed to fetch", async () => {
+    const parentDir = path.join(outputDir, `親 ${KEPT_ID}`);
+    const grandchild = path.join(parentDir, `子 ${CHILD_ID}`, `孫 ${DB_ID}.md`);
+    await touch(`${parentDir}.md`);
+    await touch(path.join(parentDir, `子 ${CHILD_ID}.md`));
+    await touch(grandchild);
+    await touch(path.join(outputDir, `削除 ${PARENT_ID}.md`));
+
+    // 親ページの取得に失敗したため、子・孫は処理されていない
+    await sweepDeletedPages(
+      outputDir,
+      new Set([KEPT_ID]),
+      new Set([KEPT_ID]),
+    );
+
+    expect(await exists(path.join(parentDir, `子 ${CHILD_ID}.md`))).toBe(true);
+    expect(await exists(grandchild)).toBe(true);
+    expect(await exists(path.join(outputDir, `削除 ${PARENT_ID}.md`))).toBe(
+      false,
+    );
+  });
+});
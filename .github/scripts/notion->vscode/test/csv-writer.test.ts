@@ -0,0 +1,96 @@
+/**
+ * csv-writer ユニットテスト
+ */
+import { describe, it, expect, beforeEach, afterEach } from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+import type { PageObjectResponse } from "@notionhq/client/build/src/api-endpoints";
+import { createCsvWriter } from "../csv-writer.js";
+import { hashContent } from "../manifest.js";
+
+/**
+ * タイトルと数値プロパティを持つレコードのモックを作成
+ */
+function createRecord(title: string, count: number): PageObjectResponse {
+  return {
+    object: "page",
+    id: `record-${count}`,
+    properties: {
+      Count: { type: "number", number: count, id: "c" },
+      Name: {
+        type: "title",
+        title: [{ type: "text", plain_text: title, text: { content: title, link: null }, annotations: { bold: false, italic: false, strikethrough: false, underline: false, code: false, color: "default" }, href: null }],
+        id: "t",
+      },
+    },
+  } as unknown as PageObjectResponse;
+}
+
+describe("createCsvWriter", () => {
+  let tempDir: string;
+  let csvPath: string;
+
+  beforeEach(async () => {
+    tempDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-csv-"));
+    csvPath = path.join(tempDir, "DB abc.csv");
+  });
+
+  afterEach(async () => {
+    await fs.rm(tempDir, { recursive: true, force: true });
+  });
+
+  it("should write the header and rows and return the content hash", async () => {
+    const writer = createCsvWriter(csvPath);
+    await writer.write(createRecord("First", 1));
+    await writer.write(createRecord("Second, too", 2));
+    const hash = await writer.close();
+
+    const content = await fs.readFile(csvPath, "utf-8");
+    expect(content).toBe('Name,Count\nFirst,1\n"Second, too",2\n');
+    expect(hash).toBe(hashContent(content));
+    expect(writer.rowCount).toBe(2);
+  });
+
+  it("should not create a file when there are no records", async () => {
+    const writer = createCsvWriter(csvPath);
+    expect(await writer.close()).toBeNull();
+    await expect(fs.access(csvPath)).rejects.toThrow();
+  });
+
+  it("should not replace the file when the content is unchanged", async () => {
+    const content = "Name,Count\nFirst,1\n";
+    await fs.writeFile(csvPath, content);
+    const oldTime = new Date("2024-01-01T00:00:00.000Z");
+    await fs.utimes(csvPath, oldTime, oldTime);
+
+    const writer = createCsvWriter(csvPath);
+    await writer.write(createRecord("First", 1));
+    expect(await writer.close()).toBe(hashContent(content));
+
+    expect((await fs.stat(csvPath)).mtime.getTime()).toBe(oldTime.getTime());
+    // 一時ファイルも残らない
+    expect(await fs.readdir(tempDir)).toEqual(["DB abc.csv"]);
+  });
+
+  it("should keep the previous file when aborted", async () => {
+    await fs.writeFile(csvPath, "previous\n");
+    const writer = createCsvWriter(csvPath);
+    await writer.write(createRecord("Partial", 1));
+    await writer.abort();
+
+    expect(await fs.readFile(csvPath, "utf-8")).toBe("previous\n");
+    expect(await fs.readdir(tempDir)).toEqual(["DB abc.csv"]);
+  });
+
+  it("should stream many rows without buffering them", async () => {
+    const writer = createCsvWriter(csvPath);
+    for (let i = 0; i < 5000; i++) {
+      await writer.write(createRecord(`Row ${i}`, i));
+    }
+    await writer.close();
+
+    const content = await fs.readFile(csvPath, "utf-8");
+    expect(content.trimEnd().split("\n")).toHaveLength(5001);
+  });
+});
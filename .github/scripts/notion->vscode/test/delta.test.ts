@@ -0,0 +1,256 @@
+/**
+ * delta ユニットテスト
+ */
+import { describe, it, expect } from "vitest";
+import * as path from "node:path";
+import {
+  findParentsToRerender,
+  isFullSyncDue,
+  nextHighWaterMark,
+  planDeltaRoots,
+  type ChangedObject,
+} from "../delta.js";
+import {
+  createEmptyManifest,
+  type ManifestEntry,
+  type SyncManifest,
+} from "../manifest.js";
+
+/**
+ * マニフェストエントリのモックを作成
+ */
+function createEntry(
+  entryPath: string,
+  overrides: Partial<ManifestEntry> = {},
+): ManifestEntry {
+  return {
+    type: "page",
+    title: "Title",
+    lastEditedTime: "2024-01-01T00:00:00.000Z",
+    path: entryPath,
+    hash: "hash",
+    children: [],
+    ...overrides,
+  };
+}
+
+/**
+ * ChangedObjectのモックを作成
+ */
+function changed(
+  id: string,
+  parentId: string | null = null,
+  object: "page" | "database" = "page",
+  title: string | null = null,
+): ChangedObject {
+  return {
+    id,
+    object,
+    lastEditedTime: "2024-02-01T00:00:00.000Z",
+    parentId,
+    title,
+  };
+}
+
+describe("isFullSyncDue", () => {
+  const now = new Date("2024-02-10T00:00:00.000Z");
+
+  it("should require a full sync without a manifest", () => {
+    expect(isFullSyncDue(null, now, 7)).toBe(true);
+  });
+
+  it("should require a full sync without a high-water mark", () => {
+    const manifest: SyncManifest = {
+      ...createEmptyManifest(),
+      lastFullSyncAt: "2024-02-09T00:00:00.000Z",
+    };
+    expect(isFullSyncDue(manifest, now, 7)).toBe(true);
+  });
+
+  it("should not require a full sync within the interval", () => {
+    const manifest: SyncManifest = {
+      ...createEmptyManifest(),
+      highWaterMark: "2024-02-09T00:00:00.000Z",
+      lastFullSyncAt: "2024-02-05T00:00:00.000Z",
+    };
+    expect(isFullSyncDue(manifest, now, 7)).toBe(false);
+  });
+
+  it("should require a full sync after the interval", () => {
+    const manifest: SyncManifest = {
+      ...createEmptyManifest(),
+      highWaterMark: "2024-02-09T00:00:00.000Z",
+      lastFullSyncAt: "2024-02-01T00:00:00.000Z",
+    };
+    expect(isFullSyncDue(manifest, now, 7)).toBe(true);
+  });
+});
+
+describe("nextHighWaterMark", () => {
+  const runStartedAt = new Date("2024-02-10T00:10:00.000Z");
+
+  it("should keep the previous value when nothing changed", () => {
+    expect(
+      nextHighWaterMark("2024-02-01T00:00:00.000Z", false, runStartedAt),
+    ).toBe("2024-02-01T00:00:00.000Z");
+  });
+
+  it("should move to the run start time minus a margin", () => {
+    expect(
+      nextHighWaterMark("2024-02-01T00:00:00.000Z", true, runStartedAt),
+    ).toBe("2024-02-10T00:05:00.000Z");
+  });
+
+  it("should be set on the first run", () => {
+    expect(nextHighWaterMark(undefined, false, runStartedAt)).toBe(
+      "2024-02-10T00:05:00.000Z",
+    );
+  });
+});
+
+describe("planDeltaRoots", () => {
+  const root = "root_page";
+  const entries: Record<string, ManifestEntry> = {
+    aaa: createEntry(path.join(root, "A aaa.md"), {
+      children: [{ id: "bbb", type: "page" }],
+    }),
+    bbb: createEntry(path.join(root, "A aaa", "B bbb.md"), {
+      children: [{ id: "mmm", type: "page" }],
+    }),
+    mmm: createEntry(path.join(root, "A aaa", "B bbb", "M mmm.md"), {
+      children: [{ id: "ggg", type: "page" }],
+    }),
+    ggg: createEntry(
+      path.join(root, "A aaa", "B bbb", "M mmm", "G ggg.md"),
+    ),
+    ccc: createEntry(path.join(root, "C ccc.md"), {
+      children: [{ id: "ddd", type: "database" }],
+    }),
+    ddd: createEntry(path.join(root, "C ccc", "DB ddd.csv"), {
+      type: "database",
+    }),
+    eee: createEntry(path.join(root, "C ccc", "DB ddd", "Row eee.md"), {
+      includeProperties: true,
+    }),
+  };
+
+  it("should re-process a changed known page from its own location", () => {
+    expect(planDeltaRoots([changed("ccc")], entries)).toEqual([
+      {
+        type: "page",
+        id: "ccc",
+        outputPath: root,
+        includeProperties: false,
+      },
+    ]);
+  });
+
+  it("should drop roots covered by a changed ancestor", () => {
+    const roots = planDeltaRoots(
+      [changed("bbb", "aaa"), changed("aaa")],
+      entries,
+    );
+    expect(roots.map((r) => r.id)).toEqual(["aaa"]);
+  });
+
+  it("should keep a root below an unchanged page", () => {
+    // 間のmmmは変更がないので、bbbの再処理ではgggまで辿られない
+    const roots = planDeltaRoots(
+      [changed("ggg", "mmm"), changed("bbb", "aaa")],
+      entries,
+    );
+    expect(roots.map((r) => r.id)).toEqual(["bbb", "ggg"]);
+  });
+
+  it("should drop a root whose whole path to a changed ancestor is re-rendered", () => {
+    const roots = planDeltaRoots(
+      [changed("ggg", "mmm"), changed("mmm", "bbb"), changed("bbb", "aaa")],
+      entries,
+    );
+    expect(roots.map((r) => r.id)).toEqual(["bbb"]);
+  });
+
+  it("should re-process the parent database for a changed record", () => {
+    const roots = planDeltaRoots([changed("eee", "ddd")], entries);
+    expect(roots).toEqual([
+      {
+        type: "database",
+        id: "ddd",
+        outputPath: path.join(root, "C ccc"),
+        includeProperties: false,
+      },
+    ]);
+  });
+
+  it("should re-process the parent of a new page", () => {
+    const roots = planDeltaRoots([changed("new", "bbb")], entries);
+    expect(roots.map((r) => r.id)).toEqual(["bbb"]);
+  });
+
+  it("should ignore pages outside the synced tree", () => {
+    expect(planDeltaRoots([changed("zzz", "yyy")], entries)).toEqual([]);
+  });
+
+  it("should re-process a moved page from its new parent and its old parent", () => {
+    // gggはmmmの下からcccの下に移動した
+    const roots = planDeltaRoots([changed("ggg", "ccc")], entries);
+    expect(roots.map((r) => r.id)).toEqual(["ccc", "mmm"]);
+  });
+});
+
+describe("findParentsToRerender", () => {
+  const root = "root_page";
+  const entries: Record<string, ManifestEntry> = {
+    aaa: createEntry(path.join(root, "A aaa.md"), {
+      children: [
+        { id: "bbb", type: "page", title: "B" },
+        { id: "ddd", type: "database", title: "DB" },
+      ],
+    }),
+    bbb: createEntry(path.join(root, "A aaa", "B bbb.md"), { title: "B" }),
+    ddd: createEntry(path.join(root, "A aaa", "DB ddd.csv"), {
+      type: "database",
+      title: "DB",
+    }),
+    ccc: createEntry(path.join(root, "C ccc.md")),
+  };
+
+  it("should return the known parent pages of new pages", () => {
+    const parents = findParentsToRerender(
+      [changed("new", "aaa"), changed("aaa"), changed("row", "ddd")],
+      entries,
+    );
+    // DBの新しいレコードはクエリで見つかるので対象外
+    expect([...parents]).toEqual(["aaa"]);
+  });
+
+  it("should return the parent of a renamed child page or database", () => {
+    expect([
+      ...findParentsToRerender([changed("bbb", "aaa", "page", "B2")], entries),
+    ]).toEqual(["aaa"]);
+    expect([
+      ...findParentsToRerender(
+        [changed("ddd", null, "database", "DB2")],
+        entries,
+      ),
+    ]).toEqual(["aaa"]);
+  });
+
+  it("should not re-render the parent when the child title is unchanged", () => {
+    expect(
+      findParentsToRerender([changed("bbb", "aaa", "page", "B")], entries).size,
+    ).toBe(0);
+  });
+
+  it("should return the new and the old parent of a moved page", () => {
+    expect([
+      ...findParentsToRerender([changed("bbb", "ccc", "page", "B")], entries),
+    ]).toEqual(["ccc", "aaa"]);
+  });
+
+  it("should ignore new pages outside the synced tree", () => {
+    expect(findParentsToRerender([changed("zzz", "yyy")], entries).size).toBe(
+      0,
+    );
+  });
+});
@@ -21,6 +21,7 @@ import type {
 import * as fs from "node:fs/promises";
 import * as path from "node:path";
 import * as os from "node:os";
+import { MANIFEST_FILENAME } from "../manifest.js";
 
 // ============================================================
 // モックデータ生成ヘルパー
@@ -194,6 +195,9 @@ describe("index.ts - Entry Point Integration Test", () => {
     process.env.NOTION_API_KEY = "test-api-key-for-msw";
     process.env.NOTION_ROOT_PAGE_ID = rootPageId;
     process.env.DOWNLOAD_IMAGES = "false";
+    // MSWへのリクエストはレート制限で待たせない
+    process.env.NOTION_RATE_LIMIT_RPS = "1000";
+    process.env.NOTION_RATE_LIMIT_BURST = "1000";
   });
 
   afterAll(async () => {
@@ -335,6 +339,60 @@ describe("index.ts - Entry Point Integration Test", () => {
     );
     expect(childDir).toBeDefined();
   });
+
+  it("should fall back to a full walk when the delta search fails", async () => {
+    // 前回の実行結果を、フル探索の期限内の差分同期の基準にする
+    const manifestPath = path.join(tempDir, "root_page", MANIFEST_FILENAME);
+    const previous = JSON.parse(await fs.readFile(manifestPath, "utf-8"));
+    const lastFullSyncAt = new Date(Date.now() - 60 * 1000).toISOString();
+    previous.highWaterMark = "2024-01-01T00:00:00.000Z";
+    previous.lastFullSyncAt = lastFullSyncAt;
+    await fs.writeFile(manifestPath, JSON.stringify(previous));
+
+    let rootRetrieves = 0;
+    server.use(
+      http.post(`${NOTION_API_BASE}/search`, () => {
+        return HttpResponse.json(
+          {
+            object: "error",
+            status: 400,
+            code: "validation_error",
+            message: "Invalid request",
+          },
+          { status: 400 },
+        );
+      }),
+      http.get(`${NOTION_API_BASE}/pages/:pageId`, ({ params }) => {
+        if (params.pageId === rootPageId) {
+          rootRetrieves++;
+        }
+        return HttpResponse.json(
+          createMockPage(params.pageId as string, "Root Page"),
+        );
+      }),
+      http.get(`${NOTION_API_BASE}/blocks/:blockId/children`, () => {
+        return HttpResponse.json({
+          object: "list",
+          results: [],
+          has_more: false,
+          next_cursor: null,
+        });
+      }),
+    );
+
+    process.env.NOTION_SYNC_DELTA = "true";
+    try {
+      vi.resetModules();
+      await import("../index.js");
+    } finally {
+      delete process.env.NOTION_SYNC_DELTA;
+    }
+
+    // ルートから辿り直し、フル探索の日時を更新する
+    expect(rootRetrieves).toBe(1);
+    const manifest = JSON.parse(await fs.readFile(manifestPath, "utf-8"));
+    expect(manifest.lastFullSyncAt).not.toBe(lastFullSyncAt);
+  });
 });
 
 // ============================================================
@@ -0,0 +1,85 @@
+/**
+ * manifest ユニットテスト
+ */
+import { describe, it, expect, beforeEach, afterEach } from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+import {
+  createEmptyManifest,
+  hashContent,
+  loadManifest,
+  saveManifest,
+  type SyncManifest,
+} from "../manifest.js";
+
+describe("manifest", () => {
+  let tempDir: string;
+
+  beforeEach(async () => {
+    tempDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-manifest-"));
+  });
+
+  afterEach(async () => {
+    await fs.rm(tempDir, { recursive: true, force: true });
+  });
+
+  it("should return null when manifest does not exist", async () => {
+    const manifest = await loadManifest(path.join(tempDir, "missing.json"));
+    expect(manifest).toBeNull();
+  });
+
+  it("should return null for invalid JSON", async () => {
+    const filePath = path.join(tempDir, "broken.json");
+    await fs.writeFile(filePath, "{not json", "utf-8");
+    expect(await loadManifest(filePath)).toBeNull();
+  });
+
+  it("should return null for an unknown version", async () => {
+    const filePath = path.join(tempDir, "old.json");
+    await fs.writeFile(
+      filePath,
+      JSON.stringify({ version: 0, entries: {} }),
+      "utf-8",
+    );
+    expect(await loadManifest(filePath)).toBeNull();
+  });
+
+  it("should round-trip entries through save and load", async () => {
+    const filePath = path.join(tempDir, "nested", "manifest.json");
+    const manifest: SyncManifest = {
+      ...createEmptyManifest(),
+      entries: {
+        bbb: {
+          type: "page",
+          title: "B",
+          lastEditedTime: "2024-01-02T00:00:00.000Z",
+          path: "root_page/B bbb.md",
+          hash: hashContent("# B"),
+          children: [],
+        },
+        aaa: {
+          type: "page",
+          title: "A",
+          lastEditedTime: "2024-01-01T00:00:00.000Z",
+          path: "root_page/A aaa.md",
+          hash: hashContent("# A"),
+          children: [{ id: "bbb", type: "page" }],
+        },
+      },
+    };
+
+    await saveManifest(filePath, manifest);
+    const loaded = await loadManifest(filePath);
+
+    expect(loaded).toEqual(manifest);
+    // IDでソートして保存される
+    expect(Object.keys(loaded!.entries)).toEqual(["aaa", "bbb"]);
+  });
+
+  it("should compute a stable SHA-256 hash", () => {
+    expect(hashContent("abc")).toBe(
+      "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad",
+    );
+  });
+});
@@ -0,0 +1,122 @@
+/**
+ * output-writer ユニットテスト
+ */
+import { describe, it, expect, beforeEach, afterEach } from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+import { hashContent } from "../manifest.js";
+import {
+  flushOutputWrites,
+  isOutputUnchanged,
+  queueOutputWrite,
+  writeFileAtomic,
+  writeFileIfChanged,
+} from "../output-writer.js";
+import { getSyncStats, resetSyncStats } from "../sync-stats.js";
+
+const OLD_TIME = new Date("2024-01-01T00:00:00.000Z");
+
+describe("writeFileIfChanged", () => {
+  let tempDir: string;
+  let filePath: string;
+
+  beforeEach(async () => {
+    tempDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-writer-"));
+    filePath = path.join(tempDir, "page.md");
+    resetSyncStats();
+  });
+
+  afterEach(async () => {
+    await fs.rm(tempDir, { recursive: true, force: true });
+  });
+
+  it("should not touch a file whose content is unchanged", async () => {
+    await fs.writeFile(filePath, "# 同じ内容\n");
+    await fs.utimes(filePath, OLD_TIME, OLD_TIME);
+
+    expect(await writeFileIfChanged(filePath, "# 同じ内容\n")).toBe(false);
+
+    const stat = await fs.stat(filePath);
+    expect(stat.mtime.getTime()).toBe(OLD_TIME.getTime());
+    expect(getSyncStats().filesSkipped).toBe(1);
+    expect(getSyncStats().filesWritten).toBe(0);
+  });
+
+  it("should write new and changed content", async () => {
+    const nested = path.join(tempDir, "子フォルダ", "page.md");
+
+    expect(await writeFileIfChanged(nested, "# 新規\n")).toBe(true);
+    expect(await writeFileIfChanged(nested, "# 変更\n")).toBe(true);
+
+    expect(await fs.readFile(nested, "utf-8")).toBe("# 変更\n");
+    expect(getSyncStats().filesWritten).toBe(2);
+  });
+
+  it("should trust the manifest hash without reading the file", async () => {
+    // マニフェストのハッシュと違えば、既存ファイルが同じ内容でも書き込む
+    await fs.writeFile(filePath, "# 内容\n");
+    expect(await writeFileIfChanged(filePath, "# 内容\n", "stale-hash")).toBe(
+      true,
+    );
+
+    // マニフェストのハッシュと同じでも、ファイルがなければ書き込む
+    await fs.rm(filePath);
+    expect(
+      await writeFileIfChanged(filePath, "# 内容\n", hashContent("# 内容\n")),
+    ).toBe(true);
+    expect(await fs.readFile(filePath, "utf-8")).toBe("# 内容\n");
+  });
+});
+
+describe("writeFileAtomic", () => {
+  it("should replace the file without leaving a temp file", async () => {
+    const dir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-atomic-"));
+    const filePath = path.join(dir, "深い", "フォルダ", "page.md");
+
+    await writeFileAtomic(filePath, "1回目\n");
+    await writeFileAtomic(filePath, "2回目\n");
+
+    expect(await fs.readFile(filePath, "utf-8")).toBe("2回目\n");
+    expect(await fs.readdir(path.dirname(filePath))).toEqual(["page.md"]);
+    await fs.rm(dir, { recursive: true, force: true });
+  });
+});
+
+describe("queueOutputWrite", () => {
+  it("should finish every queued write before flushOutputWrites resolves", async () => {
+    const dir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-queue-"));
+    for (let i = 0; i < 50; i++) {
+      queueOutputWrite(path.join(dir, `sub${i % 5}`, `page${i}.md`), `# ${i}\n`);
+    }
+    await flushOutputWrites();
+
+    for (let i = 0; i < 50; i++) {
+      const content = await fs.readFile(
+        path.join(dir, `sub${i % 5}`, `page${i}.md`),
+        "utf-8",
+      );
+      expect(content).toBe(`# ${i}\n`);
+    }
+    await fs.rm(dir, { recursive: true, force: true });
+  });
+
+  it("should report a failed write when flushing", async () => {
+    const dir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-queue-"));
+    // 親がファイルなので書き込めない
+    await fs.writeFile(path.join(dir, "file"), "");
+    queueOutputWrite(path.join(dir, "file", "page.md"), "# 失敗\n");
+
+    await expect(flushOutputWrites()).rejects.toThrow();
+    // エラーは一度だけ報告される
+    await expect(flushOutputWrites()).resolves.toBeUndefined();
+    await fs.rm(dir, { recursive: true, force: true });
+  });
+});
+
+describe("isOutputUnchanged", () => {
+  it("should return false when the file does not exist", async () => {
+    const missing = path.join(os.tmpdir(), "notion-sync-missing", "none.csv");
+    expect(await isOutputUnchanged(missing, hashContent(""))).toBe(false);
+  });
+});
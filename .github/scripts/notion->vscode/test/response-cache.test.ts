@@ -0,0 +1,101 @@
+/**
+ * response-cache ユニットテスト
+ */
+import {
+  describe,
+  it,
+  expect,
+  beforeEach,
+  afterEach,
+  vi,
+} from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+
+describe("response-cache", () => {
+  let cacheDir: string;
+
+  beforeEach(async () => {
+    cacheDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-cache-"));
+    process.env.NOTION_SYNC_CACHE_DIR = cacheDir;
+    vi.resetModules();
+  });
+
+  afterEach(async () => {
+    delete process.env.NOTION_SYNC_CACHE_DIR;
+    await fs.rm(cacheDir, { recursive: true, force: true });
+  });
+
+  it("should return a cached response only for the same last_edited_time", async () => {
+    const cache = await import("../response-cache.js");
+    const { getSyncStats } = await import("../sync-stats.js");
+
+    await cache.writeCachedResponse(
+      "pages",
+      "page-id-1",
+      "2024-01-01T00:00:00.000Z",
+      { title: "キャッシュ" },
+    );
+
+    expect(
+      await cache.readCachedResponse(
+        "pages",
+        "page-id-1",
+        "2024-01-01T00:00:00.000Z",
+      ),
+    ).toEqual({ title: "キャッシュ" });
+    expect(
+      await cache.readCachedResponse(
+        "pages",
+        "page-id-1",
+        "2024-02-01T00:00:00.000Z",
+      ),
+    ).toBeNull();
+    expect(
+      await cache.readCachedResponse("blocks", "other", "2024-01-01"),
+    ).toBeNull();
+
+    expect(getSyncStats().cacheHits).toBe(1);
+    expect(getSyncStats().cacheMisses).toBe(2);
+  });
+
+  it("should evict the least recently used entries over the size cap", async () => {
+    const cache = await import("../response-cache.js");
+    const data = "x".repeat(1000);
+
+    for (const id of ["old", "used", "new"]) {
+      await cache.writeCachedResponse("blocks", id, "t", data);
+    }
+    // old < new < used の順に使われたことにする
+    const setUsedAt = (id: string, time: string) =>
+      fs.utimes(
+        path.join(cacheDir, "blocks", `${id}.json`),
+        new Date(time),
+        new Date(time),
+      );
+    await setUsedAt("old", "2024-01-01T00:00:00.000Z");
+    await setUsedAt("new", "2024-01-02T00:00:00.000Z");
+    await setUsedAt("used", "2024-01-03T00:00:00.000Z");
+
+    // 2件分だけ残る上限
+    const evicted = await cache.pruneResponseCache(2100);
+
+    expect(evicted).toBe(1);
+    expect((await fs.readdir(path.join(cacheDir, "blocks"))).sort()).toEqual([
+      "new.json",
+      "used.json",
+    ]);
+  });
+
+  it("should do nothing when no cache directory is configured", async () => {
+    delete process.env.NOTION_SYNC_CACHE_DIR;
+    vi.resetModules();
+    const cache = await import("../response-cache.js");
+
+    expect(cache.isResponseCacheEnabled()).toBe(false);
+    await cache.writeCachedResponse("pages", "page-id-1", "t", {});
+    expect(await cache.readCachedResponse("pages", "page-id-1", "t")).toBeNull();
+    expect(await fs.readdir(cacheDir)).toEqual([]);
+  });
+});
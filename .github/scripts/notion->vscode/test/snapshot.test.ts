@@ -0,0 +1,107 @@
+/**
+ * snapshot ユニットテスト
+ */
+import {
+  describe,
+  it,
+  expect,
+  beforeEach,
+  afterEach,
+  vi,
+} from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+
+describe("snapshot", () => {
+  let tempDir: string;
+  let snapshotPath: string;
+
+  beforeEach(async () => {
+    tempDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-snapshot-"));
+    snapshotPath = path.join(tempDir, "snapshot.ndjson");
+    vi.resetModules();
+  });
+
+  afterEach(async () => {
+    delete process.env.NOTION_SYNC_SNAPSHOT;
+    delete process.env.NOTION_SYNC_SNAPSHOT_REPLAY;
+    await fs.rm(tempDir, { recursive: true, force: true });
+  });
+
+  /**
+   * スナップショットを保存するモードでレスポンスを記録
+   */
+  async function record(): Promise<void> {
+    process.env.NOTION_SYNC_SNAPSHOT = snapshotPath;
+    const snapshot = await import("../snapshot.js");
+    const baseFetch = vi.fn(async (url: string, init?: RequestInit) =>
+      Response.json({ url, body: init?.body ?? null }),
+    );
+    const fetch = snapshot.createSnapshotFetch(baseFetch);
+
+    await fetch("https://api.notion.com/v1/pages/page-1");
+    await fetch("https://api.notion.com/v1/data_sources/ds-1/query", {
+      method: "POST",
+      body: JSON.stringify({ start_cursor: "cursor-1" }),
+    });
+    await snapshot.closeSnapshot();
+
+    expect(baseFetch).toHaveBeenCalledTimes(2);
+    expect(snapshot.getSnapshotStats().recorded).toBe(2);
+    delete process.env.NOTION_SYNC_SNAPSHOT;
+    vi.resetModules();
+  }
+
+  it("should write one response per line", async () => {
+    await record();
+
+    const lines = (await fs.readFile(snapshotPath, "utf-8"))
+      .trim()
+      .split("\n");
+    expect(lines).toHaveLength(2);
+    expect(JSON.parse(lines[0])).toMatchObject({
+      method: "GET",
+      url: "/v1/pages/page-1",
+      status: 200,
+    });
+  });
+
+  it("should replay recorded responses without calling the network", async () => {
+    await record();
+    process.env.NOTION_SYNC_SNAPSHOT_REPLAY = snapshotPath;
+    const snapshot = await import("../snapshot.js");
+    const baseFetch = vi.fn();
+    const fetch = snapshot.createSnapshotFetch(baseFetch);
+
+    const page = await fetch("http://localhost/v1/pages/page-1");
+    const query = await fetch(
+      "https://api.notion.com/v1/data_sources/ds-1/query",
+      { method: "POST", body: JSON.stringify({ start_cursor: "cursor-1" }) },
+    );
+
+    expect(snapshot.isSnapshotReplay()).toBe(true);
+    expect(baseFetch).not.toHaveBeenCalled();
+    expect(await page.json()).toEqual({
+      url: "https://api.notion.com/v1/pages/page-1",
+      body: null,
+    });
+    expect((await query.json()).body).toBe(
+      JSON.stringify({ start_cursor: "cursor-1" }),
+    );
+    expect(snapshot.getSnapshotStats().replayed).toBe(2);
+  });
+
+  it("should answer requests missing from the snapshot with a non-retryable error", async () => {
+    await record();
+    process.env.NOTION_SYNC_SNAPSHOT_REPLAY = snapshotPath;
+    const snapshot = await import("../snapshot.js");
+    const fetch = snapshot.createSnapshotFetch(vi.fn());
+
+    const response = await fetch("https://api.notion.com/v1/pages/page-2");
+
+    expect(response.status).toBe(400);
+    expect((await response.json()).code).toBe("validation_error");
+    expect(snapshot.getSnapshotStats().missing).toBe(1);
+  });
+});
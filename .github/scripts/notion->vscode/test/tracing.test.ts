@@ -0,0 +1,126 @@
+/**
+ * tracing ユニットテスト
+ */
+import {
+  describe,
+  it,
+  expect,
+  beforeEach,
+  afterEach,
+  vi,
+} from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+
+interface CompleteEvent {
+  name: string;
+  ph: string;
+  ts: number;
+  dur: number;
+  tid: number;
+  args: { spanId: number; parentId: number | null; error?: string };
+}
+
+/**
+ * 完了したスパンを名前で取得
+ */
+function findSpan(events: unknown[], name: string): CompleteEvent {
+  const span = (events as CompleteEvent[]).find(
+    (event) => event.ph === "X" && event.name === name,
+  );
+  if (!span) {
+    throw new Error(`Span ${name} not found`);
+  }
+  return span;
+}
+
+describe("tracing", () => {
+  let tempDir: string;
+
+  beforeEach(async () => {
+    tempDir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-sync-trace-"));
+    process.env.NOTION_SYNC_TRACE_FILE = path.join(tempDir, "trace.json");
+    vi.resetModules();
+  });
+
+  afterEach(async () => {
+    delete process.env.NOTION_SYNC_TRACE_FILE;
+    await fs.rm(tempDir, { recursive: true, force: true });
+  });
+
+  it("should nest awaited spans on the parent's lane", async () => {
+    const { withSpan, getTraceEvents } = await import("../tracing.js");
+
+    await withSpan("processPage", async () => {
+      await withSpan("fetchBlocks", async () => undefined);
+      await withSpan("render", async () => undefined);
+    });
+
+    const events = getTraceEvents();
+    const page = findSpan(events, "processPage");
+    const render = findSpan(events, "render");
+    expect(render.tid).toBe(page.tid);
+    expect(render.args.parentId).toBe(page.args.spanId);
+    expect(render.ts).toBeGreaterThanOrEqual(page.ts);
+    expect(render.ts + render.dur).toBeLessThanOrEqual(page.ts + page.dur);
+  });
+
+  it("should put concurrent and queued spans on separate lanes", async () => {
+    const { withSpan, linkSpan, getTraceEvents } = await import(
+      "../tracing.js"
+    );
+
+    let link: ReturnType<typeof linkSpan> = null;
+    await withSpan("processPage", async () => {
+      await Promise.all([
+        withSpan("downloadImage", () => new Promise((r) => setTimeout(r, 5))),
+        withSpan("writeFile", () => new Promise((r) => setTimeout(r, 5))),
+      ]);
+      link = linkSpan();
+    });
+    await withSpan("processChild", async () => undefined, { link });
+
+    const events = getTraceEvents();
+    const page = findSpan(events, "processPage");
+    const image = findSpan(events, "downloadImage");
+    const write = findSpan(events, "writeFile");
+    const child = findSpan(events, "processChild");
+    expect(image.tid).not.toBe(write.tid);
+    expect(child.args.parentId).toBe(page.args.spanId);
+
+    const flows = (events as { ph: string; id?: number }[]).filter(
+      (event) => event.id === child.args.spanId,
+    );
+    expect(flows.map((event) => event.ph)).toEqual(["s", "f"]);
+  });
+
+  it("should record failed spans and write the trace file", async () => {
+    const { withSpan, writeTrace } = await import("../tracing.js");
+
+    await expect(
+      withSpan("processDatabase", async () => {
+        throw new Error("boom");
+      }),
+    ).rejects.toThrow("boom");
+    expect(await writeTrace()).toBe(1);
+
+    const trace = JSON.parse(
+      await fs.readFile(process.env.NOTION_SYNC_TRACE_FILE!, "utf-8"),
+    );
+    expect(findSpan(trace.traceEvents, "processDatabase").args.error).toContain(
+      "boom",
+    );
+  });
+
+  it("should run the callback without recording when disabled", async () => {
+    delete process.env.NOTION_SYNC_TRACE_FILE;
+    const { withSpan, linkSpan, getTraceEvents, isTracingEnabled } =
+      await import("../tracing.js");
+
+    expect(isTracingEnabled()).toBe(false);
+    expect(await withSpan("processPage", async () => 42)).toBe(42);
+    expect(linkSpan()).toBeNull();
+    expect(getTraceEvents().filter((event) => event.ph === "X")).toEqual([]);
+  });
+});
@@ -2,7 +2,7 @@
  * Notion Sync ユニットテスト
  */
 import { describe, it, expect } from "vitest";
-import { richTextToMarkdown, getUserDisplayName, extractFormulaValue, extractRollupValue, sanitizeFilename, extractPropertyValue, getPageTitle } from "../utils.js";
+import { richTextToMarkdown, getUserDisplayName, extractFormulaValue, extractRollupValue, sanitizeFilename, extractIdFromName, extractPropertyValue, getPageTitle, parsePositiveInt, escapeCsvField, getCsvHeaders, recordToCsvRow, splitCsvRows } from "../utils.js";
 import type { PageObjectResponse } from "@notionhq/client/build/src/api-endpoints";
 import type { RichTextItemResponse } from "@notionhq/client/build/src/api-endpoints";
 
@@ -109,6 +109,41 @@ describe("sanitizeFilename", () => {
   });
 });
 
+describe("extractIdFromName", () => {
+  const id = "0123456789abcdef0123456789abcdef";
+
+  it("should extract the ID from markdown, CSV and folder names", () => {
+    expect(extractIdFromName(`ページ ${id}.md`)).toBe(id);
+    expect(extractIdFromName(`DB ${id}.csv`)).toBe(id);
+    expect(extractIdFromName(`ページ ${id}`)).toBe(id);
+  });
+
+  it("should return null for names without an ID", () => {
+    expect(extractIdFromName("images")).toBeNull();
+    expect(extractIdFromName(`ページ ${id}.png`)).toBeNull();
+    expect(extractIdFromName(`ページ${id}.md`)).toBeNull();
+  });
+});
+
+describe("parsePositiveInt", () => {
+  it("should parse a positive integer", () => {
+    expect(parsePositiveInt("8", 3)).toBe(8);
+  });
+
+  it("should return fallback when value is undefined", () => {
+    expect(parsePositiveInt(undefined, 3)).toBe(3);
+  });
+
+  it("should return fallback for zero or negative values", () => {
+    expect(parsePositiveInt("0", 3)).toBe(3);
+    expect(parsePositiveInt("-2", 3)).toBe(3);
+  });
+
+  it("should return fallback for non-numeric values", () => {
+    expect(parsePositiveInt("abc", 3)).toBe(3);
+  });
+});
+
 describe("richTextToMarkdown", () => {
   // ============================================================
   // 基本ケース
@@ -684,3 +719,47 @@ describe("getPageTitle", () => {
     expect(getPageTitle(page)).toBe("Untitled");
   });
 });
+
+describe("CSV helpers", () => {
+  function createRecord(properties: PageObjectResponse["properties"]): PageObjectResponse {
+    return { object: "page", id: "record-1", properties } as PageObjectResponse;
+  }
+
+  const record = createRecord({
+    Status: { type: "select", select: { id: "1", name: "Done", color: "green" }, id: "s" },
+    Name: { type: "title", title: [createRichText("Task, \"A\"")], id: "t" },
+    Note: { type: "rich_text", rich_text: [createRichText("line1\nline2")], id: "n" },
+  });
+
+  it("should quote fields only when needed", () => {
+    expect(escapeCsvField("plain")).toBe("plain");
+    expect(escapeCsvField("a,b")).toBe('"a,b"');
+    expect(escapeCsvField('say "hi"')).toBe('"say ""hi"""');
+    expect(escapeCsvField("a\nb")).toBe('"a\nb"');
+  });
+
+  it("should put the title property first", () => {
+    expect(getCsvHeaders(record)).toEqual(["Name", "Status", "Note"]);
+  });
+
+  it("should format a record as one CSV row", () => {
+    expect(recordToCsvRow(record, ["Name", "Status", "Missing"])).toBe(
+      '"Task, ""A""",Done,',
+    );
+  });
+});
+
+describe("splitCsvRows", () => {
+  it("should split rows on newlines outside quotes", () => {
+    expect(splitCsvRows('a,b\n"x\ny",2\n"say ""hi""",3\n')).toEqual([
+      "a,b",
+      '"x\ny",2',
+      '"say ""hi""",3',
+    ]);
+  });
+
+  it("should handle content without a trailing newline", () => {
+    expect(splitCsvRows("a\nb")).toEqual(["a", "b"]);
+    expect(splitCsvRows("")).toEqual([]);
+  });
+});
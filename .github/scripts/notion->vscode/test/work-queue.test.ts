@@ -0,0 +1,136 @@
+/**
+ * work-queue ユニットテスト
+ */
+import { describe, it, expect } from "vitest";
+import { createWorkQueue } from "../work-queue.js";
+
+/**
+ * 指定ミリ秒待機
+ */
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+describe("createWorkQueue", () => {
+  it("should process all pushed tasks", async () => {
+    const processed: number[] = [];
+    const queue = createWorkQueue<number>(2, async (n) => {
+      processed.push(n);
+    });
+
+    queue.push(1);
+    queue.push(2);
+    queue.push(3);
+    await queue.onIdle();
+
+    expect(processed.sort()).toEqual([1, 2, 3]);
+  });
+
+  it("should not exceed the concurrency limit", async () => {
+    let running = 0;
+    let maxRunning = 0;
+    const queue = createWorkQueue<number>(3, async () => {
+      running++;
+      maxRunning = Math.max(maxRunning, running);
+      await sleep(5);
+      running--;
+    });
+
+    for (let i = 0; i < 10; i++) {
+      queue.push(i);
+    }
+    await queue.onIdle();
+
+    expect(maxRunning).toBe(3);
+  });
+
+  it("should process tasks pushed from inside the handler", async () => {
+    const processed: number[] = [];
+    const queue = createWorkQueue<number>(2, async (depth) => {
+      processed.push(depth);
+      if (depth < 3) {
+        await sleep(1);
+        queue.push(depth + 1);
+        queue.push(depth + 1);
+      }
+    });
+
+    queue.push(0);
+    await queue.onIdle();
+
+    // 1 + 2 + 4 + 8
+    expect(processed.length).toBe(15);
+  });
+
+  it("should resolve immediately when nothing was pushed", async () => {
+    const queue = createWorkQueue<number>(1, async () => {});
+    await expect(queue.onIdle()).resolves.toBeUndefined();
+  });
+
+  it("should reject onIdle with the first handler error after draining", async () => {
+    const processed: number[] = [];
+    const queue = createWorkQueue<number>(1, async (n) => {
+      if (n === 1) {
+        throw new Error("boom");
+      }
+      processed.push(n);
+    });
+
+    queue.push(1);
+    queue.push(2);
+
+    await expect(queue.onIdle()).rejects.toThrow("boom");
+    expect(processed).toEqual([2]);
+  });
+
+  it("should wait in the handler until the backlog drains", async () => {
+    const backlogs: number[] = [];
+    const queue = createWorkQueue<number>(2, async (n) => {
+      if (n !== 0) {
+        await sleep(1);
+        return;
+      }
+      for (let i = 1; i <= 20; i++) {
+        queue.push(i);
+        await queue.waitForBacklog(3);
+        backlogs.push(queue.pending);
+      }
+    });
+
+    queue.push(0);
+    await queue.onIdle();
+
+    expect(Math.max(...backlogs)).toBeLessThanOrEqual(3);
+  });
+
+  it("should not wait for the backlog without another running worker", async () => {
+    const queue = createWorkQueue<number>(1, async (n) => {
+      if (n !== 0) {
+        return;
+      }
+      for (let i = 1; i <= 5; i++) {
+        queue.push(i);
+      }
+      // 唯一のワーカーが待つと処理が進まなくなる
+      await queue.waitForBacklog(0);
+    });
+
+    queue.push(0);
+    await queue.onIdle();
+
+    expect(queue.pending).toBe(0);
+  });
+
+  it("should expose pending and active counts", async () => {
+    const queue = createWorkQueue<number>(1, () => sleep(5));
+
+    queue.push(1);
+    queue.push(2);
+
+    expect(queue.active).toBe(1);
+    expect(queue.pending).toBe(1);
+    await queue.onIdle();
+    expect(queue.active).toBe(0);
+    expect(queue.pending).toBe(0);
+  });
+});
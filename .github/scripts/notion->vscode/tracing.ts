@@ -0,0 +1,243 @@
+/**
+ * 同期処理のスパン計測
+ * ページ・DBの処理、ブロック取得、変換、画像ダウンロード、ファイル書き込みの所要時間を
+ * 親子関係つきで記録し、Chromeのtrace_event形式のJSONで書き出す（NOTION_SYNC_TRACE_FILE）。
+ * chrome://tracing や Perfetto UI で開くと、クリティカルパスと実際の並列度が分かる
+ */
+import { AsyncLocalStorage } from "node:async_hooks";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+export interface Span {
+  id: number;
+  name: string;
+  /** 表示する行（同じ行のスパンは入れ子になる） */
+  lane: number;
+  /** 同じ行で1つ外側の実行中のスパン */
+  outer: Span | null;
+  parentId: number | null;
+  startUs: number;
+}
+
+/**
+ * キューに積んだ処理と、それを積んだスパンの関連（積んだ時点で記録）
+ * 後から別の行で実行されるスパンの親として使い、フロー矢印で結ぶ
+ */
+export interface SpanLink {
+  span: Span;
+  atUs: number;
+}
+
+export interface SpanOptions {
+  /** スパンに付ける属性（トレースビューアに表示される） */
+  args?: Record<string, unknown>;
+  /** キューを経由して実行する場合の親（省略時は実行中のスパン） */
+  link?: SpanLink | null;
+}
+
+export interface TraceEvent {
+  name: string;
+  cat?: string;
+  ph: string;
+  ts?: number;
+  dur?: number;
+  pid: number;
+  tid: number;
+  id?: number;
+  bp?: string;
+  args?: Record<string, unknown>;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+// トレースを書き出すファイル（未設定なら記録しない）
+const TRACE_FILE = process.env.NOTION_SYNC_TRACE_FILE ?? "";
+
+const TRACE_PID = 1;
+
+// ============================================================
+// 記録
+// ============================================================
+const currentSpan = new AsyncLocalStorage<Span>();
+let events: TraceEvent[] = [];
+let nextSpanId = 1;
+// 行ごとの最も内側の実行中のスパン（nullは空き）
+let laneTops: (Span | null)[] = [];
+
+/**
+ * トレースを記録するかどうか
+ */
+export function isTracingEnabled(): boolean {
+  return TRACE_FILE !== "";
+}
+
+/**
+ * 現在時刻（マイクロ秒）
+ */
+function nowUs(): number {
+  return Math.round(performance.now() * 1000);
+}
+
+/**
+ * 空いている行を確保（最も若い番号）
+ */
+function acquireLane(): number {
+  const free = laneTops.indexOf(null);
+  return free >= 0 ? free : laneTops.push(null) - 1;
+}
+
+/**
+ * 実行中のスパンとの関連を記録（キューに積む時点で呼ぶ）
+ */
+export function linkSpan(): SpanLink | null {
+  const span = isTracingEnabled() ? currentSpan.getStore() : undefined;
+  return span ? { span, atUs: nowUs() } : null;
+}
+
+/**
+ * 処理をスパンとして計測
+ * 親が同じ行の最も内側なら入れ子で、そうでなければ（並列・キュー経由）空いている行に置く
+ */
+export async function withSpan<T>(
+  name: string,
+  fn: () => Promise<T>,
+  options: SpanOptions = {},
+): Promise<T> {
+  if (!isTracingEnabled()) {
+    return fn();
+  }
+
+  const parent = options.link ? options.link.span : currentSpan.getStore();
+  const nested =
+    !options.link && parent !== undefined && laneTops[parent.lane] === parent;
+  const lane = nested ? parent.lane : acquireLane();
+  const span: Span = {
+    id: nextSpanId++,
+    name,
+    lane,
+    outer: nested ? parent : null,
+    parentId: parent?.id ?? null,
+    startUs: nowUs(),
+  };
+  laneTops[lane] = span;
+
+  if (options.link) {
+    // キューに積んだ時点から実行開始までを矢印で結ぶ
+    events.push(
+      {
+        name: "queued",
+        cat: "flow",
+        ph: "s",
+        id: span.id,
+        ts: options.link.atUs,
+        pid: TRACE_PID,
+        tid: options.link.span.lane + 1,
+      },
+      {
+        name: "queued",
+        cat: "flow",
+        ph: "f",
+        bp: "e",
+        id: span.id,
+        ts: span.startUs,
+        pid: TRACE_PID,
+        tid: lane + 1,
+      },
+    );
+  }
+
+  let error: unknown = null;
+  try {
+    return await currentSpan.run(span, fn);
+  } catch (e) {
+    error = e;
+    throw e;
+  } finally {
+    if (laneTops[lane] === span) {
+      laneTops[lane] = span.outer;
+    }
+    events.push({
+      name,
+      cat: "sync",
+      ph: "X",
+      ts: span.startUs,
+      dur: nowUs() - span.startUs,
+      pid: TRACE_PID,
+      tid: lane + 1,
+      args: {
+        spanId: span.id,
+        parentId: span.parentId,
+        ...options.args,
+        ...(error ? { error: String(error) } : {}),
+      },
+    });
+  }
+}
+
+/**
+ * 記録したトレースをリセット
+ */
+export function resetTrace(): void {
+  events = [];
+  nextSpanId = 1;
+  laneTops = [];
+}
+
+/**
+ * 記録したトレースを取得（行の名前のメタデータを含む）
+ */
+export function getTraceEvents(): TraceEvent[] {
+  const metadata: TraceEvent[] = [
+    {
+      name: "process_name",
+      ph: "M",
+      pid: TRACE_PID,
+      tid: 0,
+      args: { name: "notion-sync pull" },
+    },
+  ];
+  for (let lane = 0; lane < laneTops.length; lane++) {
+    metadata.push(
+      {
+        name: "thread_name",
+        ph: "M",
+        pid: TRACE_PID,
+        tid: lane + 1,
+        args: { name: `lane ${lane + 1}` },
+      },
+      {
+        name: "thread_sort_index",
+        ph: "M",
+        pid: TRACE_PID,
+        tid: lane + 1,
+        args: { sort_index: lane },
+      },
+    );
+  }
+  return [...metadata, ...events];
+}
+
+/**
+ * トレースをJSONで書き出す（NOTION_SYNC_TRACE_FILE 未設定なら何もしない）
+ * 書き出した場合はスパンの数を返す
+ */
+export async function writeTrace(
+  filePath: string = TRACE_FILE,
+): Promise<number> {
+  if (!filePath) {
+    return 0;
+  }
+  await fs.mkdir(path.dirname(path.resolve(filePath)), { recursive: true });
+  await fs.writeFile(
+    filePath,
+    JSON.stringify({ traceEvents: getTraceEvents(), displayTimeUnit: "ms" }),
+    "utf-8",
+  );
+  return events.filter((event) => event.ph === "X").length;
+}
@@ -22,6 +22,25 @@ export function sanitizeFilename(name: string): string {
   return name.replace(/[<>:"/\\|?*]/g, "").trim();
 }
 
+/**
+ * ファイル/フォルダ名からNotion IDを抽出
+ * 形式: "タイトル {32文字のID}.md"、"タイトル {32文字のID}.csv" または "タイトル {32文字のID}/"
+ */
+export function extractIdFromName(name: string): string | null {
+  return name.match(/\s([a-f0-9]{32})(?:\.md|\.csv)?$/)?.[1] ?? null;
+}
+
+/**
+ * 環境変数の値を正の整数として解釈（不正な値はデフォルト値）
+ */
+export function parsePositiveInt(
+  value: string | undefined,
+  fallback: number,
+): number {
+  const parsed = Number.parseInt(value ?? "", 10);
+  return Number.isFinite(parsed) && parsed > 0 ? parsed : fallback;
+}
+
 // ============================================================
 // リッチテキスト変換
 // ============================================================
@@ -181,3 +200,79 @@ export function getPageTitle(page: PageObjectResponse): string {
 
   return "Untitled";
 }
+
+// ============================================================
+// CSV
+// ============================================================
+
+/**
+ * CSVフィールドをエスケープ（カンマ、改行、ダブルクォートを含む場合のみクォート）
+ */
+export function escapeCsvField(field: string): string {
+  if (field.includes(",") || field.includes("\n") || field.includes('"')) {
+    return `"${field.replace(/"/g, '""')}"`;
+  }
+  return field;
+}
+
+/**
+ * レコードのプロパティからCSVのヘッダーを決定（タイトルプロパティを先頭にする）
+ */
+export function getCsvHeaders(record: PageObjectResponse): string[] {
+  const headers: string[] = [];
+  let titleProp: string | null = null;
+
+  for (const [name, prop] of Object.entries(record.properties)) {
+    if (prop.type === "title") {
+      titleProp = name;
+    } else {
+      headers.push(name);
+    }
+  }
+
+  if (titleProp) {
+    headers.unshift(titleProp);
+  }
+  return headers;
+}
+
+/**
+ * レコードをCSVの1行に変換（末尾の改行なし）
+ */
+export function recordToCsvRow(
+  record: PageObjectResponse,
+  headers: string[],
+): string {
+  return headers
+    .map((name) => {
+      const prop = record.properties[name];
+      return escapeCsvField(prop ? extractPropertyValue(prop) : "");
+    })
+    .join(",");
+}
+
+/**
+ * CSVの内容を行ごとに分割（クォート内の改行は行の区切りとみなさない）
+ * 各行は末尾の改行を含まない元の文字列のまま返す
+ */
+export function splitCsvRows(content: string): string[] {
+  const rows: string[] = [];
+  let inQuotes = false;
+  let start = 0;
+
+  for (let i = 0; i < content.length; i++) {
+    const char = content[i];
+    if (char === '"') {
+      // "" はエスケープされたクォートなので状態は2回反転して元に戻る
+      inQuotes = !inQuotes;
+    } else if (char === "\n" && !inQuotes) {
+      rows.push(content.slice(start, i));
+      start = i + 1;
+    }
+  }
+
+  if (start < content.length) {
+    rows.push(content.slice(start));
+  }
+  return rows;
+}
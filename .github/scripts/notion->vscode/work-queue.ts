@@ -0,0 +1,132 @@
+/**
+ * 並列度を制限したワークキュー
+ * ページツリー探索などで、処理中に新しいタスクが追加されるケースに対応する
+ */
+
+// ============================================================
+// 型定義
+// ============================================================
+export interface WorkQueue<T> {
+  /** タスクを追加（空きワーカーがあれば即座に開始） */
+  push(task: T): void;
+  /** キューが空になり、実行中のタスクもなくなるまで待機 */
+  onIdle(): Promise<void>;
+  /**
+   * 待機中のタスクがlimit件以下になるまで待機（handler内から呼ぶ）
+   * 他に動いているワーカーがなければ、処理が進まなくなるので待たない
+   */
+  waitForBacklog(limit: number): Promise<void>;
+  /** 待機中のタスク数 */
+  readonly pending: number;
+  /** 実行中のタスク数 */
+  readonly active: number;
+}
+
+// ============================================================
+// ワークキュー
+// ============================================================
+
+/**
+ * ワークキューを作成
+ * handler内でpush()されたタスクも同じワーカープールで処理される。
+ * handlerが例外を投げた場合は残りのタスクを処理した上でonIdle()がrejectされる。
+ */
+export function createWorkQueue<T>(
+  concurrency: number,
+  handler: (task: T) => Promise<void>,
+): WorkQueue<T> {
+  const limit = Math.max(1, Math.floor(concurrency) || 1);
+  let queue: T[] = [];
+  let head = 0;
+  let active = 0;
+  let firstError: unknown = null;
+  let idleWaiters: Array<{
+    resolve: () => void;
+    reject: (e: unknown) => void;
+  }> = [];
+  let backlogWaiters: Array<{ limit: number; resolve: () => void }> = [];
+
+  const releaseBacklogWaiters = (): void => {
+    if (backlogWaiters.length === 0) {
+      return;
+    }
+    const pending = queue.length - head;
+    backlogWaiters = backlogWaiters.filter((waiter) => {
+      if (pending > waiter.limit) {
+        return true;
+      }
+      waiter.resolve();
+      return false;
+    });
+  };
+
+  const settleIfIdle = (): void => {
+    if (active > 0 || head < queue.length) {
+      return;
+    }
+    const waiters = idleWaiters;
+    idleWaiters = [];
+    const error = firstError;
+    firstError = null;
+    for (const waiter of waiters) {
+      if (error) {
+        waiter.reject(error);
+      } else {
+        waiter.resolve();
+      }
+    }
+  };
+
+  const runNext = (): void => {
+    while (active < limit && head < queue.length) {
+      const task = queue[head++];
+      // 消費済みの領域を定期的に切り詰める（shift()のO(n)を避ける）
+      if (head > 1024 && head * 2 > queue.length) {
+        queue = queue.slice(head);
+        head = 0;
+      }
+      active++;
+      handler(task)
+        .catch((e) => {
+          firstError ??= e;
+        })
+        .finally(() => {
+          active--;
+          runNext();
+          releaseBacklogWaiters();
+          settleIfIdle();
+        });
+    }
+  };
+
+  return {
+    push(task: T): void {
+      queue.push(task);
+      runNext();
+    },
+    onIdle(): Promise<void> {
+      return new Promise((resolve, reject) => {
+        idleWaiters.push({ resolve, reject });
+        settleIfIdle();
+      });
+    },
+    waitForBacklog(limit: number): Promise<void> {
+      // 待機中のワーカーを除いて、この呼び出し元以外に動いているワーカーが必要
+      if (
+        queue.length - head <= limit ||
+        active - backlogWaiters.length <= 1
+      ) {
+        return Promise.resolve();
+      }
+      return new Promise((resolve) => {
+        backlogWaiters.push({ limit, resolve });
+      });
+    },
+    get pending(): number {
+      return queue.length - head;
+    },
+    get active(): number {
+      return active;
+    },
+  };
+}
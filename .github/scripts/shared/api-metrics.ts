@@ -0,0 +1,236 @@
+/**
+ * Notion API・画像ダウンロードのエンドポイント別の計測
+ * 試行ごとの呼び出し回数・エラー数・429の数・受信バイト数と、レイテンシのヒストグラムを記録する。
+ * pull/push両方のfetchラッパーから使い、実行の最後にJSONで書き出す（NOTION_API_METRICS_FILE）
+ */
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import type { FetchLike } from "./notion-fetch.js";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+export interface LatencyPercentiles {
+  p50: number;
+  p95: number;
+  p99: number;
+  max: number;
+}
+
+export interface EndpointMetrics {
+  /** 呼び出し回数（再試行を含む） */
+  calls: number;
+  /** 失敗した回数（4xx・5xx・ネットワークエラー・タイムアウト） */
+  errors: number;
+  /** 429を受けた回数 */
+  rateLimited: number;
+  /** 受信したレスポンスボディのバイト数 */
+  bytesReceived: number;
+  /** レスポンスヘッダー受信までのレイテンシ（ミリ秒） */
+  latencyMs: LatencyPercentiles;
+}
+
+export interface ApiMetricsSummary {
+  totalCalls: number;
+  /** エンドポイント → 計測値 */
+  endpoints: Record<string, EndpointMetrics>;
+}
+
+interface EndpointRecord {
+  calls: number;
+  errors: number;
+  rateLimited: number;
+  bytesReceived: number;
+  /** BUCKET_BOUNDS_MSの各バケットの件数（最後は上限超え） */
+  buckets: number[];
+  maxMs: number;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+// 計測結果を書き出すファイル（未設定なら書き出さない）
+const METRICS_FILE = process.env.NOTION_API_METRICS_FILE ?? "";
+
+// レイテンシのヒストグラムのバケット上限（1msから約25%刻みで2分まで）
+const BUCKET_BOUNDS_MS: number[] = [];
+for (let bound = 1; bound <= 120_000; bound *= 1.25) {
+  BUCKET_BOUNDS_MS.push(Math.round(bound * 10) / 10);
+}
+
+// ============================================================
+// 記録
+// ============================================================
+const records = new Map<string, EndpointRecord>();
+
+/**
+ * エンドポイントの記録を取得（なければ作成）
+ */
+function getRecord(endpoint: string): EndpointRecord {
+  let record = records.get(endpoint);
+  if (!record) {
+    record = {
+      calls: 0,
+      errors: 0,
+      rateLimited: 0,
+      bytesReceived: 0,
+      buckets: new Array<number>(BUCKET_BOUNDS_MS.length + 1).fill(0),
+      maxMs: 0,
+    };
+    records.set(endpoint, record);
+  }
+  return record;
+}
+
+/**
+ * 1回の呼び出しを記録（statusがない場合はネットワークエラー・タイムアウト）
+ */
+export function recordApiCall(
+  endpoint: string,
+  durationMs: number,
+  status?: number,
+): void {
+  const record = getRecord(endpoint);
+  record.calls++;
+  if (status === undefined || status >= 400) {
+    record.errors++;
+  }
+  if (status === 429) {
+    record.rateLimited++;
+  }
+
+  let bucket = BUCKET_BOUNDS_MS.findIndex((bound) => durationMs <= bound);
+  if (bucket < 0) {
+    bucket = BUCKET_BOUNDS_MS.length;
+  }
+  record.buckets[bucket]++;
+  record.maxMs = Math.max(record.maxMs, durationMs);
+}
+
+/**
+ * 受信したバイト数を記録
+ */
+export function recordBytesReceived(endpoint: string, bytes: number): void {
+  getRecord(endpoint).bytesReceived += bytes;
+}
+
+/**
+ * fetchを計測付きでラップ
+ * レイテンシはレスポンスヘッダー受信まで、バイト数はボディを読んだ分を数える
+ */
+export function instrumentFetch(
+  endpoint: string,
+  baseFetch: FetchLike,
+): FetchLike {
+  return async (url, init) => {
+    const startedAt = performance.now();
+    let response: Response;
+    try {
+      response = await baseFetch(url, init);
+    } catch (e) {
+      recordApiCall(endpoint, performance.now() - startedAt);
+      throw e;
+    }
+    recordApiCall(endpoint, performance.now() - startedAt, response.status);
+
+    if (!response.body) {
+      return response;
+    }
+    const counter = new TransformStream<Uint8Array, Uint8Array>({
+      transform(chunk, controller) {
+        recordBytesReceived(endpoint, chunk.byteLength);
+        controller.enqueue(chunk);
+      },
+    });
+    return new Response(response.body.pipeThrough(counter), {
+      status: response.status,
+      statusText: response.statusText,
+      headers: response.headers,
+    });
+  };
+}
+
+// ============================================================
+// 集計
+// ============================================================
+
+/**
+ * ヒストグラムから百分位数を求める（該当バケットの上限、最大値を超えない）
+ */
+function percentile(record: EndpointRecord, ratio: number): number {
+  const target = Math.ceil(record.calls * ratio);
+  let seen = 0;
+  for (let i = 0; i < record.buckets.length; i++) {
+    seen += record.buckets[i];
+    if (seen >= target) {
+      return Math.min(BUCKET_BOUNDS_MS[i] ?? record.maxMs, record.maxMs);
+    }
+  }
+  return record.maxMs;
+}
+
+/**
+ * 計測結果を取得
+ */
+export function getApiMetrics(): ApiMetricsSummary {
+  const endpoints: Record<string, EndpointMetrics> = {};
+  let totalCalls = 0;
+
+  for (const [endpoint, record] of [...records.entries()].sort(([a], [b]) =>
+    a.localeCompare(b),
+  )) {
+    totalCalls += record.calls;
+    endpoints[endpoint] = {
+      calls: record.calls,
+      errors: record.errors,
+      rateLimited: record.rateLimited,
+      bytesReceived: record.bytesReceived,
+      latencyMs: {
+        p50: percentile(record, 0.5),
+        p95: percentile(record, 0.95),
+        p99: percentile(record, 0.99),
+        max: Math.round(record.maxMs * 10) / 10,
+      },
+    };
+  }
+
+  return { totalCalls, endpoints };
+}
+
+/**
+ * 計測結果をリセット
+ */
+export function resetApiMetrics(): void {
+  records.clear();
+}
+
+/**
+ * 計測結果の表示用の行（呼び出し回数の多い順）
+ */
+export function formatApiMetrics(summary: ApiMetricsSummary): string[] {
+  return Object.entries(summary.endpoints)
+    .sort(([, a], [, b]) => b.calls - a.calls)
+    .map(
+      ([endpoint, m]) =>
+        `${endpoint}: ${m.calls} calls, ${m.errors} errors (${m.rateLimited} rate limited), ${(m.bytesReceived / 1024 / 1024).toFixed(1)} MB, p50 ${m.latencyMs.p50}ms / p95 ${m.latencyMs.p95}ms / p99 ${m.latencyMs.p99}ms`,
+    );
+}
+
+/**
+ * 計測結果をJSONで書き出す（NOTION_API_METRICS_FILE 未設定なら何もしない）
+ */
+export async function writeApiMetrics(
+  filePath: string = METRICS_FILE,
+): Promise<void> {
+  if (!filePath) {
+    return;
+  }
+  await fs.mkdir(path.dirname(path.resolve(filePath)), { recursive: true });
+  await fs.writeFile(
+    filePath,
+    JSON.stringify(getApiMetrics(), null, 2) + "\n",
+    "utf-8",
+  );
+}
@@ -0,0 +1,242 @@
+/**
+ * pull/push共通のログ出力
+ * レベル（NOTION_LOG_LEVEL）で絞り込み、テキストまたはNDJSON（NOTION_LOG_FORMAT）で出力する。
+ * 標準出力への書き込みはまとめて行い、ページ・ファイルごとの行の代わりに定期的な進捗行を出す
+ */
+import { writeSync } from "node:fs";
+
+// ============================================================
+// 型定義
+// ============================================================
+
+export type LogLevel = "debug" | "info" | "warn" | "error";
+
+export type LogFields = Record<string, unknown>;
+
+export interface ProgressCounts {
+  /** 処理済みの件数 */
+  done: number;
+  /** 待機中・処理中の件数 */
+  queued: number;
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+const LEVEL_ORDER: Record<LogLevel, number> = {
+  debug: 0,
+  info: 1,
+  warn: 2,
+  error: 3,
+};
+
+/**
+ * 出力する最低レベル（NOTION_LOG_QUIET=true なら警告以上だけ）
+ */
+function loadLevel(): LogLevel {
+  if ((process.env.NOTION_LOG_QUIET ?? "false").toLowerCase() === "true") {
+    return "warn";
+  }
+  const level = (process.env.NOTION_LOG_LEVEL ?? "info").toLowerCase();
+  return level in LEVEL_ORDER ? (level as LogLevel) : "info";
+}
+
+const MIN_LEVEL = loadLevel();
+
+// json: 1行1オブジェクト（NDJSON）、text: 人が読む形式
+const JSON_FORMAT =
+  (process.env.NOTION_LOG_FORMAT ?? "text").toLowerCase() === "json";
+
+// 進捗行を出す間隔（ミリ秒、0で出さない）
+const PROGRESS_INTERVAL_MS = (() => {
+  const parsed = Number.parseInt(
+    process.env.NOTION_LOG_PROGRESS_INTERVAL_MS ?? "",
+    10,
+  );
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : 10_000;
+})();
+
+// バッファがこのサイズを超えたら書き出す
+const FLUSH_BYTES = 64 * 1024;
+// バッファを書き出す間隔（ミリ秒）
+const FLUSH_INTERVAL_MS = 1000;
+
+// ============================================================
+// 出力
+// ============================================================
+let buffer = "";
+// バッファのUTF-8でのバイト数（文字列の長さはUTF-16のコード単位数なので別に数える）
+let bufferBytes = 0;
+let flushTimer: NodeJS.Timeout | null = null;
+
+/**
+ * バッファした行を標準出力に書き出す
+ */
+export function flushLogs(): void {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  if (buffer === "") {
+    return;
+  }
+  const chunk = buffer;
+  buffer = "";
+  bufferBytes = 0;
+  process.stdout.write(chunk);
+}
+
+// 終了時（process.exitを含む）に残りを同期的に書き出す
+process.on("exit", () => {
+  if (buffer !== "") {
+    writeSync(1, buffer);
+    buffer = "";
+    bufferBytes = 0;
+  }
+});
+
+/**
+ * 1行を整形
+ */
+function formatLine(
+  level: LogLevel,
+  message: string,
+  fields?: LogFields,
+): string {
+  if (JSON_FORMAT) {
+    return (
+      JSON.stringify({
+        time: new Date().toISOString(),
+        level,
+        msg: message.trim(),
+        ...fields,
+      }) + "\n"
+    );
+  }
+  return `${message}\n`;
+}
+
+/**
+ * 指定レベルのログを出力するかどうか
+ */
+export function isLogLevelEnabled(level: LogLevel): boolean {
+  return LEVEL_ORDER[level] >= LEVEL_ORDER[MIN_LEVEL];
+}
+
+/**
+ * ログを出力
+ * debug/infoは標準出力にまとめて書き、warn/errorは順序を保つためバッファを書き出してから標準エラーに書く
+ */
+function write(level: LogLevel, message: string, fields?: LogFields): void {
+  if (!isLogLevelEnabled(level)) {
+    return;
+  }
+  const line = formatLine(level, message, fields);
+
+  if (LEVEL_ORDER[level] >= LEVEL_ORDER.warn) {
+    flushLogs();
+    process.stderr.write(line);
+    return;
+  }
+
+  buffer += line;
+  bufferBytes += Buffer.byteLength(line);
+  if (bufferBytes >= FLUSH_BYTES) {
+    flushLogs();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flushLogs, FLUSH_INTERVAL_MS);
+    flushTimer.unref();
+  }
+}
+
+/**
+ * ページ・ファイルごとの詳細（NOTION_LOG_LEVEL=debug で表示）
+ */
+export function logDebug(message: string, fields?: LogFields): void {
+  write("debug", message, fields);
+}
+
+/**
+ * 実行の開始・サマリー
+ */
+export function logInfo(message: string, fields?: LogFields): void {
+  write("info", message, fields);
+}
+
+/**
+ * 処理を続けられる問題（一部の取得・変換の失敗など）
+ */
+export function logWarn(message: string, fields?: LogFields): void {
+  write("warn", message, fields);
+}
+
+/**
+ * ページ・ファイル単位の失敗
+ */
+export function logError(message: string, fields?: LogFields): void {
+  write("error", message, fields);
+}
+
+/**
+ * 区切り線（テキスト形式のみ）
+ */
+export function logSeparator(): void {
+  if (!JSON_FORMAT) {
+    write("info", "=".repeat(50));
+  }
+}
+
+// ============================================================
+// 進捗
+// ============================================================
+
+/**
+ * 秒数を表示用に整形（例: 1h02m, 3m05s, 42s）
+ */
+export function formatDuration(seconds: number): string {
+  const s = Math.max(0, Math.round(seconds));
+  if (s >= 3600) {
+    return `${Math.floor(s / 3600)}h${String(Math.floor((s % 3600) / 60)).padStart(2, "0")}m`;
+  }
+  if (s >= 60) {
+    return `${Math.floor(s / 60)}m${String(s % 60).padStart(2, "0")}s`;
+  }
+  return `${s}s`;
+}
+
+/**
+ * 定期的に進捗行（処理済み・待機中・速度・残り時間）を出力
+ * 残り時間は現在の待機中の件数から見積もる（探索中に増える分は含まない）
+ * 戻り値の関数で停止する
+ */
+export function startProgress(
+  label: string,
+  getCounts: () => ProgressCounts,
+): () => void {
+  if (PROGRESS_INTERVAL_MS === 0 || !isLogLevelEnabled("info")) {
+    return () => {};
+  }
+
+  const startedAt = performance.now();
+  const timer = setInterval(() => {
+    const { done, queued } = getCounts();
+    const elapsedSeconds = (performance.now() - startedAt) / 1000;
+    const rate = elapsedSeconds > 0 ? done / elapsedSeconds : 0;
+    const etaSeconds = rate > 0 ? queued / rate : null;
+    logInfo(
+      `Progress: ${done} ${label} done, ${queued} queued, ${rate.toFixed(1)}/s, ETA ${etaSeconds === null ? "-" : formatDuration(etaSeconds)}`,
+      {
+        event: "progress",
+        label,
+        done,
+        queued,
+        rate: Math.round(rate * 10) / 10,
+        etaSeconds: etaSeconds === null ? null : Math.round(etaSeconds),
+      },
+    );
+  }, PROGRESS_INTERVAL_MS);
+  timer.unref();
+
+  return () => clearInterval(timer);
+}
@@ -0,0 +1,225 @@
+/**
+ * Notion API・画像ダウンロード共通のfetchラッパー
+ * pull/push両方のNotionクライアントがこのfetchを使い、
+ * 1つのレートリミッターでリクエストのペースを制御し、一時的なエラーを再試行する
+ */
+import { instrumentFetch } from "./api-metrics.js";
+import { createRateLimiter, type RateLimiter } from "./rate-limiter.js";
+import {
+  fetchWithRetry,
+  loadRetryOptions,
+  type RetryOptions,
+} from "./retry.js";
+
+// ============================================================
+// 型定義
+// ============================================================
+export type FetchLike = (url: string, init?: RequestInit) => Promise<Response>;
+
+// ============================================================
+// 設定
+// ============================================================
+
+// エンドポイントごとのデフォルト優先度（小さいほど優先）
+const DEFAULT_ENDPOINT_PRIORITIES: Record<string, number> = {
+  "pages.retrieve": 0,
+  "databases.retrieve": 0,
+  "blocks.children.list": 1,
+  "dataSources.query": 1,
+  search: 1,
+  "blocks.children.append": 1,
+  "blocks.delete": 1,
+  asset: 2,
+};
+const DEFAULT_PRIORITY = 1;
+
+// GET以外でも読み取りだけのエンドポイント（再送しても二重に適用されない）
+const READ_ONLY_ENDPOINTS = new Set(["dataSources.query", "search"]);
+
+/**
+ * 環境変数を正の数値として読み込む（不正な値はデフォルト値）
+ */
+function readPositiveNumber(name: string, fallback: number): number {
+  const parsed = Number.parseFloat(process.env[name] ?? "");
+  return Number.isFinite(parsed) && parsed > 0 ? parsed : fallback;
+}
+
+/**
+ * エンドポイントの優先度設定を読み込む
+ * NOTION_RATE_LIMIT_PRIORITIES="pages.retrieve=0,asset=5" の形式で上書き可能
+ */
+function loadEndpointPriorities(): Record<string, number> {
+  const priorities = { ...DEFAULT_ENDPOINT_PRIORITIES };
+  const override = process.env.NOTION_RATE_LIMIT_PRIORITIES ?? "";
+
+  for (const pair of override.split(",")) {
+    const [endpoint, value] = pair.split("=").map((s) => s.trim());
+    const priority = Number.parseInt(value ?? "", 10);
+    if (endpoint && Number.isFinite(priority)) {
+      priorities[endpoint] = priority;
+    }
+  }
+
+  return priorities;
+}
+
+// ============================================================
+// エンドポイント判定
+// ============================================================
+
+/**
+ * リクエストのメソッドとURLからNotion APIのエンドポイント名を判定
+ * 例: GET /v1/blocks/{id}/children → "blocks.children.list"
+ */
+export function classifyNotionRequest(method: string, url: string): string {
+  const upperMethod = method.toUpperCase();
+  let segments: string[];
+  try {
+    segments = new URL(url).pathname.split("/").filter(Boolean);
+  } catch {
+    return "unknown";
+  }
+  // 先頭の "v1" を除去
+  if (segments[0] === "v1") {
+    segments = segments.slice(1);
+  }
+
+  const [resource, , sub] = segments;
+
+  switch (resource) {
+    case "pages":
+      return upperMethod === "GET" ? "pages.retrieve" : "pages.update";
+    case "blocks":
+      if (sub === "children") {
+        return upperMethod === "GET"
+          ? "blocks.children.list"
+          : "blocks.children.append";
+      }
+      if (upperMethod === "DELETE") return "blocks.delete";
+      return upperMethod === "GET" ? "blocks.retrieve" : "blocks.update";
+    case "databases":
+      return upperMethod === "GET" ? "databases.retrieve" : "databases.update";
+    case "data_sources":
+      if (sub === "query") return "dataSources.query";
+      return upperMethod === "GET"
+        ? "dataSources.retrieve"
+        : "dataSources.update";
+    case "search":
+      return "search";
+    default:
+      return resource ? `${upperMethod.toLowerCase()}.${resource}` : "unknown";
+  }
+}
+
+/**
+ * 同じリクエストを再送しても安全かどうか
+ * ブロックの追加・ページの更新などは、失敗に見えてもサーバー側で適用済みの場合がある
+ */
+export function isIdempotentRequest(method: string, endpoint: string): boolean {
+  const upperMethod = method.toUpperCase();
+  return (
+    upperMethod === "GET" ||
+    upperMethod === "HEAD" ||
+    READ_ONLY_ENDPOINTS.has(endpoint)
+  );
+}
+
+// ============================================================
+// 共有レートリミッター
+// ============================================================
+let sharedLimiter: RateLimiter | null = null;
+let endpointPriorities: Record<string, number> | null = null;
+let retryOptions: RetryOptions | null = null;
+
+/**
+ * プロセス内で共有するレートリミッターを取得
+ * NOTION_RATE_LIMIT_RPS（持続レート）とNOTION_RATE_LIMIT_BURST（バースト）で設定
+ */
+export function getSharedRateLimiter(): RateLimiter {
+  sharedLimiter ??= createRateLimiter({
+    ratePerSecond: readPositiveNumber("NOTION_RATE_LIMIT_RPS", 3),
+    burst: readPositiveNumber("NOTION_RATE_LIMIT_BURST", 5),
+  });
+  return sharedLimiter;
+}
+
+/**
+ * エンドポイントの優先度を取得
+ */
+export function getEndpointPriority(endpoint: string): number {
+  endpointPriorities ??= loadEndpointPriorities();
+  return endpointPriorities[endpoint] ?? DEFAULT_PRIORITY;
+}
+
+// ============================================================
+// fetchラッパー
+// ============================================================
+
+/**
+ * Notion APIのベースURL（NOTION_API_BASE_URL、未設定ならクライアントのデフォルト）
+ * ベンチマークではモックサーバーのURLを設定する
+ */
+export function getNotionBaseUrl(): string | undefined {
+  return process.env.NOTION_API_BASE_URL || undefined;
+}
+
+/**
+ * Notionクライアントのタイムアウト（ミリ秒）
+ * リクエスト単位のタイムアウトはリトライ層で行うため、再試行を含めた全体の上限にする
+ */
+export function getClientTimeoutMs(): number {
+  retryOptions ??= loadRetryOptions();
+  return (
+    retryOptions.maxAttempts * (retryOptions.timeoutMs + retryOptions.maxDelayMs)
+  );
+}
+
+/**
+ * レートリミッターとリトライを通してリクエストを実行
+ * 再試行のたびにトークンを取り直す。各試行はエンドポイント別に計測する。
+ * 更新系のリクエストは429と送信前の接続エラーだけを再試行する
+ */
+function scheduledFetch(
+  baseFetch: FetchLike,
+  url: string,
+  init: RequestInit | undefined,
+  endpoint: string,
+): Promise<Response> {
+  retryOptions ??= loadRetryOptions();
+  const priority = getEndpointPriority(endpoint);
+  const measuredFetch = instrumentFetch(endpoint, baseFetch);
+  return fetchWithRetry(
+    (signal) => measuredFetch(url, { ...init, signal }),
+    retryOptions,
+    {
+      signal: init?.signal ?? undefined,
+      waitForTurn: () =>
+        getSharedRateLimiter().schedule(async () => undefined, priority),
+      idempotent: isIdempotentRequest(init?.method ?? "GET", endpoint),
+    },
+  );
+}
+
+/**
+ * Notionクライアントに渡すfetchを作成
+ * 全リクエストが共有レートリミッターとリトライ層を通る
+ */
+export function createNotionFetch(baseFetch?: FetchLike): FetchLike {
+  return (url, init) => {
+    return scheduledFetch(
+      // baseFetch未指定時は呼び出し時点のグローバルfetchを使う（テストのモックに対応）
+      (u, i) => (baseFetch ?? fetch)(u, i),
+      url,
+      init,
+      classifyNotionRequest(init?.method ?? "GET", url),
+    );
+  };
+}
+
+/**
+ * 画像などのファイルをダウンロード
+ * Notion APIより低い優先度で共有レートリミッターとリトライ層を通る
+ */
+export function fetchAsset(url: string, init?: RequestInit): Promise<Response> {
+  return scheduledFetch((u, i) => fetch(u, i), url, init, "asset");
+}
@@ -0,0 +1,134 @@
+/**
+ * トークンバケット方式のレートリミッター
+ * Notion APIの呼び出しペース（平均3リクエスト/秒）を守るために使う
+ */
+
+// ============================================================
+// 型定義
+// ============================================================
+export interface RateLimiterOptions {
+  /** 持続的なリクエスト数/秒 */
+  ratePerSecond: number;
+  /** バケットの容量（瞬間的に許容するリクエスト数） */
+  burst: number;
+}
+
+export interface RateLimiterStats {
+  /** スケジュールされたリクエスト数 */
+  scheduled: number;
+  /** 待機キューの最大長 */
+  maxQueueDepth: number;
+  /** トークン待ちに費やした時間の合計（ミリ秒） */
+  totalWaitMs: number;
+}
+
+export interface RateLimiter {
+  /**
+   * トークンを1つ取得してから関数を実行
+   * priorityは小さいほど優先される
+   */
+  schedule<T>(fn: () => Promise<T>, priority?: number): Promise<T>;
+  /** トークン待ちのリクエスト数 */
+  readonly queueDepth: number;
+  getStats(): RateLimiterStats;
+}
+
+interface Waiter {
+  enqueuedAt: number;
+  resolve: () => void;
+}
+
+// ============================================================
+// レートリミッター
+// ============================================================
+
+/**
+ * トークンバケット方式のレートリミッターを作成
+ */
+export function createRateLimiter(options: RateLimiterOptions): RateLimiter {
+  const rate = Math.max(options.ratePerSecond, 0.001);
+  const capacity = Math.max(options.burst, 1);
+
+  let tokens = capacity;
+  let lastRefill = Date.now();
+  let timer: ReturnType<typeof setTimeout> | null = null;
+  let queueDepth = 0;
+
+  // 優先度ごとのFIFOキュー
+  const queues = new Map<number, Waiter[]>();
+
+  const stats: RateLimiterStats = {
+    scheduled: 0,
+    maxQueueDepth: 0,
+    totalWaitMs: 0,
+  };
+
+  const refill = (): void => {
+    const now = Date.now();
+    tokens = Math.min(capacity, tokens + ((now - lastRefill) / 1000) * rate);
+    lastRefill = now;
+  };
+
+  const takeNextWaiter = (): Waiter | undefined => {
+    const priorities = [...queues.keys()].sort((a, b) => a - b);
+    for (const priority of priorities) {
+      const queue = queues.get(priority)!;
+      const waiter = queue.shift();
+      if (queue.length === 0) {
+        queues.delete(priority);
+      }
+      if (waiter) {
+        return waiter;
+      }
+    }
+    return undefined;
+  };
+
+  const drain = (): void => {
+    refill();
+
+    while (queueDepth > 0 && tokens >= 1) {
+      const waiter = takeNextWaiter();
+      if (!waiter) {
+        break;
+      }
+      tokens -= 1;
+      queueDepth--;
+      stats.totalWaitMs += Date.now() - waiter.enqueuedAt;
+      waiter.resolve();
+    }
+
+    // 次のトークンが溜まる時刻に再度処理
+    if (queueDepth > 0 && timer === null) {
+      const waitMs = Math.ceil(((1 - tokens) / rate) * 1000);
+      timer = setTimeout(
+        () => {
+          timer = null;
+          drain();
+        },
+        Math.max(waitMs, 1),
+      );
+    }
+  };
+
+  return {
+    async schedule<T>(fn: () => Promise<T>, priority: number = 0): Promise<T> {
+      stats.scheduled++;
+      await new Promise<void>((resolve) => {
+        const queue = queues.get(priority) ?? [];
+        queue.push({ enqueuedAt: Date.now(), resolve });
+        queues.set(priority, queue);
+        queueDepth++;
+        stats.maxQueueDepth = Math.max(stats.maxQueueDepth, queueDepth);
+        drain();
+      });
+      return fn();
+    },
+    get queueDepth(): number {
+      return queueDepth;
+    },
+    getStats(): RateLimiterStats {
+      return { ...stats };
+    },
+  };
+}
@@ -0,0 +1,334 @@
+/**
+ * Notion API・画像ダウンロードのリトライ処理
+ * 429や5xx、ネットワークエラー、タイムアウトをジッター付き指数バックオフで再試行する
+ */
+
+// ============================================================
+// 型定義
+// ============================================================
+export interface RetryOptions {
+  /** 最大試行回数（初回を含む） */
+  maxAttempts: number;
+  /** バックオフの基準時間（ミリ秒） */
+  baseDelayMs: number;
+  /** バックオフの上限（ミリ秒） */
+  maxDelayMs: number;
+  /** 1リクエストのタイムアウト（レスポンスヘッダー受信まで、ミリ秒） */
+  timeoutMs: number;
+}
+
+export interface RetryStats {
+  /** 再試行した回数 */
+  retries: number;
+  /** バックオフで待機した時間の合計（ミリ秒） */
+  backoffMs: number;
+  /** タイムアウトした回数 */
+  timeouts: number;
+  /** リトライ予算切れで諦めた回数 */
+  budgetExhausted: number;
+}
+
+/**
+ * 1回分のリクエストを実行する関数（signalでタイムアウトを伝える）
+ */
+export type Attempt = (signal: AbortSignal) => Promise<Response>;
+
+export interface RetryContext {
+  /** 呼び出し元の中断シグナル（中断された場合は再試行しない） */
+  signal?: AbortSignal;
+  /** 各試行の前に待つ処理（レートリミッターの順番待ちなど、タイムアウトに含めない） */
+  waitForTurn?: () => Promise<void>;
+  /**
+   * 同じリクエストを再送しても結果が変わらないか（省略時はtrue）
+   * falseの場合、サーバー側で適用済みの可能性がある5xx・タイムアウトは再試行せず、
+   * 429と送信前の接続エラーだけを再試行する
+   */
+  idempotent?: boolean;
+}
+
+/**
+ * リクエストのタイムアウトエラー
+ */
+export class TimeoutError extends Error {
+  constructor(timeoutMs: number) {
+    super(`Request timed out after ${timeoutMs}ms`);
+    this.name = "TimeoutError";
+  }
+}
+
+/**
+ * レスポンスボディの受信が止まった場合のエラー
+ */
+export class IdleTimeoutError extends Error {
+  constructor(timeoutMs: number) {
+    super(`Response body stalled for ${timeoutMs}ms`);
+    this.name = "IdleTimeoutError";
+  }
+}
+
+// ============================================================
+// 設定
+// ============================================================
+
+// 再試行するHTTPステータス
+const RETRYABLE_STATUSES = new Set([429, 500, 502, 503, 504]);
+
+// リクエストを送信する前（接続の確立時）に失敗したことを示すエラーコード
+const CONNECT_ERROR_CODES = new Set([
+  "ECONNREFUSED",
+  "ENOTFOUND",
+  "EAI_AGAIN",
+  "EHOSTUNREACH",
+  "ENETUNREACH",
+  "UND_ERR_CONNECT_TIMEOUT",
+]);
+
+/**
+ * 環境変数を正の整数として読み込む（不正な値はデフォルト値）
+ */
+function readPositiveInt(name: string, fallback: number): number {
+  const parsed = Number.parseInt(process.env[name] ?? "", 10);
+  return Number.isFinite(parsed) && parsed > 0 ? parsed : fallback;
+}
+
+/**
+ * 環境変数からリトライ設定を読み込む
+ */
+export function loadRetryOptions(): RetryOptions {
+  return {
+    maxAttempts: readPositiveInt("NOTION_RETRY_MAX_ATTEMPTS", 5),
+    baseDelayMs: readPositiveInt("NOTION_RETRY_BASE_DELAY_MS", 500),
+    maxDelayMs: readPositiveInt("NOTION_RETRY_MAX_DELAY_MS", 30_000),
+    timeoutMs: readPositiveInt("NOTION_REQUEST_TIMEOUT_MS", 30_000),
+  };
+}
+
+// ============================================================
+// 実行全体のリトライ予算・統計
+// ============================================================
+let remainingBudget: number | null = null;
+let stats: RetryStats = createEmptyStats();
+
+function createEmptyStats(): RetryStats {
+  return { retries: 0, backoffMs: 0, timeouts: 0, budgetExhausted: 0 };
+}
+
+/**
+ * リトライ予算を1回分消費する（NOTION_RETRY_BUDGET、実行全体で共有）
+ */
+function consumeBudget(): boolean {
+  remainingBudget ??= readPositiveInt("NOTION_RETRY_BUDGET", 200);
+  if (remainingBudget <= 0) {
+    stats.budgetExhausted++;
+    return false;
+  }
+  remainingBudget--;
+  return true;
+}
+
+/**
+ * リトライ統計を取得
+ */
+export function getRetryStats(): RetryStats {
+  return { ...stats };
+}
+
+/**
+ * リトライ統計と予算をリセット
+ */
+export function resetRetryStats(): void {
+  stats = createEmptyStats();
+  remainingBudget = null;
+}
+
+// ============================================================
+// バックオフ計算
+// ============================================================
+
+/**
+ * 再試行すべきHTTPステータスかどうか
+ */
+export function isRetryableStatus(status: number): boolean {
+  return RETRYABLE_STATUSES.has(status);
+}
+
+/**
+ * リクエストを送信する前の接続エラーかどうか
+ * fetchのエラーは原因（cause）にエラーコードを持つ
+ */
+export function isConnectError(e: unknown): boolean {
+  for (let error = e; error instanceof Error; error = error.cause) {
+    const code = (error as { code?: unknown }).code;
+    if (typeof code === "string" && CONNECT_ERROR_CODES.has(code)) {
+      return true;
+    }
+  }
+  return false;
+}
+
+/**
+ * Retry-Afterヘッダーを待機ミリ秒に変換（秒数またはHTTP日付）
+ */
+export function parseRetryAfter(
+  value: string | null,
+  now: number = Date.now(),
+): number | null {
+  if (!value) {
+    return null;
+  }
+  const seconds = Number(value);
+  if (Number.isFinite(seconds)) {
+    return Math.max(0, seconds * 1000);
+  }
+  const date = Date.parse(value);
+  if (Number.isNaN(date)) {
+    return null;
+  }
+  return Math.max(0, date - now);
+}
+
+/**
+ * 指数バックオフの待機時間を計算（フルジッター）
+ * attemptは0始まり（1回目の再試行 = 0）
+ */
+export function computeBackoff(
+  attempt: number,
+  options: Pick<RetryOptions, "baseDelayMs" | "maxDelayMs">,
+  random: () => number = Math.random,
+): number {
+  const ceiling = Math.min(
+    options.maxDelayMs,
+    options.baseDelayMs * 2 ** attempt,
+  );
+  return Math.floor(random() * ceiling);
+}
+
+// ============================================================
+// リトライ実行
+// ============================================================
+
+/**
+ * 指定ミリ秒待機
+ */
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+/**
+ * タイムアウト付きで1回分のリクエストを実行
+ * 呼び出し元のsignalが中断された場合もリクエストを中断する
+ */
+async function runAttempt(
+  attempt: Attempt,
+  timeoutMs: number,
+  context: RetryContext,
+): Promise<Response> {
+  await context.waitForTurn?.();
+
+  const callerSignal = context.signal;
+  const controller = new AbortController();
+  const timer = setTimeout(
+    () => controller.abort(new TimeoutError(timeoutMs)),
+    timeoutMs,
+  );
+  const onCallerAbort = (): void => controller.abort(callerSignal?.reason);
+  callerSignal?.addEventListener("abort", onCallerAbort, { once: true });
+
+  try {
+    return await attempt(controller.signal);
+  } catch (e) {
+    // タイムアウトによる中断はTimeoutErrorとして投げ直す
+    if (controller.signal.reason instanceof TimeoutError) {
+      throw controller.signal.reason;
+    }
+    throw e;
+  } finally {
+    clearTimeout(timer);
+    callerSignal?.removeEventListener("abort", onCallerAbort);
+  }
+}
+
+/**
+ * リトライ付きでリクエストを実行
+ * Retry-Afterがあればバックオフより優先する。
+ * 再試行できないステータスや最終的な失敗は、最後のレスポンス・エラーをそのまま返す
+ */
+export async function fetchWithRetry(
+  attempt: Attempt,
+  options: RetryOptions = loadRetryOptions(),
+  context: RetryContext = {},
+): Promise<Response> {
+  const idempotent = context.idempotent ?? true;
+
+  for (let attemptIndex = 0; ; attemptIndex++) {
+    const isLastAttempt = attemptIndex + 1 >= options.maxAttempts;
+    let delayMs: number;
+
+    try {
+      const response = await runAttempt(attempt, options.timeoutMs, context);
+      if (
+        !isRetryableStatus(response.status) ||
+        (!idempotent && response.status !== 429) ||
+        isLastAttempt ||
+        !consumeBudget()
+      ) {
+        return response;
+      }
+      delayMs = Math.max(
+        parseRetryAfter(response.headers.get("retry-after")) ?? 0,
+        computeBackoff(attemptIndex, options),
+      );
+      // 使わないレスポンスボディは接続を解放するために破棄
+      await response.body?.cancel().catch(() => undefined);
+    } catch (e) {
+      // 呼び出し元による中断は再試行しない
+      if (context.signal?.aborted) {
+        throw e;
+      }
+      if (e instanceof TimeoutError) {
+        stats.timeouts++;
+      }
+      // 再送できないリクエストは、送信前に失敗したことが確実な場合だけ再試行
+      if (
+        (!idempotent && !isConnectError(e)) ||
+        isLastAttempt ||
+        !consumeBudget()
+      ) {
+        throw e;
+      }
+      delayMs = computeBackoff(attemptIndex, options);
+    }
+
+    stats.retries++;
+    stats.backoffMs += delayMs;
+    await sleep(delayMs);
+  }
+}
+
+/**
+ * レスポンスボディの読み込みまで含めて再試行する（画像のストリーミングなど）
+ * ボディの受信が止まった（IdleTimeoutError）場合だけリクエストからやり直す。
+ * ヘッダー受信までの失敗はfetchWithRetryで再試行済みなのでそのまま投げる
+ */
+export async function retryOnIdleTimeout<T>(
+  run: () => Promise<T>,
+  options: RetryOptions = loadRetryOptions(),
+): Promise<T> {
+  for (let attemptIndex = 0; ; attemptIndex++) {
+    try {
+      return await run();
+    } catch (e) {
+      if (!(e instanceof IdleTimeoutError)) {
+        throw e;
+      }
+      stats.timeouts++;
+      if (attemptIndex + 1 >= options.maxAttempts || !consumeBudget()) {
+        throw e;
+      }
+      const delayMs = computeBackoff(attemptIndex, options);
+      stats.retries++;
+      stats.backoffMs += delayMs;
+      await sleep(delayMs);
+    }
+  }
+}
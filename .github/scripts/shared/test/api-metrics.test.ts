@@ -0,0 +1,81 @@
+/**
+ * api-metrics ユニットテスト
+ */
+import { describe, it, expect, vi, beforeEach } from "vitest";
+import * as fs from "node:fs/promises";
+import * as path from "node:path";
+import * as os from "node:os";
+
+describe("api-metrics", () => {
+  beforeEach(() => {
+    vi.resetModules();
+  });
+
+  it("should compute latency percentiles per endpoint", async () => {
+    const { recordApiCall, getApiMetrics } = await import("../api-metrics.js");
+
+    for (let i = 1; i <= 100; i++) {
+      recordApiCall("blocks.children.list", i * 10, 200);
+    }
+    recordApiCall("pages.retrieve", 50, 429);
+    recordApiCall("pages.retrieve", 80);
+
+    const summary = getApiMetrics();
+    expect(summary.totalCalls).toBe(102);
+
+    const list = summary.endpoints["blocks.children.list"];
+    expect(list.calls).toBe(100);
+    expect(list.errors).toBe(0);
+    // バケットの上限なので実際の値より最大25%大きい
+    expect(list.latencyMs.p50).toBeGreaterThanOrEqual(500);
+    expect(list.latencyMs.p50).toBeLessThanOrEqual(625);
+    expect(list.latencyMs.p95).toBeGreaterThanOrEqual(950);
+    expect(list.latencyMs.p99).toBeLessThanOrEqual(1000);
+    expect(list.latencyMs.max).toBe(1000);
+
+    const pages = summary.endpoints["pages.retrieve"];
+    expect(pages.errors).toBe(2);
+    expect(pages.rateLimited).toBe(1);
+  });
+
+  it("should count response bytes and failures of an instrumented fetch", async () => {
+    const { instrumentFetch, getApiMetrics } = await import("../api-metrics.js");
+
+    const ok = instrumentFetch("asset", async () => new Response("x".repeat(1000)));
+    expect((await (await ok("https://example.com/a.png")).text()).length).toBe(1000);
+
+    const limited = instrumentFetch(
+      "search",
+      async () => new Response("{}", { status: 429 }),
+    );
+    expect((await limited("https://api.notion.com/v1/search")).status).toBe(429);
+
+    const broken = instrumentFetch("search", async () => {
+      throw new Error("ECONNRESET");
+    });
+    await expect(broken("https://api.notion.com/v1/search")).rejects.toThrow(
+      "ECONNRESET",
+    );
+
+    const { endpoints } = getApiMetrics();
+    expect(endpoints.asset).toMatchObject({ calls: 1, errors: 0, bytesReceived: 1000 });
+    expect(endpoints.search).toMatchObject({ calls: 2, errors: 2, rateLimited: 1 });
+  });
+
+  it("should write the summary as JSON", async () => {
+    const { recordApiCall, writeApiMetrics } = await import("../api-metrics.js");
+    const dir = await fs.mkdtemp(path.join(os.tmpdir(), "notion-api-metrics-"));
+    const filePath = path.join(dir, "nested", "metrics.json");
+
+    try {
+      recordApiCall("search", 12, 200);
+      await writeApiMetrics(filePath);
+
+      const written = JSON.parse(await fs.readFile(filePath, "utf-8"));
+      expect(written.totalCalls).toBe(1);
+      expect(written.endpoints.search.calls).toBe(1);
+    } finally {
+      await fs.rm(dir, { recursive: true, force: true });
+    }
+  });
+});
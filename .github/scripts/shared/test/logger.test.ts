@@ -0,0 +1,124 @@
+/**
+ * logger ユニットテスト
+ */
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest";
+
+describe("logger", () => {
+  const originalEnv = process.env;
+  let stdout: string[];
+  let stderr: string[];
+
+  beforeEach(() => {
+    vi.resetModules();
+    process.env = { ...originalEnv };
+    stdout = [];
+    stderr = [];
+    vi.spyOn(process.stdout, "write").mockImplementation((chunk) => {
+      stdout.push(String(chunk));
+      return true;
+    });
+    vi.spyOn(process.stderr, "write").mockImplementation((chunk) => {
+      stderr.push(String(chunk));
+      return true;
+    });
+  });
+
+  afterEach(() => {
+    process.env = originalEnv;
+    vi.useRealTimers();
+    vi.restoreAllMocks();
+  });
+
+  it("should buffer info lines until flushed and hide debug lines", async () => {
+    const { logDebug, logInfo, flushLogs } = await import("../logger.js");
+
+    logInfo("Fetching from Notion");
+    logDebug("📄 Page");
+    logInfo("Done!");
+    expect(stdout).toEqual([]);
+
+    flushLogs();
+    expect(stdout).toEqual(["Fetching from Notion\nDone!\n"]);
+  });
+
+  it("should flush buffered lines before writing errors", async () => {
+    const { logError, logInfo } = await import("../logger.js");
+
+    logInfo("Fetching from Notion");
+    logError("Error fetching page abc");
+
+    expect(stdout).toEqual(["Fetching from Notion\n"]);
+    expect(stderr).toEqual(["Error fetching page abc\n"]);
+  });
+
+  it("should flush once the buffer reaches 64KiB of UTF-8", async () => {
+    const { logInfo } = await import("../logger.js");
+
+    // 1行は3バイト×9999文字＋改行で約30KB（UTF-16では約10K単位）
+    const line = "ページ".repeat(3333);
+    logInfo(line);
+    logInfo(line);
+    expect(stdout).toEqual([]);
+
+    logInfo(line);
+    expect(stdout).toEqual([`${line}\n${line}\n${line}\n`]);
+  });
+
+  it("should write NDJSON with structured fields", async () => {
+    process.env.NOTION_LOG_FORMAT = "json";
+    process.env.NOTION_LOG_LEVEL = "debug";
+    const { logDebug, logSeparator, flushLogs } = await import("../logger.js");
+
+    logSeparator();
+    logDebug("  📄 Page", { event: "page", id: "abc" });
+    flushLogs();
+
+    const lines = stdout.join("").trim().split("\n");
+    expect(lines).toHaveLength(1);
+    expect(JSON.parse(lines[0])).toMatchObject({
+      level: "debug",
+      msg: "📄 Page",
+      event: "page",
+      id: "abc",
+    });
+  });
+
+  it("should print only warnings and errors in quiet mode", async () => {
+    process.env.NOTION_LOG_QUIET = "true";
+    const { logInfo, logWarn, flushLogs, isLogLevelEnabled } = await import(
+      "../logger.js"
+    );
+
+    logInfo("Done!");
+    logWarn("Table conversion error");
+    flushLogs();
+
+    expect(isLogLevelEnabled("info")).toBe(false);
+    expect(stdout).toEqual([]);
+    expect(stderr).toEqual(["Table conversion error\n"]);
+  });
+
+  it("should print a periodic progress line", async () => {
+    vi.useFakeTimers();
+    process.env.NOTION_LOG_PROGRESS_INTERVAL_MS = "1000";
+    const { startProgress, flushLogs } = await import("../logger.js");
+
+    const stop = startProgress("pages", () => ({ done: 3, queued: 7 }));
+    vi.advanceTimersByTime(1000);
+    stop();
+    vi.advanceTimersByTime(5000);
+    flushLogs();
+
+    const output = stdout.join("");
+    expect(output).toContain("Progress: 3 pages done, 7 queued");
+    expect(output.match(/Progress:/g)).toHaveLength(1);
+  });
+
+  it("should format durations", async () => {
+    const { formatDuration } = await import("../logger.js");
+
+    expect(formatDuration(42)).toBe("42s");
+    expect(formatDuration(185)).toBe("3m05s");
+    expect(formatDuration(3720)).toBe("1h02m");
+  });
+});
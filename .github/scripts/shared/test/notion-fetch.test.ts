@@ -0,0 +1,185 @@
+/**
+ * notion-fetch ユニットテスト
+ */
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest";
+
+const API = "https://api.notion.com/v1";
+
+describe("classifyNotionRequest", () => {
+  it("should classify Notion API endpoints", async () => {
+    const { classifyNotionRequest } = await import("../notion-fetch.js");
+
+    expect(classifyNotionRequest("GET", `${API}/pages/abc`)).toBe(
+      "pages.retrieve",
+    );
+    expect(classifyNotionRequest("GET", `${API}/blocks/abc/children`)).toBe(
+      "blocks.children.list",
+    );
+    expect(classifyNotionRequest("PATCH", `${API}/blocks/abc/children`)).toBe(
+      "blocks.children.append",
+    );
+    expect(classifyNotionRequest("DELETE", `${API}/blocks/abc`)).toBe(
+      "blocks.delete",
+    );
+    expect(classifyNotionRequest("GET", `${API}/databases/abc`)).toBe(
+      "databases.retrieve",
+    );
+    expect(classifyNotionRequest("POST", `${API}/data_sources/abc/query`)).toBe(
+      "dataSources.query",
+    );
+    expect(classifyNotionRequest("POST", `${API}/search`)).toBe("search");
+  });
+
+  it("should return unknown for invalid URLs", async () => {
+    const { classifyNotionRequest } = await import("../notion-fetch.js");
+
+    expect(classifyNotionRequest("GET", "not a url")).toBe("unknown");
+  });
+});
+
+describe("getEndpointPriority", () => {
+  const originalEnv = process.env;
+
+  beforeEach(() => {
+    vi.resetModules();
+    process.env = { ...originalEnv };
+  });
+
+  afterEach(() => {
+    process.env = originalEnv;
+  });
+
+  it("should prioritize page retrieval over listings and assets", async () => {
+    const { getEndpointPriority } = await import("../notion-fetch.js");
+
+    expect(getEndpointPriority("pages.retrieve")).toBeLessThan(
+      getEndpointPriority("blocks.children.list"),
+    );
+    expect(getEndpointPriority("blocks.children.list")).toBeLessThan(
+      getEndpointPriority("asset"),
+    );
+  });
+
+  it("should apply NOTION_RATE_LIMIT_PRIORITIES overrides", async () => {
+    process.env.NOTION_RATE_LIMIT_PRIORITIES = "asset=0, search=7,invalid";
+    const { getEndpointPriority } = await import("../notion-fetch.js");
+
+    expect(getEndpointPriority("asset")).toBe(0);
+    expect(getEndpointPriority("search")).toBe(7);
+    expect(getEndpointPriority("pages.retrieve")).toBe(0);
+  });
+});
+
+describe("createNotionFetch", () => {
+  beforeEach(() => {
+    vi.resetModules();
+  });
+
+  it("should pass requests through the shared rate limiter", async () => {
+    const { createNotionFetch, getSharedRateLimiter } = await import(
+      "../notion-fetch.js"
+    );
+    const baseFetch = vi.fn(async () => new Response("{}"));
+    const notionFetch = createNotionFetch(baseFetch);
+
+    await notionFetch(`${API}/pages/abc`, { method: "GET" });
+
+    expect(baseFetch).toHaveBeenCalledWith(
+      `${API}/pages/abc`,
+      expect.objectContaining({ method: "GET" }),
+    );
+    expect(getSharedRateLimiter().getStats().scheduled).toBe(1);
+  });
+
+  it("should retry transient errors and honor Retry-After", async () => {
+    process.env.NOTION_RETRY_BASE_DELAY_MS = "1";
+    const { createNotionFetch } = await import("../notion-fetch.js");
+    const { getRetryStats } = await import("../retry.js");
+    const baseFetch = vi
+      .fn()
+      .mockResolvedValueOnce(
+        new Response(null, { status: 429, headers: { "Retry-After": "0" } }),
+      )
+      .mockResolvedValueOnce(new Response(null, { status: 502 }))
+      .mockResolvedValueOnce(new Response("{}", { status: 200 }));
+    const notionFetch = createNotionFetch(baseFetch);
+
+    const response = await notionFetch(`${API}/pages/abc`, { method: "GET" });
+
+    expect(response.status).toBe(200);
+    expect(baseFetch).toHaveBeenCalledTimes(3);
+    expect(getRetryStats().retries).toBe(2);
+    delete process.env.NOTION_RETRY_BASE_DELAY_MS;
+  });
+
+  it("should not resend a POST that timed out", async () => {
+    process.env.NOTION_RETRY_BASE_DELAY_MS = "1";
+    process.env.NOTION_REQUEST_TIMEOUT_MS = "5";
+    const { createNotionFetch } = await import("../notion-fetch.js");
+    const { TimeoutError } = await import("../retry.js");
+    // サーバーが応答しないまま（適用済みかどうか分からない）
+    const baseFetch = vi.fn(
+      (_url: string, init?: RequestInit) =>
+        new Promise<Response>((_, reject) => {
+          init?.signal?.addEventListener("abort", () =>
+            reject(init.signal?.reason),
+          );
+        }),
+    );
+    const notionFetch = createNotionFetch(baseFetch);
+
+    await expect(
+      notionFetch(`${API}/pages`, { method: "POST", body: "{}" }),
+    ).rejects.toBeInstanceOf(TimeoutError);
+    expect(baseFetch).toHaveBeenCalledTimes(1);
+    delete process.env.NOTION_RETRY_BASE_DELAY_MS;
+    delete process.env.NOTION_REQUEST_TIMEOUT_MS;
+  });
+
+  it("should retry a non-idempotent request only on 429 or a connection error", async () => {
+    process.env.NOTION_RETRY_BASE_DELAY_MS = "1";
+    const { createNotionFetch } = await import("../notion-fetch.js");
+    const baseFetch = vi
+      .fn()
+      .mockRejectedValueOnce(
+        new TypeError("fetch failed", {
+          cause: Object.assign(new Error("connect ECONNREFUSED"), {
+            code: "ECONNREFUSED",
+          }),
+        }),
+      )
+      .mockResolvedValueOnce(
+        new Response(null, { status: 429, headers: { "Retry-After": "0" } }),
+      )
+      .mockResolvedValueOnce(new Response(null, { status: 502 }))
+      .mockResolvedValueOnce(new Response("{}", { status: 200 }));
+    const notionFetch = createNotionFetch(baseFetch);
+
+    const response = await notionFetch(`${API}/blocks/abc/children`, {
+      method: "PATCH",
+    });
+
+    // 502はサーバー側で追加済みの可能性があるので再送しない
+    expect(response.status).toBe(502);
+    expect(baseFetch).toHaveBeenCalledTimes(3);
+    delete process.env.NOTION_RETRY_BASE_DELAY_MS;
+  });
+
+  it("should keep retrying read-only queries sent with POST", async () => {
+    process.env.NOTION_RETRY_BASE_DELAY_MS = "1";
+    const { createNotionFetch } = await import("../notion-fetch.js");
+    const baseFetch = vi
+      .fn()
+      .mockResolvedValueOnce(new Response(null, { status: 503 }))
+      .mockResolvedValueOnce(new Response("{}", { status: 200 }));
+    const notionFetch = createNotionFetch(baseFetch);
+
+    const response = await notionFetch(`${API}/data_sources/abc/query`, {
+      method: "POST",
+    });
+
+    expect(response.status).toBe(200);
+    expect(baseFetch).toHaveBeenCalledTimes(2);
+    delete process.env.NOTION_RETRY_BASE_DELAY_MS;
+  });
+});
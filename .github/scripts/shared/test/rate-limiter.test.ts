@@ -0,0 +1,64 @@
+/**
+ * rate-limiter ユニットテスト
+ */
+import { describe, it, expect } from "vitest";
+import { createRateLimiter } from "../rate-limiter.js";
+
+describe("createRateLimiter", () => {
+  it("should run requests within the burst immediately", async () => {
+    const limiter = createRateLimiter({ ratePerSecond: 1, burst: 3 });
+    const start = Date.now();
+
+    await Promise.all([1, 2, 3].map((n) => limiter.schedule(async () => n)));
+
+    expect(Date.now() - start).toBeLessThan(100);
+    expect(limiter.getStats().scheduled).toBe(3);
+  });
+
+  it("should delay requests beyond the burst", async () => {
+    const limiter = createRateLimiter({ ratePerSecond: 20, burst: 1 });
+    const start = Date.now();
+
+    await Promise.all([1, 2, 3].map((n) => limiter.schedule(async () => n)));
+
+    // 2件目・3件目はそれぞれ約50ms待つ
+    expect(Date.now() - start).toBeGreaterThanOrEqual(80);
+    const stats = limiter.getStats();
+    expect(stats.maxQueueDepth).toBeGreaterThanOrEqual(2);
+    expect(stats.totalWaitMs).toBeGreaterThan(0);
+  });
+
+  it("should run higher priority requests first", async () => {
+    const limiter = createRateLimiter({ ratePerSecond: 50, burst: 1 });
+    const order: string[] = [];
+
+    // 1件目でバケットを空にしてから残りを積む
+    const first = limiter.schedule(async () => order.push("first"));
+    const low = limiter.schedule(async () => order.push("low"), 2);
+    const high = limiter.schedule(async () => order.push("high"), 0);
+    await Promise.all([first, low, high]);
+
+    expect(order).toEqual(["first", "high", "low"]);
+  });
+
+  it("should return the result of the scheduled function", async () => {
+    const limiter = createRateLimiter({ ratePerSecond: 10, burst: 1 });
+
+    await expect(limiter.schedule(async () => "ok")).resolves.toBe("ok");
+    await expect(
+      limiter.schedule(async () => {
+        throw new Error("failed");
+      }),
+    ).rejects.toThrow("failed");
+  });
+
+  it("should report queue depth while waiting", async () => {
+    const limiter = createRateLimiter({ ratePerSecond: 20, burst: 1 });
+
+    const pending = [1, 2, 3].map((n) => limiter.schedule(async () => n));
+    expect(limiter.queueDepth).toBe(2);
+
+    await Promise.all(pending);
+    expect(limiter.queueDepth).toBe(0);
+  });
+});
@@ -0,0 +1,210 @@
+/**
+ * retry ユニットテスト
+ */
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest";
+import {
+  computeBackoff,
+  fetchWithRetry,
+  getRetryStats,
+  IdleTimeoutError,
+  isRetryableStatus,
+  parseRetryAfter,
+  resetRetryStats,
+  retryOnIdleTimeout,
+  TimeoutError,
+  type RetryOptions,
+} from "../retry.js";
+
+const fastOptions: RetryOptions = {
+  maxAttempts: 3,
+  baseDelayMs: 1,
+  maxDelayMs: 5,
+  timeoutMs: 1000,
+};
+
+describe("isRetryableStatus", () => {
+  it("should retry rate limits and transient server errors", () => {
+    expect(isRetryableStatus(429)).toBe(true);
+    expect(isRetryableStatus(502)).toBe(true);
+    expect(isRetryableStatus(503)).toBe(true);
+    expect(isRetryableStatus(504)).toBe(true);
+  });
+
+  it("should not retry client errors", () => {
+    expect(isRetryableStatus(400)).toBe(false);
+    expect(isRetryableStatus(401)).toBe(false);
+    expect(isRetryableStatus(404)).toBe(false);
+  });
+});
+
+describe("parseRetryAfter", () => {
+  it("should parse seconds", () => {
+    expect(parseRetryAfter("2")).toBe(2000);
+  });
+
+  it("should parse an HTTP date", () => {
+    const now = Date.parse("2024-01-01T00:00:00Z");
+    expect(parseRetryAfter("Mon, 01 Jan 2024 00:00:05 GMT", now)).toBe(5000);
+  });
+
+  it("should return null for missing or invalid values", () => {
+    expect(parseRetryAfter(null)).toBeNull();
+    expect(parseRetryAfter("soon")).toBeNull();
+  });
+});
+
+describe("computeBackoff", () => {
+  const options = { baseDelayMs: 100, maxDelayMs: 1000 };
+
+  it("should grow exponentially with full jitter", () => {
+    expect(computeBackoff(0, options, () => 0.999)).toBe(99);
+    expect(computeBackoff(2, options, () => 0.5)).toBe(200);
+  });
+
+  it("should not exceed the maximum delay", () => {
+    expect(computeBackoff(10, options, () => 0.999)).toBeLessThan(1000);
+  });
+});
+
+describe("fetchWithRetry", () => {
+  const originalEnv = process.env;
+
+  beforeEach(() => {
+    process.env = { ...originalEnv };
+    resetRetryStats();
+  });
+
+  afterEach(() => {
+    process.env = originalEnv;
+  });
+
+  it("should return the first successful response", async () => {
+    const attempt = vi.fn(async () => new Response("ok"));
+
+    const response = await fetchWithRetry(attempt, fastOptions);
+
+    expect(response.status).toBe(200);
+    expect(attempt).toHaveBeenCalledTimes(1);
+    expect(getRetryStats().retries).toBe(0);
+  });
+
+  it("should retry retryable statuses until success", async () => {
+    const attempt = vi
+      .fn()
+      .mockResolvedValueOnce(new Response(null, { status: 503 }))
+      .mockResolvedValueOnce(new Response("ok"));
+
+    const response = await fetchWithRetry(attempt, fastOptions);
+
+    expect(response.status).toBe(200);
+    expect(attempt).toHaveBeenCalledTimes(2);
+    expect(getRetryStats().retries).toBe(1);
+  });
+
+  it("should return the last response after max attempts", async () => {
+    const attempt = vi.fn(async () => new Response(null, { status: 429 }));
+
+    const response = await fetchWithRetry(attempt, fastOptions);
+
+    expect(response.status).toBe(429);
+    expect(attempt).toHaveBeenCalledTimes(3);
+  });
+
+  it("should not retry non-retryable statuses", async () => {
+    const attempt = vi.fn(async () => new Response(null, { status: 404 }));
+
+    const response = await fetchWithRetry(attempt, fastOptions);
+
+    expect(response.status).toBe(404);
+    expect(attempt).toHaveBeenCalledTimes(1);
+  });
+
+  it("should retry network errors", async () => {
+    const attempt = vi
+      .fn()
+      .mockRejectedValueOnce(new TypeError("fetch failed"))
+      .mockResolvedValueOnce(new Response("ok"));
+
+    const response = await fetchWithRetry(attempt, fastOptions);
+
+    expect(response.status).toBe(200);
+  });
+
+  it("should time out slow requests", async () => {
+    const attempt = (signal: AbortSignal): Promise<Response> =>
+      new Promise((_, reject) => {
+        signal.addEventListener("abort", () => reject(signal.reason));
+      });
+
+    await expect(
+      fetchWithRetry(attempt, { ...fastOptions, maxAttempts: 2, timeoutMs: 5 }),
+    ).rejects.toBeInstanceOf(TimeoutError);
+    expect(getRetryStats().timeouts).toBe(2);
+  });
+
+  it("should not retry a timed-out POST that the server may have applied", async () => {
+    const attempt = vi.fn(
+      (signal: AbortSignal): Promise<Response> =>
+        new Promise((_, reject) => {
+          signal.addEventListener("abort", () => reject(signal.reason));
+        }),
+    );
+
+    await expect(
+      fetchWithRetry(
+        attempt,
+        { ...fastOptions, timeoutMs: 5 },
+        { idempotent: false },
+      ),
+    ).rejects.toBeInstanceOf(TimeoutError);
+    expect(attempt).toHaveBeenCalledTimes(1);
+    expect(getRetryStats().retries).toBe(0);
+  });
+
+  it("should stop retrying when the run-wide budget is exhausted", async () => {
+    process.env.NOTION_RETRY_BUDGET = "1";
+    const attempt = vi.fn(async () => new Response(null, { status: 502 }));
+
+    await fetchWithRetry(attempt, fastOptions);
+    await fetchWithRetry(attempt, fastOptions);
+
+    // 1回目のリクエストで予算を使い切り、2回目は再試行しない
+    expect(attempt).toHaveBeenCalledTimes(3);
+    expect(getRetryStats().budgetExhausted).toBe(2);
+  });
+});
+
+describe("retryOnIdleTimeout", () => {
+  beforeEach(() => {
+    resetRetryStats();
+  });
+
+  it("should run again when the body stalled", async () => {
+    const run = vi
+      .fn(async () => "done")
+      .mockRejectedValueOnce(new IdleTimeoutError(5));
+
+    await expect(retryOnIdleTimeout(run, fastOptions)).resolves.toBe("done");
+    expect(run).toHaveBeenCalledTimes(2);
+    expect(getRetryStats().timeouts).toBe(1);
+    expect(getRetryStats().retries).toBe(1);
+  });
+
+  it("should not run again for other errors or after max attempts", async () => {
+    const failing = vi.fn(async () => {
+      throw new Error("HTTP 403");
+    });
+    await expect(retryOnIdleTimeout(failing, fastOptions)).rejects.toThrow(
+      "HTTP 403",
+    );
+    expect(failing).toHaveBeenCalledTimes(1);
+
+    const stalled = vi.fn(async () => {
+      throw new IdleTimeoutError(5);
+    });
+    await expect(
+      retryOnIdleTimeout(stalled, fastOptions),
+    ).rejects.toBeInstanceOf(IdleTimeoutError);
+    expect(stalled).toHaveBeenCalledTimes(fastOptions.maxAttempts);
+  });
+});
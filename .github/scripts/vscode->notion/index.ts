@@ -4,6 +4,8 @@
  */
 import "dotenv/config";
 import { syncMarkdownToNotion } from "./vscode-client.js";
+import { writeApiMetrics } from "../shared/api-metrics.js";
+import { flushLogs, logInfo, logSeparator } from "../shared/logger.js";
 
 // ============================================================
 // 設定
@@ -20,18 +22,22 @@ async function main() {
     process.exit(1);
   }
 
-  console.log(`Syncing Markdown files to Notion (source: ${INPUT_DIR})`);
-  console.log("=".repeat(50));
+  logInfo(`Syncing Markdown files to Notion (source: ${INPUT_DIR})`);
+  logSeparator();
 
   try {
     await syncMarkdownToNotion(INPUT_DIR, notionApiKey);
   } catch (error) {
+    flushLogs();
     console.error("Error during sync:", error);
+    await writeApiMetrics();
     process.exit(1);
   }
+  await writeApiMetrics();
 
-  console.log("=".repeat(50));
-  console.log("Done!");
+  logSeparator();
+  logInfo("Done!");
+  flushLogs();
 }
 
 await main();
@@ -5,6 +5,21 @@ import { Client } from "@notionhq/client";
 import type { BlockObjectRequest } from "@notionhq/client/build/src/api-endpoints";
 import * as fs from "node:fs/promises";
 import * as path from "node:path";
+import {
+  createNotionFetch,
+  getClientTimeoutMs,
+  getNotionBaseUrl,
+  getSharedRateLimiter,
+} from "../shared/notion-fetch.js";
+import { getRetryStats } from "../shared/retry.js";
+import { formatApiMetrics, getApiMetrics } from "../shared/api-metrics.js";
+import {
+  logDebug,
+  logError,
+  logInfo,
+  logWarn,
+  startProgress,
+} from "../shared/logger.js";
 
 // ============================================================
 // 定数
@@ -24,7 +39,13 @@ const PRESERVE_BLOCK_TYPES = new Set(["child_page", "child_database"]);
 let notion: Client;
 
 function initNotion(apiKey: string): void {
-  notion = new Client({ auth: apiKey });
+  // 全リクエストは共有レートリミッターとリトライ層を通る（notion->vscodeと共通）
+  notion = new Client({
+    auth: apiKey,
+    baseUrl: getNotionBaseUrl(),
+    fetch: createNotionFetch(),
+    timeoutMs: getClientTimeoutMs(),
+  });
 }
 
 // ============================================================
@@ -171,7 +192,7 @@ async function getAllBlocks(pageId: string): Promise<
 
     return blocks;
   } catch (error) {
-    console.error(`Failed to get blocks for ${pageId}:`, error);
+    logWarn(`Failed to get blocks for ${pageId}: ${error}`, { pageId });
     return [];
   }
 }
@@ -276,17 +297,29 @@ export async function syncMarkdownToNotion(
   initNotion(apiKey);
 
   const files = await scanMarkdownFiles(rootDir);
-  console.log(`Found ${files.length} Markdown files`);
+  logInfo(`Found ${files.length} Markdown files`, { files: files.length });
 
   let successCount = 0;
   let skipCount = 0;
   let errorCount = 0;
 
-  for (const file of files) {
+  // ファイルごとの行の代わりに、定期的に進捗を表示
+  let done = 0;
+  const stopProgress = startProgress("files", () => ({
+    done,
+    queued: files.length - done,
+  }));
+
+  for (const [index, file] of files.entries()) {
+    // 処理を始めたファイルまで数え、最後のファイルで全件になるようにする
+    done = index + 1;
     const pageId = extractPageIdFromFilename(path.basename(file));
 
     if (!pageId) {
-      console.log(`⏭️  Skipped (no ID): ${path.relative(rootDir, file)}`);
+      logDebug(`⏭️  Skipped (no ID): ${path.relative(rootDir, file)}`, {
+        event: "skipped",
+        path: file,
+      });
       skipCount++;
       continue;
     }
@@ -295,30 +328,53 @@ export async function syncMarkdownToNotion(
       const content = await fs.readFile(file, "utf-8");
       const { title, body } = parseMarkdown(content);
 
-      console.log(`📝 Updating: ${title}`);
+      logDebug(`📝 Updating: ${title}`, { event: "updating", pageId, title });
 
       const blocks = createBlocksFromMarkdown(body);
       if (blocks.length === 0) {
-        console.log(`⚠️  Empty content: ${title}`);
+        logWarn(`⚠️  Empty content: ${title}`, { pageId, title });
         skipCount++;
         continue;
       }
 
       await updatePageContent(pageId, blocks);
-      console.log(`✅ Updated: ${title}`);
+      logDebug(`✅ Updated: ${title}`, { event: "updated", pageId, title });
       successCount++;
     } catch (error) {
       errorCount++;
-      console.error(
-        `❌ Error updating ${path.relative(rootDir, file)}:`,
-        error instanceof Error ? error.message : String(error),
+      logError(
+        `❌ Error updating ${path.relative(rootDir, file)}: ${error instanceof Error ? error.message : String(error)}`,
+        { path: file, pageId },
       );
     }
   }
+  stopProgress();
 
   // サマリー
-  console.log(`\nSync Summary:`);
-  console.log(`  ✅ Updated: ${successCount}`);
-  console.log(`  ⏭️  Skipped: ${skipCount}`);
-  console.log(`  ❌ Errors: ${errorCount}`);
+  logInfo(`\nSync Summary:`, {
+    updated: successCount,
+    skipped: skipCount,
+    errors: errorCount,
+  });
+  logInfo(`  ✅ Updated: ${successCount}`);
+  logInfo(`  ⏭️  Skipped: ${skipCount}`);
+  logInfo(`  ❌ Errors: ${errorCount}`);
+
+  const limiterStats = getSharedRateLimiter().getStats();
+  logInfo(
+    `  ⏱️  Rate limiter: ${limiterStats.scheduled} requests, max queue depth ${limiterStats.maxQueueDepth}, waited ${(limiterStats.totalWaitMs / 1000).toFixed(1)}s`,
+    { rateLimiter: limiterStats },
+  );
+  const retryStats = getRetryStats();
+  logInfo(
+    `  🔁 Retries: ${retryStats.retries} (backed off ${(retryStats.backoffMs / 1000).toFixed(1)}s, ${retryStats.timeouts} timeouts)`,
+    { retries: retryStats },
+  );
+  const apiMetrics = getApiMetrics();
+  logInfo(`  📊 API calls by endpoint (${apiMetrics.totalCalls} total):`, {
+    apiCalls: apiMetrics,
+  });
+  for (const line of formatApiMetrics(apiMetrics)) {
+    logInfo(`    ${line}`);
+  }
 }